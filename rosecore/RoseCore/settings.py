@@ -52,12 +52,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'productivity.middleware.QueryMetricsMiddleware',
+    'productivity.middleware.QueryDebugMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'productivity.middleware.RemoteCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'RoseCore.urls'
@@ -137,5 +140,42 @@ STATIC_URL = '/static/'
 
 # application configuration: TODO improve this
 TODOIST_KEY = os.environ.get('TODOIST_KEY', default="")
-TOGGL_WORKSPACE_ID = int(os.environ.get('TOGGL_WID', default=""))
+# 0 until configured, toggl is only contacted when it is used
+TOGGL_WORKSPACE_ID = int(os.environ.get('TOGGL_WID') or 0)
 TOGGL_ID = os.environ.get('TOGGL_KEY', default="")
+# where the remote apis live, pointed at local stand-ins by the benchmarks
+TODOIST_API_ENDPOINT = os.environ.get('TODOIST_API_ENDPOINT', default="https://api.todoist.com")
+TOGGL_API_URL = os.environ.get('TOGGL_API_URL', default="https://api.track.toggl.com/api/v8")
+
+# local cache of remote state so syncs only ask for what changed
+SYNC_CACHE_DIR = os.environ.get('SYNC_CACHE_DIR', default=os.path.join(BASE_DIR, "cache"))
+TODOIST_CACHE_DIR = os.path.join(os.environ.get('TODOIST_CACHE_DIR',
+                                                default=os.path.join(SYNC_CACHE_DIR, "todoist")), "")
+TOGGL_CACHE_DIR = os.environ.get('TOGGL_CACHE_DIR', default=os.path.join(SYNC_CACHE_DIR, "toggl"))
+# seconds between checks for a snapshot the job worker wrote
+TOGGL_SNAPSHOT_CHECK_SECONDS = float(os.environ.get('TOGGL_SNAPSHOT_CHECK_SECONDS', default=5))
+
+# toggl http connection pool, timeouts are in seconds
+TOGGL_POOL_SIZE = int(os.environ.get('TOGGL_POOL_SIZE', default=10))
+TOGGL_CONNECT_TIMEOUT = float(os.environ.get('TOGGL_CONNECT_TIMEOUT', default=5))
+TOGGL_READ_TIMEOUT = float(os.environ.get('TOGGL_READ_TIMEOUT', default=30))
+
+# toggl allows about one request per second, throttled requests are retried
+TOGGL_RATE_LIMIT = float(os.environ.get('TOGGL_RATE_LIMIT', default=1))
+TOGGL_RATE_BURST = int(os.environ.get('TOGGL_RATE_BURST', default=1))
+TOGGL_MAX_RETRIES = int(os.environ.get('TOGGL_MAX_RETRIES', default=5))
+TOGGL_RETRY_BACKOFF = float(os.environ.get('TOGGL_RETRY_BACKOFF', default=1))
+
+# seconds todoist and toggl reads are reused for, our own writes clear them
+REMOTE_CACHE_TTL = 0 if TESTING else float(os.environ.get('REMOTE_CACHE_TTL', default=30))
+
+# seconds the job worker waits between checks of an empty queue
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', default=2))
+# seconds a running job can go without reporting progress before it is failed
+JOB_STALE_SECONDS = float(os.environ.get('JOB_STALE_SECONDS', default=1800))
+# seconds a process's published metrics are kept after it last published
+METRICS_STALE_SECONDS = float(os.environ.get('METRICS_STALE_SECONDS', default=86400))
+
+# log the N+1s and slow query plans(over QUERY_SLOW_SECONDS) of each request
+QUERY_DEBUG = int(os.environ.get('QUERY_DEBUG', default=0))
+QUERY_SLOW_SECONDS = float(os.environ.get('QUERY_SLOW_SECONDS', default=0.1))
@@ -17,9 +17,11 @@ from django.contrib import admin
 from django.urls import path, include
 
 from . import views
+from productivity.views import metricsviews
 
 urlpatterns = [
     path('', views.index, name="index"),
     path("productivity/", include("productivity.urls")),
     path('admin/', admin.site.urls),
+    path('metrics', metricsviews.metrics, name="metrics"),
 ]
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Project
+from .models import Project, SyncRun
 
 # Register your models here.
 admin.site.register(Project)
+admin.site.register(SyncRun)
@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+import random
+
+import pytz
+
+from productivity.models.Project import Project
+from .standins import TodoistStandIn, TogglStandIn
+
+
+@dataclass
+class ProjectSpec:
+    """
+    A generated project, where says which side(s) it starts on
+    """
+    BOTH = "both"
+    LOCAL = "local"
+    REMOTE = "remote"
+
+    name: str
+    parent: Optional[int]
+    where: str
+
+
+@dataclass
+class TaskSpec:
+    content: str
+    project: int
+    due_date: Optional[str]
+
+
+@dataclass
+class TimeEntrySpec:
+    project: Optional[int]
+    start: datetime
+    stop: datetime
+    description: str
+    tags: List[str]
+
+
+@dataclass
+class Dataset:
+    """
+    A synthetic project tree with tasks and time entries, projects are
+    referred to by their index in projects
+    """
+    scale: int
+    projects: List[ProjectSpec] = field(default_factory=list)
+    tasks: List[TaskSpec] = field(default_factory=list)
+    time_entries: List[TimeEntrySpec] = field(default_factory=list)
+
+
+def generate(scale: int, seed: int=0, branching: int=5) -> Dataset:
+    """
+    scale projects in a tree branching ways wide, as many tasks and time
+    entries. One in twenty projects is only local(the sync creates it
+    remotely) and one in twenty of the leaves is only remote(the sync adds
+    it as unsynced), the rest are linked on both sides
+    """
+    rng = random.Random(seed)
+    dataset = Dataset(scale)
+    first_leaf = (scale - 2) // branching + 1
+    for i in range(scale):
+        parent = (i - 1) // branching if i > 0 else None
+        if i % 20 == 1:
+            where = ProjectSpec.LOCAL
+        elif i % 20 == 2 and i >= first_leaf:
+            where = ProjectSpec.REMOTE
+        else:
+            where = ProjectSpec.BOTH
+        dataset.projects.append(ProjectSpec(f"project {i}", parent, where))
+    linked = [i for i, project in enumerate(dataset.projects) if project.where == ProjectSpec.BOTH]
+    today = datetime.now(pytz.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    for i in range(scale):
+        due = today + timedelta(days=rng.randint(-10, 30))
+        dataset.tasks.append(TaskSpec(f"task {i}", rng.choice(linked),
+                                      due.date().isoformat() if rng.random() < 0.7 else None))
+    tags = ["deep", "meeting", "admin", "review"]
+    for i in range(scale):
+        # inside the week either side of now that toggl is synced for
+        start = today - timedelta(days=rng.randint(0, 5), minutes=rng.randint(0, 600))
+        dataset.time_entries.append(TimeEntrySpec(
+            rng.choice(linked) if rng.random() < 0.9 else None,
+            start, start + timedelta(minutes=rng.randint(5, 180)),
+            f"entry {i % 50}", rng.sample(tags, rng.randint(0, 2))))
+    return dataset
+
+
+def load(dataset: Dataset, todoist: TodoistStandIn, toggl: TogglStandIn) -> None:
+    """
+    seeds the stand-ins and the local database with the dataset, parents are
+    created before their children
+    """
+    todoist_ids = {}
+    toggl_ids = {}
+    local = {}
+    for i, spec in enumerate(dataset.projects):
+        if spec.where != ProjectSpec.LOCAL:
+            todoist_ids[i] = todoist.add_project(spec.name, todoist_ids.get(spec.parent))["id"]
+            toggl_ids[i] = toggl.add_project(spec.name)["id"]
+        if spec.where != ProjectSpec.REMOTE:
+            local[i] = Project.objects.create(
+                name=spec.name,
+                parent=local.get(spec.parent),
+                todoistId=str(todoist_ids[i]) if i in todoist_ids else "",
+                togglId=str(toggl_ids[i]) if i in toggl_ids else "")
+    for spec in dataset.tasks:
+        todoist.add_item(spec.content, todoist_ids[spec.project], due_date=spec.due_date)
+    for spec in dataset.time_entries:
+        toggl.add_time_entry(spec.start, spec.stop, toggl_ids.get(spec.project),
+                             spec.description, spec.tags)
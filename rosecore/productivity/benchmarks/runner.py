@@ -0,0 +1,119 @@
+from contextlib import contextmanager
+from typing import Any, Dict, List
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from productivity.models.Project import Project
+from productivity.services.ProjectService import ProjectService
+from productivity.services.TaskService import TaskService
+from productivity.services.TodoistService import TodoistService
+from productivity.services.TogglService import TogglService
+from productivity.utilities.lazy import reset_clients
+from . import data
+from .standins import StandInServer, TodoistStandIn, TogglStandIn
+
+WORKSPACE_ID = 1
+
+
+class QueryCounter:
+    """
+    counts the sql statements run on a connection, as an execute_wrapper
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def measure(results: List[Dict[str, Any]], scenario: str, scale: int,
+            servers: Dict[str, StandInServer], memory: bool=True):
+    """
+    appends the wall time, remote requests, sql queries and(if memory)
+    the peak python memory of the block to results
+    """
+    for server in servers.values():
+        server.reset_counts()
+    queries = QueryCounter()
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(queries):
+            yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+        if memory:
+            tracemalloc.stop()
+        results.append({
+            "scenario": scenario,
+            "scale": scale,
+            "seconds": round(seconds, 4),
+            "queries": queries.count,
+            "peak_memory_bytes": peak,
+            "requests": {name: server.counts() for name, server in servers.items()},
+        })
+
+
+@contextmanager
+def stand_in_clients(todoist: TodoistStandIn, toggl: TogglStandIn, cache_dir: str):
+    """
+    points TodoistService and TogglService at the stand-ins, with their
+    caches in cache_dir, as a live(not TESTING) install
+    """
+    with override_settings(TESTING=False,
+                           TODOIST_API_ENDPOINT=todoist.url,
+                           TODOIST_CACHE_DIR=os.path.join(cache_dir, "todoist", ""),
+                           TOGGL_API_URL=toggl.api_url,
+                           TOGGL_CACHE_DIR=os.path.join(cache_dir, "toggl"),
+                           TOGGL_WORKSPACE_ID=WORKSPACE_ID,
+                           TOGGL_RATE_LIMIT=None,
+                           TOGGL_RETRY_BACKOFF=0.01):
+        reset_clients(TodoistService, TogglService)
+        TodoistService._cache.invalidate()
+        TogglService._cache.invalidate()
+        try:
+            yield
+        finally:
+            reset_clients(TodoistService, TogglService)
+            TodoistService._cache.invalidate()
+            TogglService._cache.invalidate()
+
+
+def run_scale(scale: int, latency: float=0.002, throttle_rate: float=0.02, seed: int=0,
+              memory: bool=True) -> List[Dict[str, Any]]:
+    """
+    runs every scenario against a fresh pair of stand-ins seeded with a
+    generated dataset of the scale, the database must start empty.
+    Throttling is only injected into toggl, the todoist client does not
+    retry a throttled sync
+    """
+    results = []
+    todoist = TodoistStandIn(latency=latency, seed=seed)
+    toggl = TogglStandIn(WORKSPACE_ID, latency=latency, throttle_rate=throttle_rate, seed=seed)
+    servers = {"todoist": todoist, "toggl": toggl}
+    with todoist, toggl, tempfile.TemporaryDirectory() as cache_dir, \
+            stand_in_clients(todoist, toggl, cache_dir):
+        data.load(data.generate(scale, seed), todoist, toggl)
+        with measure(results, "sync", scale, servers, memory):
+            ProjectService.sync()
+        with measure(results, "sync_unchanged", scale, servers, memory):
+            ProjectService.sync()
+        with measure(results, "nuke_all_unsynced", scale, servers, memory):
+            ProjectService.nuke_all_unsynced()
+        projects = list(Project.objects.synced().order_by("id"))
+        with measure(results, "bulk_task_create", scale, servers, memory):
+            TaskService.createTasks([{"content": f"new task {i}", "project": projects[i % len(projects)],
+                                      "nextDue": timezone.now()} for i in range(scale)])
+    return results
+
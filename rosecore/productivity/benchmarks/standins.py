@@ -0,0 +1,327 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+
+import pytz
+
+
+class StandInServer(ABC):
+    """
+    A local http server standing in for a remote api, every response waits
+    latency seconds and throttle_rate of the requests are answered with a
+    429. The requests served are counted per route. Subclasses answer
+    handle(method, path, query, body) with a (status, json payload)
+    """
+
+    def __init__(self, latency: float=0, throttle_rate: float=0, seed: int=0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.requests = Counter()
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        """
+        serves on a free local port from a background thread
+        """
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.throttled = 0
+
+    def counts(self) -> Dict[str, Any]:
+        """
+        the requests served per route, and how many were throttled
+        """
+        with self._lock:
+            return {
+                "total": sum(self.requests.values()),
+                "throttled": self.throttled,
+                "routes": dict(sorted(self.requests.items())),
+            }
+
+    @abstractmethod
+    def handle(self, method: str, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        """
+        the status and json payload answering a request
+        """
+
+    def route(self, method: str, path: str) -> str:
+        """
+        the name requests are counted under, ids are folded away
+        """
+        return f"{method} {re.sub(r'/[0-9]+', '/{id}', path)}"
+
+    def _serve(self, method: str, raw_path: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        parsed = urlparse(raw_path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests[self.route(method, parsed.path)] += 1
+            throttled = self.throttle_rate and self._random.random() < self.throttle_rate
+            if throttled:
+                self.throttled += 1
+                return 429, {"Retry-After": "0"}, b'{"error": "throttled"}'
+            status, payload = self.handle(method, parsed.path, query, body)
+        return status, {}, json.dumps(payload).encode()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body go out in one write, or delayed acks stall every response
+            wbufsize = 64 * 1024
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, payload = standin._serve(self.command, self.path, body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+class TogglStandIn(StandInServer):
+    """
+    The toggl v8 endpoints TogglTrack calls: workspace projects, project
+    and time entry create/update/delete, the time entry window and the
+    /me since pull. Serve it under /api/v8
+    """
+    PREFIX = "/api/v8"
+
+    def __init__(self, workspace_id: int, **kwargs):
+        super().__init__(**kwargs)
+        self.workspace_id = workspace_id
+        self.projects = {}
+        self.time_entries = {}
+        # when each project and time entry last changed, for since pulls
+        self._changed = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def api_url(self) -> str:
+        return self.url + TogglStandIn.PREFIX
+
+    def add_project(self, name: str) -> Dict[str, Any]:
+        project = {"id": next(self._ids), "name": name, "wid": self.workspace_id, "active": True}
+        self._store(self.projects, project)
+        return project
+
+    def add_time_entry(self, start: datetime, stop: datetime, project_id: int=None,
+                       description: str="", tags: List[str]=None) -> Dict[str, Any]:
+        entry = {"id": next(self._ids), "wid": self.workspace_id, "description": description,
+                 "start": start.isoformat(), "stop": stop.isoformat(), "tags": tags or []}
+        if project_id is not None:
+            entry["pid"] = project_id
+        self._store(self.time_entries, entry)
+        return entry
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        if not path.startswith(TogglStandIn.PREFIX):
+            return 404, {"error": path}
+        path = path[len(TogglStandIn.PREFIX):]
+        if method == "GET" and path == f"/workspaces/{self.workspace_id}/projects":
+            return 200, [project for project in self.projects.values() if project["active"]]
+        if method == "GET" and path == "/time_entries":
+            start, stop = query["start_date"], query["stop_date"]
+            return 200, [entry for entry in self.time_entries.values()
+                         if not entry.get("server_deleted_at")
+                         and self._parse(start) <= self._parse(entry["start"]) <= self._parse(stop)]
+        if method == "GET" and path == "/me":
+            since = int(query.get("since") or 0)
+            return 200, {"since": int(time.time()), "data": {
+                "projects": self._since(self.projects, since),
+                "time_entries": self._since(self.time_entries, since),
+            }}
+        match = re.fullmatch(r"/(projects|time_entries)(?:/([0-9]+))?", path)
+        if match is None:
+            return 404, {"error": path}
+        kind, id = match.groups()
+        return self._write(kind, method, int(id) if id else None, body)
+
+    def _write(self, kind: str, method: str, id: Optional[int], body: bytes) -> Tuple[int, Any]:
+        records = self.projects if kind == "projects" else self.time_entries
+        if method == "POST":
+            fields = json.loads(body)["project" if kind == "projects" else "time_entry"]
+            record = dict(fields, id=next(self._ids), wid=self.workspace_id)
+            if kind == "projects":
+                record["active"] = True
+            self._store(records, record)
+            return 200, {"data": record}
+        if id not in records:
+            return 404, {"error": f"{kind} {id} not found"}
+        if method == "PUT":
+            fields = json.loads(body)["project" if kind == "projects" else "time_entry"]
+            self._store(records, dict(records[id], **fields, id=id))
+            return 200, {"data": records[id]}
+        if method == "DELETE":
+            if kind == "projects":
+                self._store(records, dict(records[id], active=False))
+            else:
+                self._store(records, dict(records[id], server_deleted_at=datetime.now(pytz.utc).isoformat()))
+            return 200, [id]
+        return 405, {"error": method}
+
+    def _store(self, records: Dict[int, Dict[str, Any]], record: Dict[str, Any]) -> None:
+        records[record["id"]] = record
+        self._changed[record["id"]] = time.time()
+
+    def _since(self, records: Dict[int, Dict[str, Any]], since: int) -> List[Dict[str, Any]]:
+        return [record for id, record in records.items() if self._changed[id] >= since]
+
+    @staticmethod
+    def _parse(value: str) -> datetime:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return parsed if parsed.tzinfo is not None else pytz.utc.localize(parsed)
+
+
+class TodoistStandIn(StandInServer):
+    """
+    The todoist sync api TodoistAPI uses: /sync/v8/sync with the commands
+    for projects and items, and /sync/v8/add_item. Incremental syncs only
+    return what changed after the sync token
+    """
+    PREFIX = "/sync/v8/"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.projects = {}
+        self.items = {}
+        self._version = 0
+        self._ids = itertools.count(1)
+
+    def add_project(self, name: str, parent_id: int=None) -> Dict[str, Any]:
+        return self._store(self.projects, {"id": next(self._ids), "name": name,
+                                           "parent_id": parent_id, "is_archived": 0, "is_deleted": 0})
+
+    def add_item(self, content: str, project_id: int, description: str="", priority: int=1,
+                 due_date: str=None) -> Dict[str, Any]:
+        due = {"string": due_date, "date": due_date} if due_date else None
+        return self._store(self.items, {"id": next(self._ids), "content": content,
+                                        "description": description, "project_id": project_id,
+                                        "priority": priority, "due": due, "checked": 0, "is_deleted": 0})
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        if path == TodoistStandIn.PREFIX + "add_item":
+            return 200, self.add_item(query["content"], self._id(query.get("project_id")),
+                                      query.get("description", ""), int(query.get("priority") or 1),
+                                      query.get("due_string") or None)
+        if method != "POST" or path != TodoistStandIn.PREFIX + "sync":
+            return 404, {"error": path}
+        form = {key: values[-1] for key, values in parse_qs(body.decode()).items()}
+        temp_ids = {}
+        sync_status = {}
+        for command in json.loads(form.get("commands") or "[]"):
+            sync_status[command["uuid"]] = self._apply(command, temp_ids)
+        since = 0 if form.get("sync_token", "*") == "*" else int(form["sync_token"])
+        return 200, {
+            "sync_token": str(self._version),
+            "full_sync": since == 0,
+            "temp_id_mapping": temp_ids,
+            "sync_status": sync_status,
+            "projects": self._since(self.projects, since),
+            "items": self._since(self.items, since),
+        }
+
+    def _apply(self, command: Dict[str, Any], temp_ids: Dict[str, int]) -> Any:
+        """
+        runs one sync command, temp ids made earlier in the batch resolve
+        """
+        args = {key: temp_ids.get(value, value) if isinstance(value, str) else value
+                for key, value in command.get("args", {}).items()}
+        kind = command["type"]
+        if kind == "project_add":
+            project = self.add_project(args["name"], self._id(args.get("parent_id")))
+            temp_ids[command["temp_id"]] = project["id"]
+            return "ok"
+        if kind == "item_add":
+            item = self.add_item(args["content"], self._id(args.get("project_id")),
+                                 args.get("description", ""), args.get("priority", 1))
+            temp_ids[command["temp_id"]] = item["id"]
+            return "ok"
+        records = self.projects if kind.startswith("project_") else self.items
+        record = records.get(self._id(args.get("id")))
+        if record is None:
+            return {"error_code": 22, "error": "object not found"}
+        if kind in ("project_delete", "item_delete"):
+            changes = {"is_deleted": 1}
+        elif kind in ("item_close", "item_complete"):
+            changes = {"checked": 1}
+        elif kind == "project_move":
+            changes = {"parent_id": self._id(args.get("parent_id"))}
+        else:
+            changes = {key: value for key, value in args.items() if key != "id"}
+        self._store(records, dict(record, **changes))
+        return "ok"
+
+    def _store(self, records: Dict[int, Dict[str, Any]], record: Dict[str, Any]) -> Dict[str, Any]:
+        self._version += 1
+        record["_version"] = self._version
+        records[record["id"]] = record
+        return self._export(record)
+
+    def _since(self, records: Dict[int, Dict[str, Any]], since: int) -> List[Dict[str, Any]]:
+        return [self._export(record) for record in records.values()
+                if record["_version"] > since and not (since == 0 and record["is_deleted"])]
+
+    @staticmethod
+    def _export(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in record.items() if key != "_version"}
+
+    @staticmethod
+    def _id(value) -> Optional[int]:
+        if value in (None, "", "None"):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
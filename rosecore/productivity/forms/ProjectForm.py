@@ -15,6 +15,14 @@ class ProjectForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.fields['name'].required = True
 
+    def clean_parent(self):
+        parent = self.cleaned_data['parent']
+        try:
+            self.instance.validate_parent(parent)
+        except ValueError as error:
+            raise ValidationError(str(error))
+        return parent
+
     def clean_togglId(self):
         togglId = self.cleaned_data['togglId']
         if togglId != "":
@@ -15,7 +15,7 @@ class TaskForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.fields['content'].required = True
         self.fields['project'].required = True
-        self.fields['project'].queryset = Project.objects.filter(unsyncedSource="")
+        self.fields['project'].queryset = Project.objects.synced()
     
     def clean_todoistId(self):
         todoistId = self.cleaned_data['todoistId']
@@ -34,7 +34,7 @@ class TaskForm(forms.ModelForm):
         args["priority"] = self.cleaned_data['priority']
         args["complete"] = self.cleaned_data['complete']
         if task_id is None:
-            print(args)
+            logging.debug(f"creating task: {args}")
             TaskService.createTask(**args)
         else:
             task = self.instance
@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+import fcntl
+import json
+import os
+import tempfile
+
+from todoist.api import TodoistAPI, state_default
+
+
+class CachedTodoistAPI(TodoistAPI):
+    """
+    A TodoistAPI whose disk cache can be shared by several processes(ie the
+    web and the job worker). The state and sync token files are read and
+    written holding a lock on the cache, so a reader never pairs one
+    process's state with another's token, and each file is replaced whole
+    """
+    @contextmanager
+    def _cacheLock(self):
+        os.makedirs(self.cache, exist_ok=True)
+        with open(self.cache + self.token + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_cache(self):
+        if not self.cache:
+            return
+        with self._cacheLock():
+            super()._read_cache()
+
+    def _write_cache(self):
+        if not self.cache:
+            return
+        state = json.dumps(self.state, indent=2, sort_keys=True, default=state_default)
+        with self._cacheLock():
+            self._replace(self.cache + self.token + ".json", state)
+            self._replace(self.cache + self.token + ".sync", self.sync_token)
+
+    def _replace(self, path: str, contents: str) -> None:
+        """
+        writes a temp file of its own and moves it over path
+        """
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False,
+                                         prefix=os.path.basename(path) + ".") as temp_file:
+            try:
+                temp_file.write(contents)
+            except BaseException:
+                temp_file.close()
+                os.remove(temp_file.name)
+                raise
+        os.replace(temp_file.name, path)
@@ -0,0 +1,222 @@
+import asyncio
+from contextlib import asynccontextmanager
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+
+import aiohttp
+
+from .Project import Project
+from .TimeEntry import TimeEntry
+from .TogglTrack import TogglTrack
+
+
+class AsyncResponse:
+    """
+    The parts of an aiohttp response TogglTrack reads, read before the
+    connection goes back to the pool
+    """
+
+    def __init__(self, status_code: int, text: str, headers):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    def __str__(self) -> str:
+        return f"<Response [{self.status_code}]>"
+
+
+class AsyncTogglTrack(TogglTrack):
+    """
+    The asyncio version of TogglTrack, the changes are local until
+    `await sync()` is called which sends the pending creates, updates and
+    deletes concurrently(at most concurrency at a time) over one connection
+    pool. The pool lives for one call, so each asyncio.run gets its own
+    """
+
+    def __init__(self, workspace_id: int, api_token: int, concurrency: int=8, **kwargs):
+        """
+        initializes the API, takes the same arguments as TogglTrack plus
+         - concurrency: most requests in flight at once
+        """
+        super().__init__(workspace_id, api_token, **kwargs)
+        self._concurrency = concurrency
+        self._semaphore = None
+        self._async_session = None
+        # calls running on the current session
+        self._session_users = 0
+
+    async def __aenter__(self) -> "AsyncTogglTrack":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        closes the connection pool
+        """
+        if self._async_session is not None:
+            session, self._async_session = self._async_session, None
+            self._semaphore = None
+            await session.close()
+
+    @asynccontextmanager
+    async def _connection(self):
+        """
+        the session and semaphore of a call, made in the running loop and
+        closed when the last call using them ends. Both are bound to their
+        loop so they can not be kept across asyncio.run calls
+        """
+        if self._async_session is None:
+            self._async_session = self._createAsyncSession()
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        self._session_users += 1
+        try:
+            yield
+        finally:
+            self._session_users -= 1
+            if self._session_users == 0:
+                await self.close()
+
+    def _createAsyncSession(self) -> aiohttp.ClientSession:
+        """
+        one keep-alive session shared by every request of a call
+        """
+        connect_timeout, read_timeout = self._timeout
+        return aiohttp.ClientSession(
+            auth=aiohttp.BasicAuth(str(self._api_token), "api_token"),
+            connector=aiohttp.TCPConnector(limit=self._pool_size),
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+            headers={"Content-Type": "application/json"})
+
+    async def _send(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """
+        sends one request over the pooled session
+        """
+        async with self._async_session.request(method, url, **kwargs) as response:
+            return AsyncResponse(response.status, await response.text(), response.headers)
+
+    async def _requestAsync(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """
+        the asyncio _request, paced by the rate limiter and bounded by the
+        semaphore. Throttled requests are retried as _request retries them
+        """
+        for attempt in range(self._max_retries + 1):
+            await asyncio.sleep(self._rate_limiter.reserve())
+            async with self._semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await self._send(method, url, **kwargs)
+                except Exception:
+                    self._observeRequest(method, url, "error", start)
+                    raise
+                self._observeRequest(method, url, response.status_code, start)
+            delay = self._retryAfter(method, url, response, attempt)
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+
+    async def _gather(self, requests: List) -> None:
+        """
+        runs the requests together, every request finishes(and its result is
+        kept) before the first error is raised
+        """
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+    async def sync(self,
+                   projectOnly: bool=False,
+                   timeEntriesOnly: bool=False,
+                   projects: List[Project]=None,
+                   time_entries: List[TimeEntry]=None) -> None:
+        """
+        syncs up local and remote toggl instances, if allowSync is true.
+        Given projects and/or time_entries only their pending changes are
+        pushed, toggl's responses are applied locally and nothing is pulled
+        """
+        if not self._allowSync:
+            return
+        async with self._connection():
+            if projects is not None or time_entries is not None:
+                await self._gather(
+                    self._projectPushes(self._localProjects(projects or []))
+                    + self._timeEntryPushes(self._localTimeEntries(time_entries or [])))
+                self._saveSnapshot()
+            elif projectOnly:
+                await self._syncProjectsAsync()
+            elif timeEntriesOnly:
+                await self._syncTimeEntriesAsync()
+            else:
+                await self._syncProjectsAsync()
+                await self._syncTimeEntriesAsync()
+
+    async def getProjectWithNameOrCreate(self, name: str) -> Project:
+        """
+        gets a project with the specified name or creates a new project,
+        unsynced projects will have an id of -1
+        """
+        await self.sync(projectOnly=True)
+        for project in self.projects:
+            if project.name == name:
+                return project
+        return self.createProject(name=name)
+
+    async def _push(self, request: Tuple[str, str, Dict[str, Any]],
+                    apply: Callable[[str, AsyncResponse], None]) -> None:
+        """
+        sends one pending change and applies toggl's answer to it
+        """
+        method, url, kwargs = request
+        apply(method, await self._requestAsync(method, url, **kwargs))
+
+    def _projectPushes(self, projects: List[Project]) -> List:
+        pushes = []
+        for project in projects:
+            request = self._projectRequest(project)
+            if request is not None:
+                pushes.append(self._push(request, partial(self._applyProjectResponse, project)))
+        return pushes
+
+    def _timeEntryPushes(self, time_entries: List[TimeEntry]) -> List:
+        pushes = []
+        for entry in time_entries:
+            request = self._timeEntryRequest(entry)
+            if request is not None:
+                pushes.append(self._push(request, partial(self._applyTimeEntryResponse, entry)))
+        return pushes
+
+    async def _syncProjectsAsync(self) -> None:
+        """
+        sync projects, pushes the unsynced ones concurrently then pulls
+        """
+        await self._gather(self._projectPushes(self._pendingProjects()))
+        if self._projects_since is None:
+            response = await self._requestAsync("GET", self._workspace_url + "/projects")
+            projects_json = self._parseResponse(response)
+            self._startProjectRefresh()
+            self._applyProjects(projects_json)
+        else:
+            self._applyProjectChanges(await self._fetchChangesAsync(self._projects_since))
+        self._saveSnapshot()
+
+    async def _fetchChangesAsync(self, since: int) -> Dict[str, Any]:
+        response = await self._requestAsync("GET", self._me_url, params=self._changesParams(since))
+        return self._parseResponse(response)
+
+    async def _syncTimeEntriesAsync(self) -> None:
+        """
+        pushes the pending time entries concurrently then pulls
+        """
+        await self._gather(self._timeEntryPushes(self._pendingTimeEntries()))
+        if self._time_entries_since is not None:
+            self._applyTimeEntryChanges(await self._fetchChangesAsync(self._time_entries_since))
+        else:
+            response = await self._requestAsync("GET", self._time_entries_url,
+                                                params=self._timeWindowParams())
+            entries_json = self._parseResponse(response)
+            self._startTimeEntryRefresh()
+            self._applyTimeEntries(entries_json)
+        self._saveSnapshot()
@@ -10,6 +10,8 @@ class Project:
     id: int = -1
     workspace_id: int = -1
     active: bool = True
+    # set while the project is only local, until toggl gives it an id
+    temp_id: str = None
     to_delete = False
     synced = False
 
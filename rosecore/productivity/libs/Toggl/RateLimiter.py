@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    A thread safe token bucket, acquire() blocks until a request may be sent
+    so requests are paced to rate per second with bursts of up to capacity
+    """
+
+    def __init__(self, rate: float, capacity: float=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        takes a token, waiting for one if needed, returns the seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def reserve(self) -> float:
+        """
+        takes a token without waiting, returns the seconds the caller has to
+        wait before sending(used by the asyncio client to wait without blocking)
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class Unlimited:
+    """
+    A stand in for TokenBucket that never waits
+    """
+
+    def __init__(self, sleep=time.sleep):
+        self.sleep = sleep
+
+    def acquire(self) -> float:
+        return 0
+
+    def reserve(self) -> float:
+        return 0
@@ -16,19 +16,39 @@ class TimeEntry:
     tags: List[str] = None
     synced: bool = True
     to_delete: bool = False
+    # set while the entry is only local, until toggl gives it an id
+    temp_id: str = None
 
     def fromJson(self, jsonConfig) -> None:
-        self.description = jsonConfig["description"]
+        self.description = jsonConfig.get("description", "")
         self.start = parser.parse(jsonConfig["start"])
-        self.stop = parser.parse(jsonConfig["stop"])
+        # running entries have no stop yet
+        self.stop = parser.parse(jsonConfig["stop"]) if jsonConfig.get("stop") else None
         self.workspace_id = int(jsonConfig["wid"])
         if "pid" in jsonConfig:
             self.project_id = int(jsonConfig["pid"])
         if self.start.tzinfo is None or self.start.tzinfo.utcoffset(self.start) is None:
             self.start = pytz.utc.localize(self.start)
-        if self.stop.tzinfo is None or self.stop.tzinfo.utcoffset(self.stop) is None:
+        if self.stop is not None and (self.stop.tzinfo is None or self.stop.tzinfo.utcoffset(self.stop) is None):
             self.stop = pytz.utc.localize(self.stop)
-        self.tags = jsonConfig["tags"]
+        self.tags = jsonConfig.get("tags") or []
+
+    def toSnapshot(self):
+        """
+        json that fromJson can read back, used for the local snapshot
+        """
+        snapshot = {
+            "id": self.id,
+            "description": self.description,
+            "start": self.start.isoformat(),
+            "wid": self.workspace_id,
+            "tags": self.tags or []
+        }
+        if self.stop is not None:
+            snapshot["stop"] = self.stop.isoformat()
+        if self.project_id != -1:
+            snapshot["pid"] = self.project_id
+        return snapshot
 
     def toJson(self):
         returnJson =  {
@@ -0,0 +1,290 @@
+from datetime import date, datetime, timedelta
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pytz
+
+from .TimeEntry import TimeEntry
+
+
+class TimeEntryStore:
+    """
+    An append only, memory mapped columnar store of toggl time entries, each
+    column is a flat binary file of one numpy dtype. A changed entry is
+    appended again and the last row for an id wins, deleted entries get a
+    tombstone row. Descriptions and tag sets are interned to int ids
+    """
+    COLUMNS = {
+        "id": np.int64,
+        "start": np.int64,        # epoch seconds
+        "stop": np.int64,         # epoch seconds, -1 while running
+        "project": np.int64,      # toggl project id, -1 without a project
+        "workspace": np.int64,
+        "description": np.int32,  # index into the descriptions
+        "tagset": np.int32,       # index into the tag sets
+        "deleted": np.int8,
+    }
+    DAY = 86400
+    EPOCH = date(1970, 1, 1)
+
+    def __init__(self, path: str):
+        """
+        opens(or creates) the store kept in the directory path
+        """
+        self._path = path
+        self._lock = threading.RLock()
+        self._latest_cache = None
+        self._descriptions = []
+        self._tagsets = []
+        self._description_ids = {}
+        self._tagset_ids = {}
+        self._vocabulary_version = None
+        self._loadVocabulary()
+
+    def __len__(self) -> int:
+        return self._rows()
+
+    def append(self, entries: Iterable[TimeEntry], deleted_ids: Iterable[int]=()) -> int:
+        """
+        appends the entries, and tombstones for deleted_ids, that differ from
+        what the store already has. returns the rows written
+        """
+        entries = [entry for entry in entries if entry.id != -1]
+        deleted_ids = [int(id) for id in deleted_ids]
+        if not entries and not deleted_ids:
+            return 0
+        with self._lock:
+            self._loadVocabulary()
+            vocabulary_size = (len(self._descriptions), len(self._tagsets))
+            tombstones = len(deleted_ids)
+            columns = {
+                "id": [entry.id for entry in entries] + deleted_ids,
+                "start": [self._epoch(entry.start) for entry in entries] + [0] * tombstones,
+                "stop": [self._epoch(entry.stop) if entry.stop is not None else -1
+                         for entry in entries] + [0] * tombstones,
+                "project": [entry.project_id if entry.project_id is not None else -1
+                            for entry in entries] + [-1] * tombstones,
+                "workspace": [entry.workspace_id for entry in entries] + [-1] * tombstones,
+                "description": [self._internDescription(entry.description or "")
+                                for entry in entries] + [-1] * tombstones,
+                "tagset": [self._internTagset(entry.tags) for entry in entries] + [-1] * tombstones,
+                "deleted": [0] * len(entries) + [1] * tombstones,
+            }
+            columns = self._changedRows({
+                name: np.asarray(values, dtype=TimeEntryStore.COLUMNS[name])
+                for name, values in columns.items()
+            })
+            written = len(columns["id"])
+            if written == 0:
+                return 0
+            os.makedirs(self._path, exist_ok=True)
+            if (len(self._descriptions), len(self._tagsets)) != vocabulary_size:
+                self._saveVocabulary()
+            rows = self._rows()
+            for name, dtype in TimeEntryStore.COLUMNS.items():
+                column_path = self._columnPath(name)
+                # drops any rows of an append that was cut short
+                if os.path.exists(column_path):
+                    os.truncate(column_path, rows * np.dtype(dtype).itemsize)
+                with open(column_path, "ab") as column_file:
+                    column_file.write(columns[name].tobytes())
+            return written
+
+    def by_project(self, since: datetime=None, until: datetime=None) -> Dict[int, int]:
+        """
+        seconds tracked per toggl project id(-1 for no project), for
+        entries started between since and until
+        """
+        selected = self._select(since, until)
+        return self._groupSum(selected["project"], selected["duration"])
+
+    def by_day(self, since: datetime=None, until: datetime=None, project: int=None) -> Dict[date, int]:
+        """
+        seconds tracked per utc day the entries started on
+        """
+        selected = self._select(since, until, project)
+        days = self._groupSum(selected["start"] // TimeEntryStore.DAY, selected["duration"])
+        return {TimeEntryStore.EPOCH + timedelta(days=day): seconds for day, seconds in days.items()}
+
+    def by_week(self, since: datetime=None, until: datetime=None, project: int=None) -> Dict[date, int]:
+        """
+        seconds tracked per week(keyed by its monday) the entries started in
+        """
+        selected = self._select(since, until, project)
+        # the epoch was a thursday, so weeks are counted from the monday before it
+        weeks = self._groupSum((selected["start"] // TimeEntryStore.DAY + 3) // 7, selected["duration"])
+        return {TimeEntryStore.EPOCH + timedelta(days=week * 7 - 3): seconds
+                for week, seconds in weeks.items()}
+
+    def by_tag(self, since: datetime=None, until: datetime=None, project: int=None) -> Dict[str, int]:
+        """
+        seconds tracked per tag, an entry counts towards each of its tags
+        """
+        selected = self._select(since, until, project)
+        tags = {}
+        for tagset, seconds in self._groupSum(selected["tagset"], selected["duration"]).items():
+            for tag in self._tagsets[tagset]:
+                tags[tag] = tags.get(tag, 0) + seconds
+        return tags
+
+    def _select(self, since: datetime=None, until: datetime=None, project: int=None) -> Dict[str, np.ndarray]:
+        """
+        the live entries started between since and until, with their durations
+        """
+        with self._lock:
+            self._loadVocabulary()
+        latest = self._latest()
+        mask = latest["deleted"] == 0
+        if since is not None:
+            mask &= latest["start"] >= self._epoch(since)
+        if until is not None:
+            mask &= latest["start"] < self._epoch(until)
+        if project is not None:
+            mask &= latest["project"] == project
+        selected = {name: column[mask] for name, column in latest.items()}
+        selected["duration"] = np.where(selected["stop"] >= 0, selected["stop"] - selected["start"], 0)
+        return selected
+
+    def _latest(self) -> Dict[str, np.ndarray]:
+        """
+        the last row of every id, kept until more rows are appended
+        """
+        with self._lock:
+            rows = self._rows()
+            if self._latest_cache is not None and self._latest_cache[0] == rows:
+                return self._latest_cache[1]
+            columns = {name: self._column(name, rows) for name in TimeEntryStore.COLUMNS}
+            # unique keeps the first match, so the reversed ids give the last row of each id
+            last = np.sort(rows - 1 - np.unique(columns["id"][::-1], return_index=True)[1])
+            latest = {name: np.asarray(column[last]) for name, column in columns.items()}
+            self._latest_cache = (rows, latest)
+            return latest
+
+    def _changedRows(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        drops the rows that match the latest row of their id, and tombstones
+        for ids the store never had
+        """
+        latest = self._latest()
+        found = np.zeros(len(columns["id"]), dtype=bool)
+        same = np.zeros(len(columns["id"]), dtype=bool)
+        if len(latest["id"]):
+            order = np.argsort(latest["id"])
+            sorted_ids = latest["id"][order]
+            positions = np.minimum(np.searchsorted(sorted_ids, columns["id"]), len(sorted_ids) - 1)
+            found = sorted_ids[positions] == columns["id"]
+            rows = order[positions]
+            same = found.copy()
+            for name, column in columns.items():
+                same &= latest[name][rows] == column
+        keep = ~same & ~((columns["deleted"] == 1) & ~found)
+        return {name: column[keep] for name, column in columns.items()}
+
+    def _rows(self) -> int:
+        """
+        the complete rows, the shortest column wins
+        """
+        rows = []
+        for name, dtype in TimeEntryStore.COLUMNS.items():
+            column_path = self._columnPath(name)
+            size = os.path.getsize(column_path) if os.path.exists(column_path) else 0
+            rows.append(size // np.dtype(dtype).itemsize)
+        return min(rows)
+
+    def _column(self, name: str, rows: int) -> np.ndarray:
+        dtype = TimeEntryStore.COLUMNS[name]
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._columnPath(name), dtype=dtype, mode="r", shape=(rows,))
+
+    def _internDescription(self, description: str) -> int:
+        if description not in self._description_ids:
+            self._description_ids[description] = len(self._descriptions)
+            self._descriptions.append(description)
+        return self._description_ids[description]
+
+    def _internTagset(self, tags: Optional[List[str]]) -> int:
+        tagset = tuple(sorted(set(tags or [])))
+        if tagset not in self._tagset_ids:
+            self._tagset_ids[tagset] = len(self._tagsets)
+            self._tagsets.append(tagset)
+        return self._tagset_ids[tagset]
+
+    def _loadVocabulary(self) -> None:
+        """
+        (re)loads the interned descriptions and tag sets if another process
+        has written new ones, there is only ever one writer(the sync)
+        """
+        vocabulary_path = self._vocabularyPath()
+        if not os.path.exists(vocabulary_path):
+            return
+        version = os.stat(vocabulary_path).st_mtime_ns
+        if version == self._vocabulary_version:
+            return
+        with open(vocabulary_path) as vocabulary_file:
+            vocabulary = json.load(vocabulary_file)
+        self._descriptions = vocabulary["descriptions"]
+        self._tagsets = [tuple(tagset) for tagset in vocabulary["tagsets"]]
+        self._description_ids = {description: i for i, description in enumerate(self._descriptions)}
+        self._tagset_ids = {tagset: i for i, tagset in enumerate(self._tagsets)}
+        self._vocabulary_version = version
+
+    def _saveVocabulary(self) -> None:
+        """
+        written before the rows that use it
+        """
+        # a temp file of its own, the web and worker processes share the directory
+        with tempfile.NamedTemporaryFile("w", dir=self._path, prefix="vocabulary.", suffix=".tmp",
+                                         delete=False) as vocabulary_file:
+            try:
+                json.dump({
+                    "descriptions": self._descriptions,
+                    "tagsets": [list(tagset) for tagset in self._tagsets],
+                }, vocabulary_file)
+            except BaseException:
+                vocabulary_file.close()
+                os.remove(vocabulary_file.name)
+                raise
+        os.replace(vocabulary_file.name, self._vocabularyPath())
+        self._vocabulary_version = os.stat(self._vocabularyPath()).st_mtime_ns
+
+    def _columnPath(self, name: str) -> str:
+        return os.path.join(self._path, name + ".bin")
+
+    def _vocabularyPath(self) -> str:
+        return os.path.join(self._path, "vocabulary.json")
+
+    @staticmethod
+    def _groupSum(keys: np.ndarray, values: np.ndarray) -> Dict[int, int]:
+        if len(keys) == 0:
+            return {}
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=values, minlength=len(unique))
+        return {int(key): int(total) for key, total in zip(unique, sums)}
+
+    @staticmethod
+    def _epoch(value) -> int:
+        if isinstance(value, datetime):
+            if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:
+                value = pytz.utc.localize(value)
+            return int(value.timestamp())
+        return int(value)
+
+
+def rollup(totals: Dict[int, int], parents: Dict[int, Optional[int]]) -> Dict[int, int]:
+    """
+    adds every project's total to all of its ancestors, so each project's
+    total covers its whole subtree. parents maps a project to its parent(or None)
+    """
+    rolled = {project: 0 for project in parents}
+    for project, total in totals.items():
+        seen = set()
+        while project is not None and project not in seen:
+            seen.add(project)
+            rolled[project] = rolled.get(project, 0) + total
+            project = parents.get(project)
+    return rolled
@@ -1,13 +1,23 @@
 from datetime import datetime
 import requests
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from .Exceptions import APIThrottled
+from .RateLimiter import TokenBucket, Unlimited
 from .Project import Project
 from .TimeEntry import TimeEntry
 from copy import copy
 import json
+from email.utils import parsedate_to_datetime
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
 
 from datetime import timedelta
 import pytz
@@ -16,45 +26,194 @@ class TogglTrack:
     """
     The main API class for toggl track for rosecore, the changes are local until sync() is called
     """
+    # seconds the since timestamp is moved back to cover clock skew, re-fetching is harmless
+    SINCE_OVERLAP = 60
     
     def __init__(self,
                  workspace_id: int,
                  api_token: int,
                  time_delta:timedelta=timedelta(weeks=1),
-                 allowSync:bool=True):
+                 allowSync:bool=True,
+                 snapshot_path: str=None,
+                 pool_size: int=10,
+                 timeout: Tuple[float, float]=(5, 30),
+                 rate_limit: float=None,
+                 burst: int=1,
+                 max_retries: int=5,
+                 backoff: float=1.0,
+                 time_entry_sink: Callable[[List[TimeEntry], List[int]], None]=None,
+                 api_url: str="https://api.track.toggl.com/api/v8",
+                 request_observer: Callable[[str, str, Any, float], None]=None):
         """
         initializes the API
          - workspace_id: id of workspace
          - api_token: id token for toggl api
          - allowSync: passes sync messages to toggl
+         - snapshot_path: json file the last synced state is kept in, once
+           a snapshot exists syncs only pull what changed since it
+         - pool_size: most keep-alive connections kept open to toggl
+         - timeout: (connect, read) timeout in seconds for every request
+         - rate_limit: most requests per second sent to toggl(None is unpaced),
+           with bursts of up to burst requests
+         - max_retries: times a throttled(429) request is retried before
+           APIThrottled is raised
+         - backoff: base seconds of the jittered exponential backoff between retries
+         - time_entry_sink: called with the time entries every pull brings
+           back and the ids toggl deleted(e.g. TimeEntryStore.append)
+         - api_url: the root of the toggl v8 api
+         - request_observer: called after every request(and retry) with the
+           method, the path under api_url, the status("error" if there was no
+           response) and the seconds it took
         """
         self._workspace_id = workspace_id
         self._api_token = api_token
         self._allowSync = allowSync
+        # remote projects by id, pending creates by temp id, and the live
+        # (not deleted) projects by id or temp id and by name
         self._projects = {}
-        self._new_projects=[]
-        self._main_url = "https://api.track.toggl.com/api/v8"
+        self._new_projects = {}
+        self._live_projects = {}
+        self._project_names = {}
+        self._main_url = api_url.rstrip("/")
         self._project_url = self._main_url + "/projects"
         self._workspace_url = self._main_url + "/workspaces/" + str(self._workspace_id)
         self._time_entries_url = self._main_url + "/time_entries"
-        self._new_time_entries=[]
-        self._time_entries={}
+        self._new_time_entries = {}
+        self._time_entries = {}
+        self._live_time_entries = {}
+        self._new_entry_descriptions = {}
         self._time_delta = time_delta
+        self._me_url = self._main_url + "/me"
+        self._projects_since = None
+        self._time_entries_since = None
+        self._snapshot_path = snapshot_path
+        # when the snapshot this state came from(or went to) was written
+        self._snapshot_mtime = None
+        # guards the live indexes, request threads read them while a reload
+        # or a pull replaces them
+        self._state_lock = threading.RLock()
+        self._timeout = timeout
+        self._pool_size = pool_size
+        self._session = self._createSession(pool_size)
+        self._rate_limiter = TokenBucket(rate_limit, burst) if rate_limit else Unlimited()
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._throttle_lock = threading.Lock()
+        self._time_entry_sink = time_entry_sink
+        self._request_observer = request_observer
+        self.throttle_count = 0
+        self._loadSnapshot()
+
+    def _createSession(self, pool_size: int) -> requests.Session:
+        """
+        one keep-alive, gzip session shared by every request so connections
+        (and their TLS handshakes) are reused
+        """
+        session = requests.Session()
+        session.auth = HTTPBasicAuth(self._api_token, "api_token")
+        session.headers.update({
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _request(self, method: str, url: str, **kwargs):
+        """
+        sends a request over the shared session with the configured timeouts,
+        paced by the rate limiter. Throttled requests are retried with backoff,
+        the last throttled response is returned if every retry is used up
+        """
+        for attempt in range(self._max_retries + 1):
+            self._rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self._session.request(method, url, timeout=self._timeout, **kwargs)
+            except Exception:
+                self._observeRequest(method, url, "error", start)
+                raise
+            self._observeRequest(method, url, response.status_code, start)
+            delay = self._retryAfter(method, url, response, attempt)
+            if delay is None:
+                return response
+            self._rate_limiter.sleep(delay)
+
+    def _retryAfter(self, method: str, url: str, response, attempt: int) -> Optional[float]:
+        """
+        the retry policy shared with AsyncTogglTrack, None if the response
+        is the answer, or else the seconds to wait before the next attempt.
+        Throttled responses are counted and retried until the retries run out
+        """
+        if response.status_code != 429:
+            return None
+        with self._throttle_lock:
+            self.throttle_count += 1
+        if attempt >= self._max_retries:
+            return None
+        delay = self._retryDelay(response, attempt)
+        logging.info(f"toggl throttled {method} {url}, retrying in {delay:.1f}s")
+        return delay
+
+    def _observeRequest(self, method: str, url: str, status, start: float) -> None:
+        if self._request_observer is not None:
+            path = url[len(self._main_url):] if url.startswith(self._main_url) else url
+            self._request_observer(method, path, status, time.perf_counter() - start)
+
+    def _retryDelay(self, response, attempt: int) -> float:
+        """
+        seconds to wait before retrying a throttled request, the exponential
+        backoff is jittered and never shorter than a Retry-After header
+        """
+        delay = self._backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = max(delay, retry_at.timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return delay
 
     @property
     def projects(self) -> List[Project]:
         """
-        Gets projects that are not to be deleted, and included ones to be created
+        Gets projects that are not to be deleted, and included ones to be created,
+        a copy that is safe to iterate while the state is reloaded
         """
-        projects = copy(self._new_projects)
-        projects.extend([project for id, project in self._projects.items() if not project.to_delete])
-        return projects
+        with self._state_lock:
+            return list(self._live_projects.values())
 
     @property
     def time_entries(self) -> List[TimeEntry]:
-        entries = copy(self._new_time_entries)
-        entries.extend([entry for id, entry in self._time_entries.items() if not entry.to_delete])
-        return entries
+        with self._state_lock:
+            return list(self._live_time_entries.values())
+
+    def getProject(self, id) -> Optional[Project]:
+        """
+        gets the live project with the id(an int or a str), None if there is none
+        """
+        try:
+            return self._live_projects.get(int(id))
+        except (TypeError, ValueError):
+            return None
+
+    def getProjectByName(self, name: str) -> Optional[Project]:
+        return self._project_names.get(name)
+
+    def getTimeEntry(self, id) -> Optional[TimeEntry]:
+        """
+        gets the live time entry with the id(an int or a str), None if there is none
+        """
+        try:
+            return self._live_time_entries.get(int(id))
+        except (TypeError, ValueError):
+            return None
 
     def createProject(self, name: str) -> Project:
         """
@@ -63,7 +222,9 @@ class TogglTrack:
         newProject = Project()
         newProject.name = name
         newProject.workspace_id = self._workspace_id
-        self._new_projects.append(newProject)
+        newProject.temp_id = uuid.uuid4().hex
+        self._new_projects[newProject.temp_id] = newProject
+        self._indexProject(newProject)
         return newProject
         
 
@@ -71,27 +232,77 @@ class TogglTrack:
         """
         Updates a projects name
         """
-        if project.id in self._projects:
-            self._projects[project.id].name = newName
-            self._projects[project.id].synced = False
-        elif project.name in [m_project.name for m_project in self._new_projects]:
-            index = [m_project.name for m_project in self._new_projects].index(project.name)
-            project = self._new_projects[index]
-            project.name = newName
-            project.synced = False
-        else:
-            raise ValueError(f"Project:{project.name} is not a known project")
+        local = self._localProject(project)
+        if local is None:
+            local = self._project_names.get(project.name)
+            if local is None or not self._isNewProject(local):
+                raise ValueError(f"Project:{project.name} is not a known project")
+        self._unindexProject(local)
+        local.name = newName
+        local.synced = False
+        self._indexProject(local)
 
     def deleteProject(self, project: Project) -> None:
         """
         Deletes a project
         """
-        if project.id in self._projects:
-            self._projects[project.id].to_delete = True
-        elif project in self._new_projects:
-            self._new_projects.remove(project)
-        else:
+        local = self._localProject(project)
+        if local is None:
             raise ValueError(f"Project:{project.name} is not a known project")
+        self._unindexProject(local)
+        if self._isNewProject(local):
+            del self._new_projects[local.temp_id]
+        else:
+            local.to_delete = True
+
+    def _isNewProject(self, project: Project) -> bool:
+        return project.temp_id is not None and self._new_projects.get(project.temp_id) is project
+
+    def _localProject(self, project: Project) -> Optional[Project]:
+        """
+        the locally kept project for a project, by temp id then id
+        """
+        if project.temp_id in self._new_projects:
+            return self._new_projects[project.temp_id]
+        return self._projects.get(project.id)
+
+    def _projectKey(self, project: Project):
+        return project.temp_id if self._isNewProject(project) else project.id
+
+    def _indexProject(self, project: Project) -> None:
+        with self._state_lock:
+            self._live_projects[self._projectKey(project)] = project
+            self._project_names[project.name] = project
+
+    def _unindexProject(self, project: Project) -> None:
+        key = self._projectKey(project)
+        with self._state_lock:
+            if self._live_projects.get(key) is project:
+                del self._live_projects[key]
+            if self._project_names.get(project.name) is project:
+                del self._project_names[project.name]
+
+    def _reindexProjects(self) -> None:
+        """
+        rebuilds the live and name indexes, only after the projects are replaced
+        """
+        live_projects, project_names = self._projectIndexes(self._projects)
+        with self._state_lock:
+            self._live_projects = live_projects
+            self._project_names = project_names
+
+    def _projectIndexes(self, projects: Dict[int, Project]) -> Tuple[Dict[Any, Project], Dict[str, Project]]:
+        """
+        the live and name indexes of the remote projects and the new ones,
+        built aside so they can be swapped in at once
+        """
+        live_projects = {}
+        project_names = {}
+        for project in [project for project in projects.values() if not project.to_delete] \
+                + list(self._new_projects.values()):
+            live_projects[self._projectKey(project)] = project
+            project_names[project.name] = project
+        return live_projects, project_names
 
     def getProjectWithNameOrCreate(self, name: str) -> Project:
         """
@@ -109,23 +320,67 @@ class TogglTrack:
         Gets all projects from external URL, does not check allowSync
         """
         if refresh:
-            self._projects = {}
-        response = requests.get(self._workspace_url + "/projects",
-                                auth=HTTPBasicAuth(self._api_token, "api_token"))
-        projects_json = self._parseResponse(response)
+            self._startProjectRefresh()
+        response = self._request("GET", self._workspace_url + "/projects")
+        self._applyProjects(self._parseResponse(response))
+
+    def _startProjectRefresh(self) -> None:
+        """
+        drops the local projects ahead of a full pull
+        """
+        self._projects = {}
+        self._projects_since = int(time.time()) - TogglTrack.SINCE_OVERLAP
+        self._reindexProjects()
+
+    def _applyProjects(self, projects_json: List[Dict[str, Any]]) -> None:
+        """
+        stores the projects of a full pull
+        """
         if projects_json is not None:
             for project_json in projects_json:
-                project = Project()
-                project.fromJson(project_json)
-                project.synced=True
-                self._projects[project.id] = project
-        
-    def sync(self, projectOnly: bool=False, timeEntriesOnly: bool=False) -> None:
+                self._addRemoteProject(project_json)
+
+    def _addRemoteProject(self, project_json: Dict[str, Any]) -> Project:
+        """
+        stores a project as toggl sent it back
+        """
+        project = self._parseToProject(project_json)
+        project.synced = True
+        self._dropRemoteProject(project.id)
+        self._projects[project.id] = project
+        self._indexProject(project)
+        return project
+
+    def _dropRemoteProject(self, id: int) -> None:
+        project = self._projects.pop(id, None)
+        if project is not None:
+            self._unindexProject(project)
+
+    def _projectPayload(self, project: Project) -> str:
+        """
+        the json body toggl expects when creating or updating a project
         """
-        syncs up local and remote toggl instances, if allowSync is true
+        return json.dumps({"project": {
+            "name": project.name,
+            "wid": project.workspace_id
+        }})
+
+    def sync(self,
+             projectOnly: bool=False,
+             timeEntriesOnly: bool=False,
+             projects: List[Project]=None,
+             time_entries: List[TimeEntry]=None) -> None:
+        """
+        syncs up local and remote toggl instances, if allowSync is true.
+        Given projects and/or time_entries only their pending changes are
+        pushed, toggl's responses are applied locally and nothing is pulled
         """
         if self._allowSync:
-            if projectOnly:
+            if projects is not None or time_entries is not None:
+                self._pushProjects(self._localProjects(projects or []))
+                self._pushTimeEntries(self._localTimeEntries(time_entries or []))
+                self._saveSnapshot()
+            elif projectOnly:
                 self._syncProjects()
             elif timeEntriesOnly:
                 self._sync_time_entries()
@@ -137,60 +392,203 @@ class TogglTrack:
         """
         Creates the projects in remote and stores them in the _projects
         """
-        for new_project_config in self._new_projects:
-            response = requests.post(self._project_url,
-                                     auth=HTTPBasicAuth(self._api_token, "api_token"),
-                                     data=json.dumps({"project": {
-                                         "name": new_project_config.name,
-                                         "wid": new_project_config.workspace_id
-                                     }}),
-                                     headers={
-                                         "Content-Type": "application/json"
-                                     })
-            new_project = self._parseToProject(self._parseResponse(response))
-            new_project.synced=True
-            self._projects[new_project.id] = new_project
+        self._pushProjects(list(self._new_projects.values()))
 
     def _syncProjects(self) -> None:
         """
         sync projects, pushes unsynced then pulls
         """
-        unsyncedProjects = [project for id, project in self._projects.items() if not project.synced]
-        for project in unsyncedProjects:
-            response = requests.put(self._project_url + "/" + str(project.id),
-                                     auth=HTTPBasicAuth(self._api_token, "api_token"),
-                                    data = json.dumps({"project": {
-                                        "name": project.name,
-                                        "wid": project.workspace_id
-                                    }}),
-                                    headers={
-                                        "Content-Type": "application/json"
-                                    })
-            # I do not update the projects dict because its about to be refresshed
-            self._parseResponse(response)
-        deleteProjects = [project for id, project in self._projects.items() if project.to_delete]
-        for project in deleteProjects:
-            response = requests.delete(
-                self._project_url + "/" + str(project.id),
-                auth=HTTPBasicAuth(self._api_token, "api_token"),
-                headers={
-                    "Content-Type": "application/json"
-                })
-            self._parseResponse(response)
-                
-        for project in self._new_projects:
-            response = requests.post(self._project_url,
-                                     auth=HTTPBasicAuth(self._api_token, "api_token"),
-                                     data=json.dumps({"project": {
-                                         "name": project.name,
-                                         "wid": project.workspace_id
-                                     }}),
-                                     headers={
-                                         "Content-Type": "application/json"
-                                     })
-            self._parseResponse(response)
-        self._new_projects.clear()
-        self._getProjects(refresh=True)
+        self._pushProjects(self._pendingProjects())
+        if self._projects_since is None:
+            self._getProjects(refresh=True)
+        else:
+            self._getProjectChanges()
+        self._saveSnapshot()
+
+    def _pendingProjects(self) -> List[Project]:
+        """
+        the projects with changes to push, updates then deletes then creates
+        """
+        updates = [project for project in self._projects.values()
+                   if not project.synced and not project.to_delete]
+        deletes = [project for project in self._projects.values() if project.to_delete]
+        return updates + deletes + list(self._new_projects.values())
+
+    def _localProjects(self, projects: List[Project]) -> List[Project]:
+        """
+        the locally kept projects for the given ones, unknown projects are skipped
+        """
+        local = [self._localProject(project) for project in projects]
+        return [project for project in local if project is not None]
+
+    def _pushProjects(self, projects: List[Project]) -> None:
+        """
+        pushes the changes of each project one after another
+        """
+        for project in projects:
+            request = self._projectRequest(project)
+            if request is not None:
+                method, url, kwargs = request
+                self._applyProjectResponse(project, method, self._request(method, url, **kwargs))
+
+    def _projectRequest(self, project: Project) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """
+        the (method, url, request arguments) that pushes a project's pending
+        change, None if it has none
+        """
+        if self._isNewProject(project):
+            return "POST", self._project_url, {"data": self._projectPayload(project)}
+        if project.to_delete:
+            return "DELETE", self._project_url + "/" + str(project.id), {}
+        if not project.synced:
+            return "PUT", self._project_url + "/" + str(project.id), {"data": self._projectPayload(project)}
+        return None
+
+    def _applyProjectResponse(self, project: Project, method: str, response) -> None:
+        """
+        applies toggl's answer to a pushed project to the local state, a
+        created project keeps its object and gets its real id
+        """
+        result = self._parseResponse(response)
+        if method == "DELETE":
+            self._dropRemoteProject(project.id)
+            return
+        data = result.get("data") if isinstance(result, dict) else None
+        self._unindexProject(project)
+        if method == "POST":
+            del self._new_projects[project.temp_id]
+        if data:
+            project.fromJson(data)
+        project.synced = True
+        if method == "POST":
+            self._dropRemoteProject(project.id)
+            self._projects[project.id] = project
+        self._indexProject(project)
+
+    def _getProjectChanges(self) -> None:
+        """
+        pulls only the projects changed since the last pull
+        """
+        self._applyProjectChanges(self._fetchChanges(self._projects_since))
+
+    def _applyProjectChanges(self, changes: Dict[str, Any]) -> None:
+        """
+        applies the projects of a since pull, removed ones are dropped
+        """
+        for project_json in changes["data"].get("projects") or []:
+            project_id = project_json["id"]
+            if (project_json.get("server_deleted_at") or not project_json.get("active", True)
+                or project_json.get("wid") != self._workspace_id):
+                self._dropRemoteProject(project_id)
+                continue
+            self._addRemoteProject(project_json)
+        self._projects_since = changes["since"]
+
+    def _fetchChanges(self, since: int) -> Dict[str, Any]:
+        """
+        gets everything that changed remotely after the unix timestamp since,
+        deleted objects come back with a server_deleted_at
+        """
+        response = self._request("GET", self._me_url, params=self._changesParams(since))
+        return self._parseResponse(response)
+
+    def _changesParams(self, since: int) -> Dict[str, Any]:
+        return {
+            "with_related_data": "true",
+            "since": since
+        }
+
+    def reloadSnapshot(self) -> bool:
+        """
+        re-reads the snapshot if another process(ie the job worker) wrote it
+        since this state was read or written, unless changes are waiting to
+        be pushed. returns whether it was reloaded
+        """
+        mtime = self._snapshotMtime()
+        if mtime is None or mtime == self._snapshot_mtime:
+            return False
+        if self._pendingProjects() or self._pendingTimeEntries():
+            return False
+        self._loadSnapshot()
+        return True
+
+    def _snapshotMtime(self) -> Optional[int]:
+        if self._snapshot_path is None:
+            return None
+        try:
+            return os.stat(self._snapshot_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _loadSnapshot(self) -> None:
+        """
+        loads the last synced state from the snapshot file, if there is one
+        """
+        if self._snapshot_path is None or not os.path.exists(self._snapshot_path):
+            return
+        self._snapshot_mtime = self._snapshotMtime()
+        projects = {}
+        time_entries = {}
+        projects_since = None
+        time_entries_since = None
+        try:
+            with open(self._snapshot_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            for project_json in snapshot["projects"]:
+                project = self._parseToProject(project_json)
+                project.synced = True
+                projects[project.id] = project
+            for entry_json in snapshot["time_entries"]:
+                entry = TimeEntry()
+                entry.fromJson(entry_json)
+                entry.id = int(entry_json["id"])
+                time_entries[entry.id] = entry
+            projects_since = snapshot["projects_since"]
+            time_entries_since = snapshot["time_entries_since"]
+        except (ValueError, KeyError, TypeError) as error:
+            logging.warning(f"ignoring unreadable toggl snapshot {self._snapshot_path}: {error}")
+            projects = {}
+            time_entries = {}
+        # built aside and swapped in at once, so readers never see half a reload
+        live_projects, project_names = self._projectIndexes(projects)
+        live_time_entries, new_entry_descriptions = self._timeEntryIndexes(time_entries)
+        with self._state_lock:
+            self._projects = projects
+            self._time_entries = time_entries
+            self._projects_since = projects_since
+            self._time_entries_since = time_entries_since
+            self._live_projects = live_projects
+            self._project_names = project_names
+            self._live_time_entries = live_time_entries
+            self._new_entry_descriptions = new_entry_descriptions
+
+    def _saveSnapshot(self) -> None:
+        """
+        writes the synced state to the snapshot file
+        """
+        if self._snapshot_path is None:
+            return
+        snapshot = {
+            "projects_since": self._projects_since,
+            "time_entries_since": self._time_entries_since,
+            "projects": [project.toJson() for project in self._projects.values()
+                         if project.synced and not project.to_delete],
+            "time_entries": [entry.toSnapshot() for entry in self._time_entries.values()
+                             if entry.synced and not entry.to_delete],
+        }
+        directory = os.path.dirname(self._snapshot_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # a temp file of its own, the web and worker processes share the directory
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False,
+                                         prefix=os.path.basename(self._snapshot_path) + ".") as snapshot_file:
+            try:
+                json.dump(snapshot, snapshot_file)
+            except BaseException:
+                snapshot_file.close()
+                os.remove(snapshot_file.name)
+                raise
+        os.replace(snapshot_file.name, self._snapshot_path)
+        self._snapshot_mtime = self._snapshotMtime()
         
     
     def _parseToProject(self, projectConfig: Dict[str,Any]) -> Project:
@@ -219,10 +617,12 @@ class TogglTrack:
         NOTE: THIS IS NOT A VALID ID, TESTING ONLY
         NOTE: MAY OVERRIDE EXISTING PROJECTS
         """
-        if project in self._new_projects:
+        if self._isNewProject(project):
+            self._unindexProject(project)
+            del self._new_projects[project.temp_id]
             project.id = id
             self._projects[id] = project
-            self._new_projects.remove(project)
+            self._indexProject(project)
         else:
             raise ValueError(f"{project.name} is not a known project")
 
@@ -241,7 +641,9 @@ class TogglTrack:
         time_entry.project_id = project_id
         time_entry.tags = copy(tag_names)
         time_entry.synced = False
-        self._new_time_entries.append(time_entry)
+        time_entry.temp_id = uuid.uuid4().hex
+        self._new_time_entries[time_entry.temp_id] = time_entry
+        self._indexTimeEntry(time_entry)
         return time_entry
 
     def update_time_entry(self,
@@ -254,81 +656,172 @@ class TogglTrack:
         """
         Updates a time entry
         """
-        id = time_entry.id
-        if time_entry.id in self._time_entries:
-            self._time_entries[id].synced = False
-            if description is not None:
-                self._time_entries[id].description = description
-            if tags is not None:
-                self._time_entries[id].tags = copy(tags)
-            if start_time is not None:
-                self._time_entries[id].start = start_time
-            if stop_time is not None:
-                self._time_entries[id].stop = stop_time
-            if project_id is not None:
-                self._time_entries[id].project_id = project_id
-        elif time_entry.description in [entry.description for entry in self._new_time_entries]:
-            index = [entry.description for entry in self._new_time_entries].index(time_entry.description)
-            entry = self._new_time_entries[index]
-            entry.synced = False
-            if description is not None:
-                entry.description = description
-            if tags is not None:
-                entry.tags = copy(tags)
-            if start_time is not None:
-                entry.start = start_time
-            if stop_time is not None:
-                entry.stop = stop_time
-            if project_id is not None:
-                entry.project_id = project_id
-        else:
+        entry = self._localTimeEntry(time_entry)
+        if entry is None:
             raise ValueError(f"Time Entry {time_entry.id}, {time_entry.description} is not known")
+        self._unindexTimeEntry(entry)
+        entry.synced = False
+        if description is not None:
+            entry.description = description
+        if tags is not None:
+            entry.tags = copy(tags)
+        if start_time is not None:
+            entry.start = start_time
+        if stop_time is not None:
+            entry.stop = stop_time
+        if project_id is not None:
+            entry.project_id = project_id
+        self._indexTimeEntry(entry)
         
     def delete_time_entry(self, time_entry: TimeEntry) -> None:
         """
         Deletes a time Entry
         """
-        if time_entry.id in self._time_entries:
-            self._time_entries[time_entry.id].to_delete = True
-        elif time_entry.description in [entry.description for entry in self._new_time_entries]:
-            entry = [entry for entry in self._new_time_entries
-                     if entry.description == time_entry.description][0]
-            self._new_time_entries.remove(entry)
-        else:
+        entry = self._localTimeEntry(time_entry)
+        if entry is None:
             raise ValueError("Time Entry {time_entry.description} is not known")
+        self._unindexTimeEntry(entry)
+        if self._isNewTimeEntry(entry):
+            del self._new_time_entries[entry.temp_id]
+        else:
+            entry.to_delete = True
             
     def stop_time_entry(self, time_entry: TimeEntry) -> None:
         """
         Stops a time entry
         """
-        if time_entry.id in self._time_entries:
-            self._time_entries[time_entry.id].stop = datetime.now()
-        elif time_entry.description in [entry.description for entry in self._new_time_entries]:
-            entry = [entry for entry in self._new_time_entries
-                     if entry.description == time_entry.description][0]
-            entry.stop = datetime.now()
-        else:
+        entry = self._localTimeEntry(time_entry)
+        if entry is None:
             raise ValueError("Time Entry {time_entry.description} is not known")
+        entry.stop = datetime.now()
+
+    def _isNewTimeEntry(self, time_entry: TimeEntry) -> bool:
+        return time_entry.temp_id is not None and self._new_time_entries.get(time_entry.temp_id) is time_entry
+
+    def _localTimeEntry(self, time_entry: TimeEntry) -> Optional[TimeEntry]:
+        """
+        the locally kept time entry for a time entry, by temp id, then id,
+        then the description of a pending entry
+        """
+        if time_entry.temp_id in self._new_time_entries:
+            return self._new_time_entries[time_entry.temp_id]
+        if time_entry.id in self._time_entries:
+            return self._time_entries[time_entry.id]
+        return self._new_entry_descriptions.get(time_entry.description)
+
+    def _timeEntryKey(self, time_entry: TimeEntry):
+        return time_entry.temp_id if self._isNewTimeEntry(time_entry) else time_entry.id
+
+    def _indexTimeEntry(self, time_entry: TimeEntry) -> None:
+        with self._state_lock:
+            self._live_time_entries[self._timeEntryKey(time_entry)] = time_entry
+            if self._isNewTimeEntry(time_entry):
+                self._new_entry_descriptions[time_entry.description] = time_entry
+
+    def _unindexTimeEntry(self, time_entry: TimeEntry) -> None:
+        key = self._timeEntryKey(time_entry)
+        with self._state_lock:
+            if self._live_time_entries.get(key) is time_entry:
+                del self._live_time_entries[key]
+            if self._new_entry_descriptions.get(time_entry.description) is time_entry:
+                del self._new_entry_descriptions[time_entry.description]
+
+    def _reindexTimeEntries(self) -> None:
+        """
+        rebuilds the live and description indexes, only after the time
+        entries are replaced
+        """
+        live_time_entries, new_entry_descriptions = self._timeEntryIndexes(self._time_entries)
+        with self._state_lock:
+            self._live_time_entries = live_time_entries
+            self._new_entry_descriptions = new_entry_descriptions
+
+    def _timeEntryIndexes(self, time_entries: Dict[int, TimeEntry]) -> Tuple[Dict[Any, TimeEntry], Dict[str, TimeEntry]]:
+        """
+        the live and description indexes of the remote time entries and the
+        new ones, built aside so they can be swapped in at once
+        """
+        live_time_entries = {}
+        new_entry_descriptions = {}
+        for entry in [entry for entry in time_entries.values() if not entry.to_delete] \
+                + list(self._new_time_entries.values()):
+            live_time_entries[self._timeEntryKey(entry)] = entry
+            if self._isNewTimeEntry(entry):
+                new_entry_descriptions[entry.description] = entry
+        return live_time_entries, new_entry_descriptions
 
     def _sync_time_entries(self, delta: timedelta=None) -> None:
         """
         gets all time entries within the delta, if none, uses self._time_delta
         """
-        self._create_new_time_entries()
-        self._update_time_entries()
-        self._delete_time_entries()
-        self._fetch_time_entries(delta, True)
+        self._pushTimeEntries(self._pendingTimeEntries())
+        if delta is None and self._time_entries_since is not None:
+            self._fetch_time_entry_changes()
+        else:
+            self._fetch_time_entries(delta, True)
+        self._saveSnapshot()
 
-    def _delete_time_entries(self) -> None:
+    def _pendingTimeEntries(self) -> List[TimeEntry]:
         """
-        Deletes all time entries that are marked to delete
+        the time entries with changes to push, creates then updates then deletes
         """
-        for id, entry in self._time_entries.items():
-            if entry.to_delete:
-                response = requests.delete(self._time_entries_url + "/" + str(id),
-                                           auth=HTTPBasicAuth(self._api_token, "api_token")
-                                           )
-                self._parseResponse(response)
+        updates = [entry for entry in self._time_entries.values()
+                   if not entry.synced and not entry.to_delete]
+        deletes = [entry for entry in self._time_entries.values() if entry.to_delete]
+        return list(self._new_time_entries.values()) + updates + deletes
+
+    def _localTimeEntries(self, time_entries: List[TimeEntry]) -> List[TimeEntry]:
+        """
+        the locally kept time entries for the given ones, unknown ones are skipped
+        """
+        local = [self._localTimeEntry(entry) for entry in time_entries]
+        return [entry for entry in local if entry is not None]
+
+    def _pushTimeEntries(self, time_entries: List[TimeEntry]) -> None:
+        """
+        pushes the changes of each time entry one after another
+        """
+        for entry in time_entries:
+            request = self._timeEntryRequest(entry)
+            if request is not None:
+                method, url, kwargs = request
+                self._applyTimeEntryResponse(entry, method, self._request(method, url, **kwargs))
+
+    def _timeEntryRequest(self, time_entry: TimeEntry) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """
+        the (method, url, request arguments) that pushes a time entry's
+        pending change, None if it has none
+        """
+        if self._isNewTimeEntry(time_entry):
+            return "POST", self._time_entries_url, {"data": self._timeEntryPayload(time_entry)}
+        if time_entry.to_delete:
+            return "DELETE", self._time_entries_url + "/" + str(time_entry.id), {}
+        if not time_entry.synced:
+            return ("PUT", self._time_entries_url + "/" + str(time_entry.id),
+                    {"data": self._timeEntryPayload(time_entry)})
+        return None
+
+    def _applyTimeEntryResponse(self, time_entry: TimeEntry, method: str, response) -> None:
+        """
+        applies toggl's answer to a pushed time entry to the local state, a
+        created entry keeps its object and gets its real id
+        """
+        result = self._parseResponse(response)
+        if method == "DELETE":
+            self._dropRemoteTimeEntry(time_entry.id)
+            return
+        data = result.get("data") if isinstance(result, dict) else None
+        self._unindexTimeEntry(time_entry)
+        if method == "POST":
+            del self._new_time_entries[time_entry.temp_id]
+        if data:
+            time_entry.fromJson(data)
+            time_entry.id = int(data["id"])
+        time_entry.synced = True
+        if method == "POST":
+            self._dropRemoteTimeEntry(time_entry.id)
+            self._time_entries[time_entry.id] = time_entry
+        self._indexTimeEntry(time_entry)
         
     def _fetch_time_entries(self, delta: timedelta=None, refresh=True) -> None:
         """
@@ -336,52 +829,93 @@ class TogglTrack:
         if refresh is set it will clear the time entries 
         """
         if refresh:
-            self._time_entries={}
+            self._startTimeEntryRefresh()
+        response = self._request("GET", self._time_entries_url,
+                                params=self._timeWindowParams(delta))
+        self._applyTimeEntries(self._parseResponse(response))
+
+    def _applyTimeEntries(self, entries_json: List[Dict[str, Any]]) -> None:
+        """
+        stores the time entries of a window pull
+        """
+        entries = [self._addRemoteTimeEntry(entry_json) for entry_json in entries_json]
+        if self._time_entry_sink is not None:
+            self._time_entry_sink(entries, [])
+
+    def _startTimeEntryRefresh(self) -> None:
+        """
+        drops the local time entries ahead of a full pull
+        """
+        self._time_entries={}
+        self._time_entries_since = int(time.time()) - TogglTrack.SINCE_OVERLAP
+        self._reindexTimeEntries()
+
+    def _timeWindowParams(self, delta: timedelta=None) -> Dict[str, str]:
+        start_time, stop_time = self.timeEntryWindow(delta)
+        return {
+            "start_date": start_time.isoformat("T", "seconds"),
+            "stop_date": stop_time.isoformat("T", "seconds"),
+        }
+
+    def _addRemoteTimeEntry(self, entry_json: Dict[str, Any]) -> TimeEntry:
+        """
+        stores a time entry as toggl sent it back
+        """
+        entry = TimeEntry()
+        entry.fromJson(entry_json)
+        entry.id = int(entry_json["id"])
+        self._dropRemoteTimeEntry(entry.id)
+        self._time_entries[entry.id] = entry
+        self._indexTimeEntry(entry)
+        return entry
+
+    def _dropRemoteTimeEntry(self, id: int) -> None:
+        entry = self._time_entries.pop(id, None)
+        if entry is not None:
+            self._unindexTimeEntry(entry)
+
+    def _timeEntryPayload(self, time_entry: TimeEntry) -> str:
+        return json.dumps({
+            "time_entry": time_entry.toJson()
+        })
+
+    def _fetch_time_entry_changes(self) -> None:
+        """
+        pulls only the time entries changed since the last pull, and drops
+        the ones that have left the +-time delta
+        """
+        self._applyTimeEntryChanges(self._fetchChanges(self._time_entries_since))
+
+    def _applyTimeEntryChanges(self, changes: Dict[str, Any]) -> None:
+        """
+        applies the time entries of a since pull, removed ones and ones that
+        have left the +-time delta are dropped
+        """
+        start_time, stop_time = self.timeEntryWindow()
+        changed = []
+        deleted = []
+        for entry_json in changes["data"].get("time_entries") or []:
+            entry_id = int(entry_json["id"])
+            if entry_json.get("server_deleted_at"):
+                self._dropRemoteTimeEntry(entry_id)
+                deleted.append(entry_id)
+                continue
+            changed.append(self._addRemoteTimeEntry(entry_json))
+        if self._time_entry_sink is not None and (changed or deleted):
+            self._time_entry_sink(changed, deleted)
+        outside = [id for id, entry in self._time_entries.items()
+                   if entry.synced and not (start_time <= entry.start <= stop_time)]
+        for id in outside:
+            self._dropRemoteTimeEntry(id)
+        self._time_entries_since = changes["since"]
+
+    def timeEntryWindow(self, delta: timedelta=None) -> Tuple[datetime, datetime]:
+        """
+        the start and stop of the +-time delta around now
+        """
         if delta is None:
             delta = self._time_delta
-        start_time = datetime.now() - delta
-        stop_time = datetime.now() + delta
-        start_time = pytz.utc.localize(start_time)
-        stop_time = pytz.utc.localize(stop_time)
-        response = requests.get(self._time_entries_url,
-                                auth=HTTPBasicAuth(self._api_token, "api_token"),
-                                params={
-                                    "start_date": start_time.isoformat("T", "seconds"),
-                                    "stop_date": stop_time.isoformat("T", "seconds"),
-                                })
-        entries_json = self._parseResponse(response)
-        for entry_json in entries_json:
-            entry = TimeEntry()
-            entry.fromJson(entry_json)
-            entry.id = int(entry_json["id"])
-            self._time_entries[entry.id] = entry
-
-    def _create_new_time_entries(self, clear_new=True) -> None:
-        """
-        Creates new time entries and then clears
-        """
-        for time_entry in self._new_time_entries:
-            jsonData = json.dumps({
-                "time_entry": time_entry.toJson()
-            })
-            response = requests.post(self._time_entries_url,
-                                    auth=HTTPBasicAuth(self._api_token, "api_token"),
-                                    data=jsonData)
-            self._parseResponse(response)
-        if clear_new:
-            self._new_time_entries = []
-
-    def _update_time_entries(self) -> None:
-        """
-        Update Time entriess time entries
-        """
-        for id, time_entry in self._time_entries.items():
-            if time_entry.synced:
-                continue
-            response = requests.put(self._time_entries_url + "/" + str(id),
-                                    auth=HTTPBasicAuth(self._api_token, "api_token"),
-                                    data=json.dumps({
-                                        "time_entry": time_entry.toJson()
-                                    }))
-            self._parseResponse(response)
-            time_entry.synced = True
+        start_time = pytz.utc.localize(datetime.now() - delta)
+        stop_time = pytz.utc.localize(datetime.now() + delta)
+        return start_time, stop_time
+
@@ -0,0 +1,20 @@
+"""
+ offline stand-ins for the requests responses toggl sends back
+"""
+import json
+
+
+class FakeResponse:
+    def __init__(self, body=None, status_code=200, headers=None):
+        self.status_code = status_code
+        self.text = json.dumps(body)
+        self.headers = headers or {}
+
+    def __str__(self) -> str:
+        return f"<Response [{self.status_code}]>"
+
+
+def project_json(id, name, wid=1, **extra):
+    project = {"id": id, "name": name, "wid": wid, "active": True}
+    project.update(extra)
+    return project
@@ -0,0 +1,65 @@
+"""
+ offline tests for the columnar time entry store
+"""
+from datetime import date, datetime, timedelta
+import shutil
+import tempfile
+from django.test import SimpleTestCase
+from unittest import mock
+import pytz
+from productivity.libs.Toggl.TimeEntry import TimeEntry
+from productivity.libs.Toggl.TimeEntryStore import TimeEntryStore, rollup
+from productivity.libs.Toggl.TogglTrack import TogglTrack
+from .FakeResponses import FakeResponse
+
+
+MONDAY = pytz.utc.localize(datetime(2021, 8, 30, 9))
+
+
+def entry(id, project, start, hours, tags=None, description="work"):
+    return TimeEntry(id=id, description=description, start=start,
+                     stop=start + timedelta(hours=hours) if hours is not None else None,
+                     workspace_id=1, project_id=project, tags=tags)
+
+
+class TimeEntryStoreTester(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.store = TimeEntryStore(self.path)
+        self.store.append([
+            entry(1, 10, MONDAY, 1, ["deep"]),
+            entry(2, 10, MONDAY + timedelta(days=1), 2, ["deep", "meeting"]),
+            entry(3, 20, MONDAY + timedelta(days=7), 3),
+            entry(4, 20, MONDAY + timedelta(days=7), None),
+        ])
+
+    def test_group_by(self):
+        self.assertEqual(self.store.by_project(), {10: 3 * 3600, 20: 3 * 3600})
+        self.assertEqual(self.store.by_project(since=MONDAY + timedelta(days=2)), {20: 3 * 3600})
+        self.assertEqual(self.store.by_day(project=10), {date(2021, 8, 30): 3600, date(2021, 8, 31): 2 * 3600})
+        self.assertEqual(self.store.by_week(), {date(2021, 8, 30): 3 * 3600, date(2021, 9, 6): 3 * 3600})
+        self.assertEqual(self.store.by_tag(), {"deep": 3 * 3600, "meeting": 2 * 3600})
+
+    def test_last_row_wins(self):
+        self.assertEqual(self.store.append([entry(1, 10, MONDAY, 1, ["deep"])]), 0)
+        self.assertEqual(self.store.append([entry(1, 20, MONDAY, 4)], deleted_ids=[3, 99]), 2)
+        self.assertEqual(len(self.store), 6)
+        self.assertEqual(self.store.by_project(), {10: 2 * 3600, 20: 4 * 3600})
+
+    def test_reopened_from_disk(self):
+        reopened = TimeEntryStore(self.path)
+        self.assertEqual(len(reopened), 4)
+        self.assertEqual(reopened.by_tag(), {"deep": 3 * 3600, "meeting": 2 * 3600})
+
+    def test_fed_by_toggl_pulls(self):
+        toggl = TogglTrack(1, "token", time_entry_sink=self.store.append)
+        with mock.patch.object(toggl._session, "request", return_value=FakeResponse([{
+                "id": 5, "wid": 1, "pid": 30, "start": MONDAY.isoformat(),
+                "stop": (MONDAY + timedelta(hours=5)).isoformat()}])):
+            toggl._fetch_time_entries()
+        self.assertEqual(self.store.by_project()[30], 5 * 3600)
+
+    def test_rollup(self):
+        parents = {1: None, 2: 1, 3: 2, 4: None}
+        self.assertEqual(rollup({3: 5, 2: 1, 4: 2}, parents), {1: 6, 2: 6, 3: 5, 4: 2})
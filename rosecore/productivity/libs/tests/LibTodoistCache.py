@@ -0,0 +1,42 @@
+"""
+ offline tests for the todoist cache shared by the web and worker processes
+"""
+from django.test import SimpleTestCase
+from productivity.libs.Todoist.CachedTodoistAPI import CachedTodoistAPI
+import tempfile
+import os
+import json
+import threading
+
+
+class TodoistCacheTester(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmp_dir.name, "todoist", "")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cache_read_back(self):
+        writer = CachedTodoistAPI("token", cache=self.cache)
+        writer._update_state({"projects": [{"id": 1, "name": "one"}]})
+        writer.sync_token = "abc"
+        writer._write_cache()
+        reader = CachedTodoistAPI("token", cache=self.cache)
+        self.assertEqual(reader.sync_token, "abc")
+        self.assertEqual([project["name"] for project in reader.state["projects"]], ["one"])
+
+    def test_concurrent_writes_stay_whole(self):
+        writers = [CachedTodoistAPI("token", cache=self.cache) for _ in range(4)]
+        for i, writer in enumerate(writers):
+            writer._update_state({"projects": [{"id": i, "name": "x" * 10000}]})
+            writer.sync_token = str(i)
+        threads = [threading.Thread(target=lambda writer=writer: [writer._write_cache() for _ in range(20)])
+                   for writer in writers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with open(self.cache + "token.json") as state_file:
+            json.load(state_file)
+        self.assertEqual(sorted(name for name in os.listdir(self.cache) if name.endswith(".tmp")), [])
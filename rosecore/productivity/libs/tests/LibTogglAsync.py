@@ -0,0 +1,104 @@
+"""
+ offline tests for the asyncio toggl client
+"""
+import asyncio
+from django.test import SimpleTestCase
+from unittest import mock
+from productivity.libs.Toggl.AsyncTogglTrack import AsyncTogglTrack
+from .FakeResponses import FakeResponse, project_json
+
+
+class FakeToggl:
+    """
+    answers the async client like toggl would, keeping track of how many
+    requests were in flight at once
+    """
+    def __init__(self):
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self.calls = []
+        self.next_id = 100
+
+    async def send(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if method == "POST":
+            self.next_id += 1
+            return FakeResponse({"data": project_json(self.next_id, f"new {self.next_id}")})
+        if method == "GET" and url.endswith("/projects"):
+            return FakeResponse([project_json(1, "one"), project_json(2, "two")])
+        if method == "GET":
+            return FakeResponse({"since": 100, "data": {}})
+        return FakeResponse({"data": {}})
+
+
+class AsyncTogglTester(SimpleTestCase):
+    def setUp(self):
+        self.fake = FakeToggl()
+        self.toggl = AsyncTogglTrack(1, "token", concurrency=3)
+        self.toggl._send = self.fake.send
+
+    def test_pushes_concurrently_within_limit(self):
+        async def run():
+            await self.toggl.sync(projectOnly=True)
+            for i in range(10):
+                self.toggl.createProject(f"project {i}")
+            projects = {project.name: project for project in self.toggl.projects}
+            self.toggl.updateProject(projects["one"], "first")
+            self.toggl.deleteProject(projects["two"])
+            await self.toggl.sync(projectOnly=True)
+        asyncio.run(run())
+        self.assertEqual(self.fake.most_in_flight, 3)
+        methods = [method for method, url in self.fake.calls]
+        self.assertEqual(methods.count("POST"), 10)
+        self.assertEqual(methods.count("PUT"), 1)
+        self.assertEqual(methods.count("DELETE"), 1)
+        self.assertEqual(self.toggl._new_projects, {})
+        self.assertEqual(len(self.toggl.projects), 11)
+        self.assertNotIn(2, self.toggl._projects)
+
+    def test_failed_push_stays_pending(self):
+        async def fail_creates(method, url, **kwargs):
+            if method == "POST":
+                return FakeResponse("bad request", status_code=400)
+            return await self.fake.send(method, url, **kwargs)
+
+        self.toggl._send = fail_creates
+        self.toggl.createProject("stays")
+        with self.assertRaises(Exception):
+            asyncio.run(self.toggl.sync(projectOnly=True))
+        self.assertEqual([project.name for project in self.toggl._new_projects.values()], ["stays"])
+
+    def test_throttled_request_retried_like_the_sync_client(self):
+        responses = [FakeResponse(status_code=429), FakeResponse([project_json(1, "one")])]
+
+        async def throttle_once(method, url, **kwargs):
+            return responses.pop(0)
+
+        toggl = AsyncTogglTrack(1, "token", backoff=0)
+        toggl._send = throttle_once
+        with mock.patch.object(toggl, "_retryAfter", wraps=toggl._retryAfter) as retry_after:
+            asyncio.run(toggl.sync(projectOnly=True))
+        self.assertEqual(retry_after.call_count, 2)
+        self.assertEqual(toggl.throttle_count, 1)
+        self.assertEqual([project.name for project in toggl.projects], ["one"])
+
+    def test_each_run_gets_its_own_session(self):
+        sessions = []
+
+        async def send(method, url, **kwargs):
+            sessions.append(self.toggl._async_session)
+            self.assertFalse(self.toggl._async_session.closed)
+            return await self.fake.send(method, url, **kwargs)
+
+        self.toggl._send = send
+        asyncio.run(self.toggl.sync(projectOnly=True))
+        self.assertIsNone(self.toggl._async_session)
+        self.toggl.createProject("second run")
+        asyncio.run(self.toggl.sync(projectOnly=True))
+        self.assertIsNone(self.toggl._async_session)
+        self.assertIsNot(sessions[0], sessions[-1])
+        self.assertTrue(all(session.closed for session in sessions))
@@ -0,0 +1,47 @@
+"""
+ offline tests for the id, name and temp id indexes of TogglTrack
+"""
+from django.test import SimpleTestCase
+from unittest import mock
+from productivity.libs.Toggl.TogglTrack import TogglTrack
+from .FakeResponses import FakeResponse, project_json
+
+
+class TogglIndexTester(SimpleTestCase):
+    def setUp(self):
+        self.toggl = TogglTrack(1, "token")
+        with mock.patch.object(self.toggl._session, "request",
+                               return_value=FakeResponse([project_json(1, "one"), project_json(2, "two")])):
+            self.toggl.sync(projectOnly=True)
+
+    def test_lookups(self):
+        self.assertEqual(self.toggl.getProject(1).name, "one")
+        self.assertEqual(self.toggl.getProject("2").name, "two")
+        self.assertIsNone(self.toggl.getProject("nope"))
+        self.assertIs(self.toggl.getProjectByName("two"), self.toggl.getProject(2))
+
+    def test_projects_follow_changes(self):
+        projects = self.toggl.projects
+        pending = self.toggl.createProject("three")
+        self.assertIs(self.toggl.getProjectByName("three"), pending)
+        self.toggl.updateProject(pending, "third")
+        self.toggl.deleteProject(self.toggl.getProject(1))
+        self.assertEqual({project.name for project in projects}, {"one", "two"})
+        self.assertEqual({project.name for project in self.toggl.projects}, {"two", "third"})
+        self.assertIsNone(self.toggl.getProjectByName("three"))
+        self.assertIsNone(self.toggl.getProject(1))
+
+    def test_created_project_moves_to_id(self):
+        pending = self.toggl.createProject("three")
+        with mock.patch.object(self.toggl._session, "request",
+                               return_value=FakeResponse({"data": project_json(3, "three")})):
+            self.toggl.sync(projects=[pending])
+        self.assertIs(self.toggl.getProject(3), pending)
+        self.assertEqual(len(self.toggl.projects), 3)
+
+    def test_pending_time_entries_by_temp_id(self):
+        first = self.toggl.create_time_entry(1, "same", [])
+        second = self.toggl.create_time_entry(1, "same", [])
+        self.toggl.update_time_entry(second, description="changed")
+        self.toggl.delete_time_entry(first)
+        self.assertEqual([entry.description for entry in self.toggl.time_entries], ["changed"])
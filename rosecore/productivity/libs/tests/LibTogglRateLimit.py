@@ -0,0 +1,67 @@
+"""
+ offline tests for pacing and retrying toggl requests
+"""
+from django.test import SimpleTestCase
+from unittest import mock
+from productivity.libs.Toggl.TogglTrack import TogglTrack
+from productivity.libs.Toggl.RateLimiter import TokenBucket
+from productivity.libs.Toggl.Exceptions import APIThrottled
+from .FakeResponses import FakeResponse, project_json
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTester(SimpleTestCase):
+    def test_paces_to_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+        waits = [bucket.acquire() for i in range(4)]
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertAlmostEqual(waits[2], 0.5)
+        self.assertAlmostEqual(waits[3], 0.5)
+        self.assertAlmostEqual(clock.now, 1.0)
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        clock.now += 5
+        self.assertEqual(bucket.acquire(), 0)
+
+
+class TogglRetryTester(SimpleTestCase):
+    def setUp(self):
+        self.toggl = TogglTrack(1, "token", max_retries=2, backoff=0.1)
+        self.clock = FakeClock()
+        self.toggl._rate_limiter.sleep = self.clock.sleep
+
+    def test_throttled_request_retried(self):
+        with mock.patch.object(self.toggl._session, "request", side_effect=[
+                FakeResponse(status_code=429, headers={"Retry-After": "3"}),
+                FakeResponse([project_json(1, "one")])]):
+            self.toggl.sync(projectOnly=True)
+        self.assertEqual([project.name for project in self.toggl.projects], ["one"])
+        self.assertEqual(self.toggl.throttle_count, 1)
+        self.assertGreaterEqual(self.clock.sleeps[0], 3)
+
+    def test_gives_up_after_max_retries(self):
+        with mock.patch.object(self.toggl._session, "request",
+                               return_value=FakeResponse(status_code=429)) as request:
+            with self.assertRaises(APIThrottled):
+                self.toggl.sync(projectOnly=True)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(self.toggl.throttle_count, 3)
+        self.assertEqual(len(self.clock.sleeps), 2)
+        self.assertTrue(0.05 <= self.clock.sleeps[0] <= 0.15)
+        self.assertTrue(0.1 <= self.clock.sleeps[1] <= 0.3)
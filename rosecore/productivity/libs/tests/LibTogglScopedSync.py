@@ -0,0 +1,49 @@
+"""
+ offline tests for pushing single toggl changes without a pull
+"""
+from django.test import SimpleTestCase
+from unittest import mock
+from productivity.libs.Toggl.TogglTrack import TogglTrack
+from .FakeResponses import FakeResponse, project_json
+
+
+class TogglScopedSyncTester(SimpleTestCase):
+    def setUp(self):
+        self.toggl = TogglTrack(1, "token")
+        with mock.patch.object(self.toggl._session, "request",
+                               return_value=FakeResponse([project_json(1, "one"), project_json(2, "two")])):
+            self.toggl.sync(projectOnly=True)
+
+    def test_rename_is_one_request(self):
+        project = [project for project in self.toggl.projects if project.id == 1][0]
+        self.toggl.updateProject(project, "first")
+        with mock.patch.object(self.toggl._session, "request",
+                               return_value=FakeResponse({"data": project_json(1, "first")})) as request:
+            self.toggl.sync(projects=[project])
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(request.call_args[0][0], "PUT")
+        self.assertTrue(self.toggl._projects[1].synced)
+        self.assertEqual(self.toggl._projects[1].name, "first")
+
+    def test_create_gets_real_id(self):
+        project = self.toggl.createProject("three")
+        self.toggl.updateProject(self.toggl._projects[2], "second")
+        with mock.patch.object(self.toggl._session, "request",
+                               return_value=FakeResponse({"data": project_json(3, "three")})) as request:
+            self.toggl.sync(projects=[project])
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(project.id, 3)
+        self.assertIs(self.toggl._projects[3], project)
+        self.assertEqual(self.toggl._new_projects, {})
+        # other pending changes are left for the next sync
+        self.assertFalse(self.toggl._projects[2].synced)
+
+    def test_delete_is_one_request(self):
+        project = self.toggl._projects[2]
+        self.toggl.deleteProject(project)
+        with mock.patch.object(self.toggl._session, "request",
+                               return_value=FakeResponse([2])) as request:
+            self.toggl.sync(projects=[project])
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(request.call_args[0][0], "DELETE")
+        self.assertEqual([project.name for project in self.toggl.projects], ["one"])
@@ -0,0 +1,32 @@
+"""
+ offline tests for the toggl http session
+"""
+from django.test import SimpleTestCase
+from unittest import mock
+from productivity.libs.Toggl.TogglTrack import TogglTrack
+from .FakeResponses import FakeResponse, project_json
+
+
+class TogglSessionTester(SimpleTestCase):
+    def test_session_configured(self):
+        toggl = TogglTrack(1, "token", pool_size=3)
+        adapter = toggl._session.get_adapter("https://api.track.toggl.com")
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(toggl._session.auth.username, "token")
+        self.assertIn("gzip", toggl._session.headers["Accept-Encoding"])
+
+    def test_requests_reuse_session_with_timeout(self):
+        toggl = TogglTrack(1, "token", timeout=(1, 2))
+        with mock.patch.object(toggl._session, "request",
+                               return_value=FakeResponse([project_json(1, "one")])) as request:
+            toggl.sync(projectOnly=True)
+            toggl.createProject("two")
+            request.side_effect = [
+                FakeResponse({"data": project_json(2, "two")}),
+                FakeResponse({"since": 100, "data": {}}),
+            ]
+            toggl.sync(projectOnly=True)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual({project.name for project in toggl.projects}, {"one", "two"})
+        for call in request.call_args_list:
+            self.assertEqual(call[1]["timeout"], (1, 2))
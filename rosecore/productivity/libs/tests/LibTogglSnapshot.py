@@ -0,0 +1,114 @@
+"""
+ offline tests for the toggl delta sync and its snapshot
+"""
+from django.test import SimpleTestCase
+from unittest import mock
+from productivity.libs.Toggl.TogglTrack import TogglTrack
+from .FakeResponses import FakeResponse, project_json
+import tempfile
+import os
+import json
+import threading
+
+
+class TogglSnapshotTester(SimpleTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.tmp_dir.name, "toggl", "1.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @mock.patch("productivity.libs.Toggl.TogglTrack.requests.Session")
+    def test_restart_pulls_only_changes(self, Session):
+        request = Session.return_value.request
+        request.return_value = FakeResponse([project_json(1, "one"), project_json(2, "two")])
+        toggl = TogglTrack(1, "token", snapshot_path=self.snapshot_path)
+        toggl.sync(projectOnly=True)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+
+        request.reset_mock()
+        request.return_value = FakeResponse({
+            "since": 1000,
+            "data": {"projects": [
+                project_json(2, "renamed"),
+                project_json(1, "one", server_deleted_at="2022-01-01T00:00:00Z"),
+                project_json(3, "three"),
+                project_json(4, "other workspace", wid=2),
+            ]}
+        })
+        restarted = TogglTrack(1, "token", snapshot_path=self.snapshot_path)
+        self.assertEqual({project.name for project in restarted.projects}, {"one", "two"})
+        restarted.sync(projectOnly=True)
+
+        method, url = request.call_args[0]
+        self.assertEqual(method, "GET")
+        self.assertTrue(url.endswith("/me"))
+        self.assertIn("since", request.call_args[1]["params"])
+        self.assertEqual({project.name for project in restarted.projects}, {"renamed", "three"})
+        self.assertEqual(TogglTrack(1, "token", snapshot_path=self.snapshot_path)._projects_since, 1000)
+
+    def test_unreadable_snapshot_ignored(self):
+        os.makedirs(os.path.dirname(self.snapshot_path))
+        with open(self.snapshot_path, "w") as snapshot_file:
+            snapshot_file.write("not json")
+        toggl = TogglTrack(1, "token", snapshot_path=self.snapshot_path)
+        self.assertIsNone(toggl._projects_since)
+        self.assertEqual(len(toggl.projects), 0)
+
+    @mock.patch("productivity.libs.Toggl.TogglTrack.requests.Session")
+    def test_reload_picks_up_another_process(self, Session):
+        request = Session.return_value.request
+        request.return_value = FakeResponse([project_json(1, "one")])
+        worker = TogglTrack(1, "token", snapshot_path=self.snapshot_path)
+        worker.sync(projectOnly=True)
+        web = TogglTrack(1, "token", snapshot_path=self.snapshot_path)
+        self.assertFalse(web.reloadSnapshot())
+
+        request.return_value = FakeResponse({"since": 1000, "data": {"projects": [project_json(2, "two")]}})
+        worker.sync(projectOnly=True)
+        os.utime(self.snapshot_path, ns=(0, os.stat(self.snapshot_path).st_mtime_ns + 1))
+        self.assertTrue(web.reloadSnapshot())
+        self.assertEqual({project.name for project in web.projects}, {"one", "two"})
+        self.assertIsNotNone(web.getProject(2))
+        self.assertFalse(web.reloadSnapshot())
+
+    @mock.patch("productivity.libs.Toggl.TogglTrack.requests.Session")
+    def test_readers_never_see_half_a_reload(self, Session):
+        Session.return_value.request.return_value = FakeResponse([project_json(1, "one"), project_json(2, "two")])
+        TogglTrack(1, "token", snapshot_path=self.snapshot_path).sync(projectOnly=True)
+        web = TogglTrack(1, "token", snapshot_path=self.snapshot_path)
+        seen = []
+        done = threading.Event()
+
+        def reload():
+            for _ in range(200):
+                os.utime(self.snapshot_path, ns=(0, os.stat(self.snapshot_path).st_mtime_ns + 1))
+                web.reloadSnapshot()
+            done.set()
+
+        def read():
+            while not done.is_set():
+                seen.append({project.name for project in web.projects})
+
+        threads = [threading.Thread(target=reload), threading.Thread(target=read)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(seen)
+        self.assertTrue(all(names == {"one", "two"} for names in seen))
+
+    def test_concurrent_saves_stay_whole(self):
+        writers = [TogglTrack(1, "token", snapshot_path=self.snapshot_path) for _ in range(4)]
+        for i, writer in enumerate(writers):
+            writer._addRemoteProject(project_json(i + 1, "x" * 10000))
+        threads = [threading.Thread(target=lambda writer=writer: [writer._saveSnapshot() for _ in range(20)])
+                   for writer in writers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with open(self.snapshot_path) as snapshot_file:
+            self.assertEqual(len(json.load(snapshot_file)["projects"]), 1)
+        self.assertEqual(os.listdir(os.path.dirname(self.snapshot_path)), ["1.json"])
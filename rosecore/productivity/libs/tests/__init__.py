@@ -1,2 +1,10 @@
 # from .LibToggle import *
 # uncommented because they throttle the API :/
+from .LibTogglSnapshot import *
+from .LibTogglSession import *
+from .LibTogglRateLimit import *
+from .LibTogglAsync import *
+from .LibTogglScopedSync import *
+from .LibTogglIndexes import *
+from .LibTimeEntryStore import *
+from .LibTodoistCache import *
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from datetime import datetime
+import json
+import platform
+import subprocess
+
+from productivity.benchmarks.runner import run_scale
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks the sync, nuking unsynced projects and bulk task creation against '
+            'local todoist and toggl stand-ins, on a throwaway database. Prints json')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, nargs='+', default=[100, 1000, 10000],
+                            help='projects(and tasks and time entries) generated per run')
+        parser.add_argument('--latency', type=float, default=0.002,
+                            help='seconds the stand-ins wait before every response')
+        parser.add_argument('--throttle-rate', type=float, default=0.02,
+                            help='share of toggl requests answered with a 429')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--no-memory', action='store_true',
+                            help='skip tracing the peak memory, tracing slows the runs down so '
+                                 'only compare wall times of runs made the same way')
+        parser.add_argument('--output', help='file the json is written to instead of stdout')
+
+    def handle(self, *args, **options):
+        results = []
+        for scale in options['scale']:
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                results.extend(run_scale(scale,
+                                         latency=options['latency'],
+                                         throttle_rate=options['throttle_rate'],
+                                         seed=options['seed'],
+                                         memory=not options['no_memory']))
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        report = json.dumps({
+            'commit': self._commit(),
+            'run_at': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'options': {name: options[name] for name in ('scale', 'latency', 'throttle_rate', 'seed', 'no_memory')},
+            'results': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report + '\n')
+        else:
+            self.stdout.write(report)
+
+    @staticmethod
+    def _commit():
+        """
+        the commit being benchmarked, so runs can be compared across commits
+        """
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import close_old_connections
+from productivity.services.JobService import JobService
+import time
+
+class Command(BaseCommand):
+    help = 'Runs queued jobs(syncs, nuking unsynced projects, validating projects)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='run the queued jobs then exit instead of polling')
+        parser.add_argument('--poll', type=float, default=settings.JOB_POLL_SECONDS,
+                            help='seconds to wait between checks of an empty queue')
+
+    def handle(self, *args, **options):
+        while True:
+            # like a request, each job starts and ends without a stale(or dead) connection
+            close_old_connections()
+            job = JobService.claim_next()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll'])
+                continue
+            self.stdout.write(f'running job {job.id}: {job.kind}')
+            JobService.run(job)
+            close_old_connections()
+            self.stdout.write(f'job {job.id} {job.status}')
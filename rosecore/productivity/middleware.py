@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+import logging
+import time
+
+from productivity.services.TogglService import TogglService
+from productivity.utilities.cache import remote_scope
+from productivity.utilities.metrics import DB_QUERIES_PER_REQUEST, DB_QUERY_SECONDS
+from productivity.utilities.queries import QueryRecorder
+
+
+class RemoteCacheMiddleware:
+    """
+    Memoizes the todoist and toggl reads made while handling a request, so
+    validating a form more than once does not go back to the network. The
+    toggl state the job worker synced is picked up first
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        TogglService.refresh()
+        with remote_scope():
+            return self.get_response(request)
+
+
+class QueryMetricsMiddleware:
+    """
+    Records how many sql queries each request ran and how long each took,
+    labelled by the view that handled it
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        durations = []
+
+        def timed(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                durations.append(time.perf_counter() - start)
+
+        with connection.execute_wrapper(timed):
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "unresolved"
+        DB_QUERIES_PER_REQUEST.observe(len(durations), view=view)
+        for duration in durations:
+            DB_QUERY_SECONDS.observe(duration, view=view)
+        return response
+
+
+class QueryDebugMiddleware:
+    """
+    With QUERY_DEBUG on, logs the repeated query shapes(N+1s) of each
+    request and the plans of its slow queries. Dropped from the stack
+    otherwise
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_DEBUG:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder(slow_seconds=settings.QUERY_SLOW_SECONDS) as recorder:
+            response = self.get_response(request)
+        if recorder.repeated() or recorder.slow():
+            logging.warning(f"queries of {request.method} {request.path}: {recorder.report()}")
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity', '0010_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeEntry',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('togglId', models.CharField(max_length=50, unique=True)),
+                ('description', models.CharField(blank=True, default='', max_length=200)),
+                ('start', models.DateTimeField()),
+                ('stop', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.IntegerField(default=0)),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='time_entries', to='productivity.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'start'], name='productivit_project_f225f4_idx'), models.Index(fields=['start', 'stop'], name='productivit_start_fb4ebf_idx')],
+            },
+        ),
+    ]
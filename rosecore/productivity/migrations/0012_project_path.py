@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:53
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    """
+    works out the path of every existing project from its parent chain
+    """
+    Project = apps.get_model('productivity', 'Project')
+    parents = dict(Project.objects.values_list('id', 'parent_id'))
+    projects = []
+    for project in Project.objects.all():
+        ancestors = []
+        parent_id = parents.get(project.id)
+        while parent_id is not None and parent_id not in ancestors:
+            ancestors.append(parent_id)
+            parent_id = parents.get(parent_id)
+        project.path = "/" + "".join(f"{id}/" for id in reversed(ancestors))
+        projects.append(project)
+    Project.objects.bulk_update(projects, ['path'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity', '0011_timeentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='path',
+            field=models.CharField(db_index=True, default='/', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:54
+
+from django.db import migrations, models
+
+
+def strip_unsynced_sources(apps, schema_editor):
+    """
+    a blank source used to count as synced, it is now stored as ""
+    """
+    Project = apps.get_model('productivity', 'Project')
+    projects = []
+    for project in Project.objects.exclude(unsyncedSource=""):
+        if project.unsyncedSource != project.unsyncedSource.strip():
+            project.unsyncedSource = project.unsyncedSource.strip()
+            projects.append(project)
+    Project.objects.bulk_update(projects, ['unsyncedSource'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity', '0012_project_path'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='todoistId',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='togglId',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='unsyncedSource',
+            field=models.CharField(db_index=True, default='', max_length=50),
+        ),
+        migrations.RunPython(strip_unsynced_sources, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity', '0013_project_remote_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'complete', 'id'], name='productivit_project_d59da9_idx'),
+        ),
+    ]
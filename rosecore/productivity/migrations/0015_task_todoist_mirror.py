@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity', '0014_task_project_complete_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='content',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='description',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='next_due',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='todoistId',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity', '0015_task_todoist_mirror'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('full', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='running', max_length=10)),
+                ('error', models.TextField(blank=True, default='')),
+                ('started', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('seconds', models.FloatField(blank=True, null=True)),
+                ('counts', models.JSONField(blank=True, default=dict)),
+                ('request_count', models.IntegerField(default=0)),
+                ('throttle_count', models.IntegerField(default=0)),
+                ('spans', models.JSONField(blank=True, default=list)),
+                ('operations', models.JSONField(blank=True, default=dict)),
+                ('slowest', models.JSONField(blank=True, default=list)),
+            ],
+        ),
+    ]
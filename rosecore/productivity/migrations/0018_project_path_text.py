@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity', '0017_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='path',
+            field=models.TextField(db_index=True, default='/', editable=False),
+        ),
+    ]
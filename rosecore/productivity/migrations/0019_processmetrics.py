@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productivity', '0018_project_path_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessMetrics',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('process', models.CharField(max_length=100, unique=True)),
+                ('metrics', models.JSONField(blank=True, default=dict)),
+                ('updated', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+    ]
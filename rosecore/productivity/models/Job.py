@@ -0,0 +1,46 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """
+    Long running work (syncs and the like) queued by a request and run by the JobWorker command
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    kind = models.CharField(max_length=50)
+    arguments = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    progress = models.FloatField(default=0)
+    message = models.CharField(max_length=200, default="", blank=True)
+    error = models.TextField(default="", blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(blank=True, null=True)
+    finished = models.DateTimeField(blank=True, null=True)
+    # last sign of life from the worker running the job
+    heartbeat = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}({self.status})"
+
+    @property
+    def duration(self):
+        if self.started is None:
+            return None
+        if self.finished is None:
+            return None
+        return self.finished - self.started
@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class ProcessMetrics(models.Model):
+    """
+    The last metrics snapshot a process(ie the job worker) published, so
+    /metrics in the web processes can include them
+    """
+    id = models.AutoField(primary_key=True)
+    # host and pid of the process
+    process = models.CharField(max_length=100, unique=True)
+    metrics = models.JSONField(default=dict, blank=True)
+    updated = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"metrics of {self.process}"
@@ -1,4 +1,52 @@
-from django.db import models
+from typing import List
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+
+class ProjectQuerySet(models.QuerySet):
+    def synced(self):
+        """
+        projects that exist in todoist and toggl, an index seek on unsyncedSource
+        """
+        return self.filter(unsyncedSource="")
+
+    def unsynced(self):
+        """
+        projects that only exist on one service
+        """
+        return self.exclude(unsyncedSource="")
+
+    def update(self, **kwargs):
+        """
+        an update that changes the parent also rewrites the paths of the
+        moved subtrees
+        """
+        if "parent" not in kwargs and "parent_id" not in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            ids = list(self.values_list("pk", flat=True))
+            count = super().update(**kwargs)
+            self.model.repath(ids)
+        return count
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        """
+        a bulk update of the parent also rewrites the paths of the moved
+        subtrees, the projects are given their new paths
+        """
+        if "parent" not in fields and "parent_id" not in fields:
+            return super().bulk_update(objs, fields, batch_size=batch_size)
+        objs = list(objs)
+        for project in objs:
+            project.validate_parent(project.parent)
+        with transaction.atomic(using=self.db):
+            count = super().bulk_update(objs, fields, batch_size=batch_size)
+            self.model.repath([project.pk for project in objs])
+        paths = dict(self.model.objects.filter(pk__in=[project.pk for project in objs]).values_list("pk", "path"))
+        for project in objs:
+            project.path = paths[project.pk]
+        return count
 
 
 class Project(models.Model):
@@ -9,13 +57,88 @@ class Project(models.Model):
     name = models.CharField(max_length=50)
     parent = models.ForeignKey('self', blank=True, null=True, related_name='children',
                                on_delete=models.CASCADE)
-    todoistId = models.CharField(max_length=50)
-    togglId = models.CharField(max_length=50)
-    unsyncedSource = models.CharField(max_length=50,default="") 
+    todoistId = models.CharField(max_length=50, db_index=True)
+    togglId = models.CharField(max_length=50, db_index=True)
+    unsyncedSource = models.CharField(max_length=50,default="", db_index=True)
+    # materialized path of the ancestor ids, "/" for a root, "/1/5/" for a child of 5 under 1,
+    # unbounded so a deep tree still fits
+    path = models.TextField(default="/", db_index=True, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        keeps path in step with parent, a move rewrites the paths of the
+        whole subtree in one update
+        """
+        # a blank source is stored as "" so synced() can match it exactly
+        self.unsyncedSource = self.unsyncedSource.strip()
+        self.validate_parent(self.parent)
+        path = "/" if self.parent_id is None else self.parent.subtree_path
+        old_subtree_path = None
+        if self.pk is not None and path != self.path:
+            old_subtree_path = self.subtree_path
+        self.path = path
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | {"path", "unsyncedSource"}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old_subtree_path is not None:
+                self._rewrite_subtree(old_subtree_path)
+
+    def _rewrite_subtree(self, old_subtree_path: str) -> None:
+        """
+        moves the descendants' paths from under old_subtree_path to under
+        the current one, in one update
+        """
+        Project.objects.filter(path__startswith=old_subtree_path).update(
+            path=Concat(Value(self.subtree_path), Substr("path", len(old_subtree_path) + 1),
+                        output_field=models.TextField()))
+
+    @staticmethod
+    def repath(ids: List[int]) -> None:
+        """
+        recomputes the paths of the projects, and of their subtrees, after
+        their parents were written without save()
+        """
+        for project in Project.objects.select_related("parent").filter(pk__in=ids):
+            # re-read each time, an earlier move can have rewritten this one's path
+            project.refresh_from_db(fields=["path"])
+            if project.parent_id is not None:
+                project.parent.refresh_from_db(fields=["path"])
+            project.validate_parent(project.parent)
+            path = "/" if project.parent_id is None else project.parent.subtree_path
+            if path == project.path:
+                continue
+            old_subtree_path = project.subtree_path
+            project.path = path
+            Project.objects.filter(pk=project.pk).update(path=path)
+            project._rewrite_subtree(old_subtree_path)
+
+    def validate_parent(self, parent: "Project") -> None:
+        """
+        raises ValueError if parent is the project or one of its descendants
+        """
+        if self.pk is not None and parent is not None and f"/{self.pk}/" in parent.subtree_path:
+            raise ValueError(f"{self.name} can not be moved under itself")
+
+    @property
+    def subtree_path(self) -> str:
+        """
+        the path every descendant's path starts with
+        """
+        return f"{self.path}{self.id}/"
+
+    @property
+    def ancestor_ids(self) -> List[int]:
+        """
+        the ancestor ids, root first
+        """
+        return [int(id) for id in self.path.strip("/").split("/") if id]
+
     @property
     def synced(self) -> bool:
         return not self.unsyncedSource.strip()
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class SyncRun(models.Model):
+    """
+    One run of ProjectService.sync, with the trace it recorded
+    """
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    full = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUSES, default=RUNNING)
+    error = models.TextField(default="", blank=True)
+    started = models.DateTimeField(auto_now_add=True, db_index=True)
+    finished = models.DateTimeField(blank=True, null=True)
+    seconds = models.FloatField(blank=True, null=True)
+    # entities created, updated and linked, and requests sent, by name
+    counts = models.JSONField(default=dict, blank=True)
+    request_count = models.IntegerField(default=0)
+    throttle_count = models.IntegerField(default=0)
+    # the spans kept in start order, the totals per span name and the slowest spans
+    spans = models.JSONField(default=list, blank=True)
+    operations = models.JSONField(default=dict, blank=True)
+    slowest = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return f"sync {self.started}({self.status})"
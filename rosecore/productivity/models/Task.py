@@ -2,14 +2,20 @@ from django.db import models
 
 class Task(models.Model):
     id = models.AutoField(primary_key=True)
-    content = models.CharField(max_length=100, unique=True)
-    description = models.CharField(max_length=100, unique=True)
+    content = models.CharField(max_length=100)
+    description = models.CharField(max_length=100, blank=True)
     project = models.ForeignKey('Project', blank=True, null=True, related_name='Tasks', on_delete=models.CASCADE)
     priority = models.IntegerField()
-    todoistId = models.CharField(max_length=50)
-    next_due=models.DateTimeField()
+    todoistId = models.CharField(max_length=50, db_index=True)
+    next_due=models.DateTimeField(blank=True, null=True)
     complete=models.BooleanField(blank=False, default=False)
 
+    class Meta:
+        indexes = [
+            # a project's open tasks in id order, for keyset pagination
+            models.Index(fields=["project", "complete", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.content}({self.project.name}) - {self.next_due}"
     
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class TimeEntry(models.Model):
+    """
+    A toggl time entry mirrored locally so time spent can be queried without calling toggl
+    """
+    id = models.AutoField(primary_key=True)
+    togglId = models.CharField(max_length=50, unique=True)
+    project = models.ForeignKey('Project', blank=True, null=True, related_name='time_entries',
+                                on_delete=models.SET_NULL)
+    description = models.CharField(max_length=200, default="", blank=True)
+    start = models.DateTimeField()
+    stop = models.DateTimeField(blank=True, null=True)
+    # seconds between start and stop, 0 while the entry is running
+    duration = models.IntegerField(default=0)
+    tags = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "start"]),
+            models.Index(fields=["start", "stop"]),
+        ]
+
+    def __str__(self):
+        return f"{self.description}({self.start} - {self.stop})"
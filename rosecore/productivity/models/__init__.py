@@ -1,2 +1,6 @@
 from .Project import Project
 from .Task import Task
+from .Job import Job
+from .TimeEntry import TimeEntry
+from .SyncRun import SyncRun
+from .ProcessMetrics import ProcessMetrics
@@ -0,0 +1,144 @@
+from productivity.models.Job import Job
+from productivity.models.Project import Project
+from django.conf import settings
+from django.db import connection, transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+import logging
+import traceback
+
+from .MetricsService import MetricsService
+from .ProjectService import ProjectService
+from .TogglService import TogglService
+
+
+class JobService:
+    SYNC = "sync"
+    NUKE_UNSYNCED = "nuke_unsynced"
+    VALIDATE_PROJECT = "validate_project"
+
+    @staticmethod
+    def enqueue(kind: str, **arguments) -> Job:
+        """
+        Queues a job for the worker, arguments must be json serializable
+        """
+        if kind not in JobService._handlers():
+            raise ValueError(f"unknown job kind: {kind}")
+        return Job.objects.create(kind=kind, arguments=arguments)
+
+    @staticmethod
+    def get_job_or_404(job_id) -> Job:
+        """
+        Gets a job or throws a 404 exception
+        """
+        return get_object_or_404(Job, pk=job_id)
+
+    @staticmethod
+    def claim_next() -> Optional[Job]:
+        """
+        Claims the oldest queued job and marks it running, returns None if
+        there is nothing to do. Uses SELECT ... FOR UPDATE SKIP LOCKED where
+        the database has it so several workers never claim the same job.
+        Running jobs whose worker died are failed first
+        """
+        JobService.fail_stale()
+        queued = Job.objects.filter(status=Job.QUEUED).order_by("created", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                job = queued.select_for_update(skip_locked=True).first()
+                if job is None:
+                    return None
+                job.status = Job.RUNNING
+                job.started = job.heartbeat = timezone.now()
+                job.save(update_fields=["status", "started", "heartbeat"])
+                return job
+        # sqlite has no row locks, a conditional update only succeeds for one worker
+        for job_id in queued.values_list("id", flat=True)[:10]:
+            now = timezone.now()
+            claimed = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+                status=Job.RUNNING, started=now, heartbeat=now)
+            if claimed:
+                return Job.objects.get(id=job_id)
+        return None
+
+    @staticmethod
+    def fail_stale() -> int:
+        """
+        Fails the running jobs that have not reported progress for
+        JOB_STALE_SECONDS, their worker has died. returns how many
+        """
+        stale = timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+        failed = Job.objects.filter(status=Job.RUNNING, heartbeat__lt=stale).update(
+            status=Job.FAILED, finished=timezone.now(),
+            error=f"the worker stopped responding for over {settings.JOB_STALE_SECONDS:g} seconds")
+        if failed:
+            logging.warning(f"failed {failed} jobs whose worker stopped responding")
+        return failed
+
+    @staticmethod
+    def run(job: Job) -> None:
+        """
+        Runs a claimed job, the outcome(and any error) is stored on the job
+        """
+        handler = JobService._handlers()[job.kind]
+        # the web process may have changed toggl since this worker last synced
+        TogglService.refresh()
+        try:
+            handler(progress=lambda progress, message="": JobService.report_progress(job, progress, message),
+                    **job.arguments)
+            job.status = Job.DONE
+            job.progress = 1
+        except Exception:
+            logging.exception(f"job {job.id} ({job.kind}) failed")
+            job.status = Job.FAILED
+            job.error = traceback.format_exc()
+        job.finished = timezone.now()
+        job.save(update_fields=["status", "progress", "error", "finished"])
+        # the sync timings and request counts were recorded in this process
+        MetricsService.publish()
+
+    @staticmethod
+    def report_progress(job: Job, progress: float, message: str="") -> None:
+        """
+        Stores how far along(0 to 1) a running job is, it doubles as the
+        job's heartbeat
+        """
+        job.progress = progress
+        job.message = message[:200]
+        job.heartbeat = timezone.now()
+        job.save(update_fields=["progress", "message", "heartbeat"])
+
+    @staticmethod
+    def _handlers() -> Dict[str, Callable]:
+        return {
+            JobService.SYNC: ProjectService.sync,
+            JobService.NUKE_UNSYNCED: ProjectService.nuke_all_unsynced,
+            JobService.VALIDATE_PROJECT: JobService._validate_project,
+        }
+
+    @staticmethod
+    def _validate_project(project_id: int, progress: Callable=None) -> None:
+        ProjectService.validate_project(Project.objects.get(pk=project_id))
+
+    @staticmethod
+    def formatJob(job: Job) -> dict:
+        """
+        formats a job for the status endpoint
+        """
+        duration = job.duration
+        if duration is None and job.started is not None:
+            duration = timezone.now() - job.started
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "progress": job.progress,
+            "message": job.message,
+            "error": job.error,
+            "created": job.created.isoformat(),
+            "started": job.started.isoformat() if job.started is not None else None,
+            "finished": job.finished.isoformat() if job.finished is not None else None,
+            "duration": duration.total_seconds() if duration is not None else None,
+        }
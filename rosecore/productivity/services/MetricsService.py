@@ -0,0 +1,42 @@
+from datetime import timedelta
+import os
+import socket
+
+from django.conf import settings
+from django.utils import timezone
+
+from productivity.models.ProcessMetrics import ProcessMetrics
+from productivity.utilities.metrics import REGISTRY
+
+
+class MetricsService:
+    @staticmethod
+    def _process() -> str:
+        """
+        names this process, looked up each time as gunicorn forks after import
+        """
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def publish() -> None:
+        """
+        stores this process's metrics for /metrics to render, and drops the
+        snapshots of processes that stopped publishing
+        """
+        ProcessMetrics.objects.update_or_create(process=MetricsService._process(),
+                                                defaults={"metrics": REGISTRY.snapshot()})
+        ProcessMetrics.objects.filter(updated__lt=MetricsService._stale_before()).delete()
+
+    @staticmethod
+    def render() -> str:
+        """
+        this process's metrics with the ones other processes published
+        added in, in the prometheus text format. One query
+        """
+        others = ProcessMetrics.objects.filter(updated__gte=MetricsService._stale_before()).exclude(
+            process=MetricsService._process()).values_list("metrics", flat=True)
+        return REGISTRY.render(others)
+
+    @staticmethod
+    def _stale_before():
+        return timezone.now() - timedelta(seconds=settings.METRICS_STALE_SECONDS)
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Iterable, List
+
+from productivity.models.Project import Project
+from .TodoistService import TodoistService
+from .TogglService import TogglService
+from productivity.utilities.cache import RemoteIndex
+from productivity.utilities.concurrency import fan_out
+
+
+@dataclass
+class SyncOperation:
+    """
+    A single change needed to bring a local project in line with a remote service
+    """
+    LINK = "link"
+    CREATE = "create"
+
+    action: str
+    service: str
+    project: Project
+    remote_id: str = None
+
+
+class ProjectReconciler:
+    """
+    Computes and applies the operations needed so every local project has a
+    project in todoist and toggl, works off of one snapshot of each service
+    """
+    TODOIST = "todoist"
+    TOGGL = "toggl"
+
+    def __init__(self, projects: Iterable[Project], todoist: RemoteIndex, toggl: RemoteIndex):
+        self._projects = {project.id: project for project in projects}
+        self._indexes = {
+            ProjectReconciler.TODOIST: todoist,
+            ProjectReconciler.TOGGL: toggl,
+        }
+
+    def plan(self) -> List[SyncOperation]:
+        """
+        A single pass over the local projects(parents first) that lists the
+        links and creates needed, projects already matching are skipped
+        """
+        operations = []
+        for project in self._parents_first():
+            for service, index in self._indexes.items():
+                local_id = self._remote_id(project, service)
+                match = index.match(local_id, project.name)
+                if match is None:
+                    operations.append(SyncOperation(SyncOperation.CREATE, service, project))
+                elif str(match["id"]) != str(local_id):
+                    operations.append(SyncOperation(SyncOperation.LINK, service, project, str(match["id"])))
+        return operations
+
+    def apply(self, operations: List[SyncOperation], save: bool=True) -> List[Project]:
+        """
+        applies the planned operations, creating remote projects as needed,
+        changed projects are saved in one bulk update. returns the changed projects
+        """
+        changed = {}
+        creates = {service: [] for service in self._indexes}
+        for operation in operations:
+            project = operation.project
+            changed.setdefault(project.id, (project, project.todoistId, project.togglId))
+            if operation.action == SyncOperation.CREATE:
+                creates[operation.service].append(operation)
+            else:
+                self._set_remote_id(project, operation.service, operation.remote_id)
+        # each service creates its projects in order(parents first) on its own thread,
+        # whatever was created is saved even if the other service failed
+        try:
+            fan_out(**{
+                service: partial(self._create_all, service_creates)
+                for service, service_creates in creates.items() if service_creates
+            })
+        finally:
+            # a failed create leaves its project's id as it was, so it is not saved
+            changed = [project for project, todoist_id, toggl_id in changed.values()
+                       if (project.todoistId, project.togglId) != (todoist_id, toggl_id)]
+            if save and changed:
+                Project.objects.bulk_update(changed, ["todoistId", "togglId"])
+        return changed
+
+    def _create_all(self, operations: List[SyncOperation]) -> None:
+        """
+        runs the create operations of one service in order, todoist creates
+        go out in one batch and their temp ids are swapped for the real ids.
+        If the batch fails, or todoist does not map a temp id, the project
+        keeps the id it had
+        """
+        if operations[0].service != ProjectReconciler.TODOIST:
+            for operation in operations:
+                self._set_remote_id(operation.project, operation.service, self._create(operation))
+            return
+        previous = {operation.project.id: operation.project.todoistId for operation in operations}
+        temp_ids = {}
+        try:
+            with TodoistService.batch():
+                for operation in operations:
+                    temp_ids[operation.project.id] = self._create(operation)
+                    operation.project.todoistId = temp_ids[operation.project.id]
+        except Exception:
+            for operation in operations:
+                operation.project.todoistId = previous[operation.project.id]
+            raise
+        for operation in operations:
+            temp_id = temp_ids[operation.project.id]
+            real_id = TodoistService.resolve_id(temp_id)
+            operation.project.todoistId = real_id if real_id != temp_id else previous[operation.project.id]
+
+    def _create(self, operation: SyncOperation) -> str:
+        """
+        creates the remote project for a create operation
+        """
+        project = operation.project
+        if operation.service == ProjectReconciler.TODOIST:
+            project_args = {
+                "name": project.name
+            }
+            parent = self._projects.get(project.parent_id)
+            if parent is not None:
+                project_args["parent_id"] = parent.todoistId
+            return TodoistService.createProject(**project_args)
+        return TogglService.createProject(name=project.name)
+
+    def _parents_first(self) -> List[Project]:
+        """
+        orders the projects so that a parent always comes before its children
+        """
+        depths = {}
+        for project_id in self._projects:
+            chain = []
+            current = project_id
+            while current in self._projects and current not in depths and current not in chain:
+                chain.append(current)
+                current = self._projects[current].parent_id
+            depth = depths.get(current, -1)
+            for link in reversed(chain):
+                depth += 1
+                depths[link] = depth
+        return sorted(self._projects.values(), key=lambda project: depths[project.id])
+
+    @staticmethod
+    def _remote_id(project: Project, service: str) -> str:
+        if service == ProjectReconciler.TODOIST:
+            return project.todoistId
+        return project.togglId
+
+    @staticmethod
+    def _set_remote_id(project: Project, service: str, remote_id: str) -> None:
+        if service == ProjectReconciler.TODOIST:
+            project.todoistId = remote_id
+        else:
+            project.togglId = remote_id
@@ -1,8 +1,21 @@
 from productivity.models.Project import Project
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Q
 from .TodoistService import TodoistService
 from .TogglService import TogglService
-from productivity.utilities.exceptions import InvalidProject
+from .ProjectReconciler import ProjectReconciler, RemoteIndex, SyncOperation
+from .ProjectTree import ProjectTree
+from .TimeEntryService import TimeEntryService
+from .TaskService import TaskService
+from .SyncRunService import SyncRunService
+from productivity.utilities.exceptions import InvalidProject, RemoteServiceError
+from productivity.utilities.metrics import SYNC_PHASE_SECONDS
+from productivity.utilities.cache import remote_scope
+from productivity.utilities.concurrency import fan_out
+from productivity.utilities import tracing
+from contextlib import contextmanager
+from typing import Callable, List
 import logging
 
 
@@ -18,10 +31,11 @@ class ProjectService:
 
     @staticmethod
     def synced_queryset(*args, **kwargs):
-        synced_ids = [project.id for project in Project.objects.all()
-                      if project.synced]
-        return Project.objects.filter(id__in=synced_ids)
-        
+        """
+        Gets the synced projects, lazily so it is safe at import time
+        """
+        return Project.objects.synced()
+
 
     @staticmethod
     def get_project_or_404(project_id):
@@ -47,21 +61,36 @@ class ProjectService:
             
             
         parent = args["parent"] if "parent" in args else None
-        if "todoistId" in args:
-            ProjectService.validateTodoistId(args["todoistId"])
-            project_args["todoistId"] = args["todoistId"]
-        else:
+        parent_todoist_id = parent.todoistId if parent is not None else None
+
+        def todoist() -> str:
+            if "todoistId" in args:
+                ProjectService.validateTodoistId(args["todoistId"])
+                return args["todoistId"]
             if allowedToCreate:
-                todoistId = TodoistService.createProject(name,
-                                                         parent_id=parent.todoistId if parent is not None else None)
-                project_args["todoistId"] = todoistId
-        if "togglId" in args:
-            ProjectService.validateTogglId(args["togglId"])
-            project_args["togglId"] = args["togglId"]
-        else:
+                return TodoistService.createProject(name, parent_id=parent_todoist_id)
+            return None
+
+        def toggl() -> str:
+            if "togglId" in args:
+                ProjectService.validateTogglId(args["togglId"])
+                return args["togglId"]
             if allowedToCreate:
-                togglId = TogglService.createProject(name)
-                project_args["togglId"] = togglId
+                return TogglService.createProject(name)
+            return None
+
+        try:
+            remote_ids = fan_out(todoist=todoist, toggl=toggl)
+        except RemoteServiceError as error:
+            # a bad id is the callers mistake rather than a service failure
+            for service_error in error.errors.values():
+                if isinstance(service_error, InvalidProject):
+                    raise service_error
+            raise
+        if remote_ids["todoist"] is not None:
+            project_args["todoistId"] = remote_ids["todoist"]
+        if remote_ids["toggl"] is not None:
+            project_args["togglId"] = remote_ids["toggl"]
         project = Project(
             **project_args
         )
@@ -74,12 +103,16 @@ class ProjectService:
         """
         syncs a project and ensures that the project exists everywhere
         """
+        calls = {}
         if not ProjectService.TODOIST_UNSYNC_SOURCE in project.unsyncedSource:
-            todoist_id = TodoistService.createProject(project.name)
-            project.todoistId = todoist_id
+            calls["todoist"] = lambda: TodoistService.createProject(project.name)
         if not ProjectService.TOGGL_UNSYNC_SOURCE in project.unsyncedSource:
-            toggl_id = TogglService.createProject(project.name)
-            project.togglId = toggl_id
+            calls["toggl"] = lambda: TogglService.createProject(project.name)
+        remote_ids = fan_out(**calls)
+        if "todoist" in remote_ids:
+            project.todoistId = remote_ids["todoist"]
+        if "toggl" in remote_ids:
+            project.togglId = remote_ids["toggl"]
         project.unsyncedSource=""
         project.save()
         logging.info(f"validated project: {project.id}")
@@ -92,13 +125,23 @@ class ProjectService:
         """
         return Project.objects.all().filter(parent=None)[:limit]
 
+    @staticmethod
+    def get_project_tree() -> ProjectTree:
+        """
+        Gets every project linked up into a tree, in one query
+        """
+        return ProjectTree.load()
+
     @staticmethod
     def updateProject(project: Project)->None:
         """
-        Updates a project
+        Updates a project, a move under itself is refused before anything is sent
         """
-        TodoistService.updateProject({"id": project.todoistId, "name": project.name, "parent_id": project.parent.todoistId if project.parent is not None else None})
-        TogglService.updateProject({"id": project.togglId, "name": project.name})
+        project.validate_parent(project.parent)
+        todoist_data = {"id": project.todoistId, "name": project.name, "parent_id": project.parent.todoistId if project.parent is not None else None}
+        toggl_data = {"id": project.togglId, "name": project.name}
+        fan_out(todoist=lambda: TodoistService.updateProject(todoist_data),
+                toggl=lambda: TogglService.updateProject(toggl_data))
         project.save()
 
     @staticmethod
@@ -106,18 +149,60 @@ class ProjectService:
         """
         Delets a project
         """
+        subtree = list(ProjectService.get_subtree(project))
+
+        def toggl() -> None:
+            for subproject in subtree:
+                ProjectService._delete_toggl_project(subproject)
+
+        # todoist deletes the subprojects along with the project
+        fan_out(todoist=lambda: ProjectService._delete_todoist_project(project),
+                toggl=toggl)
+        ProjectService.get_subtree(project).delete()
+
+    @staticmethod
+    def get_subtree(project: Project, include_self: bool=True):
+        """
+        Gets a project's descendants(and the project), one query on the path index
+        """
+        subtree = Q(path__startswith=project.subtree_path)
+        if include_self:
+            subtree |= Q(id=project.id)
+        return Project.objects.filter(subtree)
+
+    @staticmethod
+    def get_breadcrumbs(project: Project) -> List[Project]:
+        """
+        Gets a project's ancestors, root first, in one query
+        """
+        ancestor_ids = project.ancestor_ids
+        if not ancestor_ids:
+            return []
+        ancestors = Project.objects.in_bulk(ancestor_ids)
+        return [ancestors[id] for id in ancestor_ids if id in ancestors]
+
+    @staticmethod
+    def _delete_todoist_project(project: Project, todoist_projects: List[dict]=None) -> None:
+        """
+        deletes the todoist side of a project, if it has no todoist id a
+        todoist project with the same name is deleted instead
+        """
         if (project.todoistId is not None) and (project.todoistId != ""):
             TodoistService.deleteProject(project.todoistId)
         else:
             # check for another project
-            projects = [project for project in TodoistService.getAllProjects()]
-            if project.name in [project["name"] for project in projects]:
-                TodoistService.deleteProject(
-                    [tproject for tproject in projects if project.name == tproject["name"]][0]["id"]
-                )   
+            projects = todoist_projects if todoist_projects is not None else TodoistService.getAllProjects()
+            matches = [tproject for tproject in projects if project.name == tproject["name"]]
+            if matches:
+                TodoistService.deleteProject(matches[0]["id"])
+
+    @staticmethod
+    def _delete_toggl_project(project: Project) -> None:
+        """
+        deletes the toggl side of a project
+        """
         if (project.togglId is not None) and (project.togglId != ""):
             TogglService.deleteProject(project.togglId)
-        project.delete()
 
     @staticmethod
     def markUnsynced(data: dict)->None:
@@ -133,7 +218,7 @@ class ProjectService:
         """
         ensure the todoist project id is valud
         """
-        if not (todoistId in [project["id"] for project in TodoistService.getAllProjects()]):
+        if str(todoistId) not in TodoistService.getProjectIndex().by_id:
             raise InvalidProject(
                 "todoistId", str(todoistId)
             )
@@ -143,20 +228,63 @@ class ProjectService:
         """
         Ensures the toggl project id is valid
         """
-        if not (togglId in [project["id"] for project in TogglService.getAllProjects()]):
+        if str(togglId) not in TogglService.getProjectIndex().by_id:
             raise InvalidProject(
                 "togglId", str(togglId)
             )
 
     @staticmethod
-    def sync():
+    def sync(full: bool=False, progress: Callable[[float, str], None]=None):
         """
-        syncs all of the projects
+        syncs all of the projects, full drops the cached todoist state first,
+        progress is called with how far along(0 to 1) the sync is. Remote
+        reads are memoized for the whole run, which is recorded as a SyncRun
         """
-        TodoistService.sync()
-        TogglService.sync()
-        ProjectService._ensure_client_projects_present()
-        ProjectService._check_for_unsynced_projects()
+        progress = progress or ProjectService._ignore_progress
+        phase = ProjectService._sync_phase
+
+        def todoist() -> None:
+            with tracing.span("todoist sync", full=full):
+                TodoistService.sync(full=full)
+
+        def toggl() -> None:
+            with tracing.span("toggl sync"):
+                TogglService.sync()
+
+        with SyncRunService.record(full=full), remote_scope():
+            progress(0, "syncing todoist and toggl")
+            with phase("pull"):
+                fan_out(todoist=todoist, toggl=toggl)
+                todoist_index = RemoteIndex(TodoistService.getAllProjects(sync=False))
+                toggl_index = TogglService.getProjectIndex()
+            progress(0.4, "making sure todoist and toggl have every project")
+            with phase("remote_projects"):
+                ProjectService._ensure_client_projects_present(todoist_index, toggl_index)
+            progress(0.6, "checking for unsynced projects")
+            with phase("unsynced_projects"):
+                ProjectService._check_for_unsynced_projects(todoist_index, toggl_index)
+            progress(0.8, "mirroring tasks")
+            with phase("tasks"):
+                created, updated, completed = TaskService.mirror(TodoistService.getAllTasks(sync=False))
+                tracing.count("tasks_created", created)
+                tracing.count("tasks_updated", updated)
+                tracing.count("tasks_completed", completed)
+            progress(0.9, "mirroring time entries")
+            with phase("time_entries"):
+                created, updated, deleted = TimeEntryService.mirror(TogglService.getTimeEntries(),
+                                                                    TogglService.getTimeEntryWindow())
+                tracing.count("time_entries_created", created)
+                tracing.count("time_entries_updated", updated)
+                tracing.count("time_entries_deleted", deleted)
+
+    @staticmethod
+    @contextmanager
+    def _sync_phase(name: str):
+        """
+        times a phase of sync into the phase histogram and the run's trace
+        """
+        with SYNC_PHASE_SECONDS.time(phase=name), tracing.span(name):
+            yield
 
     @staticmethod
     def merge_synced_and_unsynced(synced_project: Project, unsynced_project: Project) -> None:
@@ -181,99 +309,105 @@ class ProjectService:
         unsynced_project.delete()
 
     @staticmethod
-    def nuke_all_unsynced() -> None:
+    def nuke_all_unsynced(progress: Callable[[float, str], None]=None) -> None:
         """
-        deletes all unsynced projects
+        deletes all unsynced projects. If a service fails the projects that
+        are gone from every service they were on are still deleted locally
+        before the error is raised
         """
-        for project in Project.objects.all():
-            if not project.synced:
-                ProjectService.deleteProject(project)
+        progress = progress or ProjectService._ignore_progress
+        unsynced = list(Project.objects.unsynced())
+        progress(0, f"deleting {len(unsynced)} unsynced projects")
+        # toggl deletes one at a time, so a failure can leave some done
+        toggl_deleted = set()
+
+        def todoist() -> None:
+            todoist_projects = TodoistService.getAllProjects()
+            with TodoistService.batch():
+                for project in unsynced:
+                    ProjectService._delete_todoist_project(project, todoist_projects)
+
+        def toggl() -> None:
+            for project in unsynced:
+                ProjectService._delete_toggl_project(project)
+                toggl_deleted.add(project.id)
+
+        try:
+            fan_out(todoist=todoist, toggl=toggl)
+        except RemoteServiceError as error:
+            def gone(project: Project) -> bool:
+                off_todoist = "todoist" not in error.errors or (
+                    not project.todoistId and ProjectService.TODOIST_UNSYNC_SOURCE not in project.unsyncedSource)
+                off_toggl = project.id in toggl_deleted or not project.togglId
+                return off_todoist and off_toggl
+            Project.objects.filter(id__in=[project.id for project in unsynced if gone(project)]).delete()
+            raise
+        Project.objects.filter(id__in=[project.id for project in unsynced]).delete()
+
+    @staticmethod
+    def _ignore_progress(progress: float, message: str="") -> None:
+        pass
     @staticmethod
-    def _ensure_client_projects_present(save: bool=True):
+    def _ensure_client_projects_present(todoist_index: RemoteIndex,
+                                        toggl_index: RemoteIndex,
+                                        save: bool=True):
         """
         For all projects in the databse that are synced, ensure that
         the clients(Todoist and Toggl) have projects with the id listed
         will check for id match, then name match, then create it
         """
-        for project in Project.objects.all():
-            todoist_id = ProjectService._ensure_project_present_todoist(project)
-            toggl_id = ProjectService._ensure_project_present_toggl(project)
-            project.todoistId = todoist_id
-            project.togglId = toggl_id
-            if save:
-                project.save()
-    @staticmethod
-    def _ensure_project_present_todoist(project: Project) -> str:
-        """
-        ensures a specified client project is present in todoist
-        """
-        correctProject = None
-        for todoist_project in TodoistService.getAllProjects():
-            if todoist_project["id"] == project.todoistId:
-                correctProject = todoist_project
-                break
-            elif todoist_project["name"] == project.name:
-                correctProject = todoist_project
-        if correctProject is not None:
-            return correctProject["id"]
-        else:
-            project_args = {
-                "name": project.name
-            }
-            if project.parent is not None:
-                project_args["parent_id"] = project.parent.todoistId
-            todoist_id = TodoistService.createProject(**project_args)
-            return todoist_id
-
-
-    @staticmethod
-    def _ensure_project_present_toggl(project: Project) -> str:
-        """
-        ensure a given client project is present todoist
-        """
-        correctProject = None
-        for toggl_project in TogglService.getAllProjects():
-            if toggl_project["id"] == project.todoistId:
-                correctProject = toggl_project
-                break
-            elif toggl_project["name"] == project.name:
-                correctProject = toggl_project
-        if correctProject is not None:
-            return correctProject["id"]
-        else:
-            project_args = {
-                "name": project.name
-            }
-            toggl_id = TogglService.createProject(**project_args)
-            return toggl_id
+        reconciler = ProjectReconciler(Project.objects.all(), todoist_index, toggl_index)
+        operations = reconciler.plan()
+        tracing.count("projects_linked", sum(operation.action == SyncOperation.LINK for operation in operations))
+        tracing.count("remote_projects_created",
+                      sum(operation.action == SyncOperation.CREATE for operation in operations))
+        return reconciler.apply(operations, save=save)
 
     @staticmethod
-    def _check_for_unsynced_projects() -> None:
+    def _check_for_unsynced_projects(todoist_index: RemoteIndex, toggl_index: RemoteIndex) -> List[Project]:
         """
         ensures that all projects that exist only on todoist/toggl are
-        present and mark as unsynced with the correct source
-        """
-        ProjectService._check_for_unsynced_todoist_projects()
-        ProjectService._check_for_unsynced_toggl_projects()
+        present and mark as unsynced with the correct source, the
+        missing projects are inserted in one bulk create
+        """
+        # only the remote ids are looked up, each one an index seek
+        with tracing.span("local id lookup"):
+            local_ids = Project.objects.filter(
+                Q(todoistId__in=todoist_index.ids()) | Q(togglId__in=toggl_index.ids())
+            ).values_list("todoistId", "togglId")
+            local_todoist_ids = set()
+            local_toggl_ids = set()
+            for todoist_id, toggl_id in local_ids:
+                local_todoist_ids.add(todoist_id)
+                local_toggl_ids.add(toggl_id)
+        with tracing.span("todoist unsynced check"):
+            unsynced = ProjectService._unsynced_todoist_projects(todoist_index, local_todoist_ids)
+        with tracing.span("toggl unsynced check"):
+            unsynced.extend(ProjectService._unsynced_toggl_projects(toggl_index, local_toggl_ids))
+        tracing.count("unsynced_projects_added", len(unsynced))
+        with tracing.span("unsynced bulk create", projects=len(unsynced)), transaction.atomic():
+            return Project.objects.bulk_create(unsynced)
 
     @staticmethod
-    def _check_for_unsynced_todoist_projects() -> None:
+    def _unsynced_todoist_projects(todoist_index: RemoteIndex, local_ids: set) -> List[Project]:
         """
-        CHecks for any todoist-only projects
+        builds, without saving, the projects for any todoist-only projects
         """
-        for todoist_project in TodoistService.getAllProjects():
-            if not todoist_project["id"] in [project.todoistId for project in ProjectService.get_projects()]:
-                ProjectService.createProject(todoist_project["name"],
-                                             todoistId=todoist_project["id"],
-                                             unsyncedSource=ProjectService.TODOIST_UNSYNC_SOURCE)
+        return [
+            Project(name=todoist_index.by_id[todoist_id]["name"],
+                    todoistId=todoist_id,
+                    unsyncedSource=ProjectService.TODOIST_UNSYNC_SOURCE)
+            for todoist_id in sorted(todoist_index.ids() - local_ids)
+        ]
 
     @staticmethod
-    def _check_for_unsynced_toggl_projects() -> None:
+    def _unsynced_toggl_projects(toggl_index: RemoteIndex, local_ids: set) -> List[Project]:
         """
-        Checks for any toggl-only projects
+        builds, without saving, the projects for any toggl-only projects
         """
-        for toggl_project in TogglService.getAllProjects():
-            if not toggl_project["id"] in [project.togglId for project in ProjectService.get_projects()]:
-                ProjectService.createProject(toggl_project["name"],
-                                             togglId=toggl_project["id"],
-                                             unsyncedSource=ProjectService.TOGGL_UNSYNC_SOURCE)
+        return [
+            Project(name=toggl_index.by_id[toggl_id]["name"],
+                    togglId=toggl_id,
+                    unsyncedSource=ProjectService.TOGGL_UNSYNC_SOURCE)
+            for toggl_id in sorted(toggl_index.ids() - local_ids)
+        ]
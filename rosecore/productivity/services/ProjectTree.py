@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Tuple
+
+from productivity.models.Project import Project
+
+
+@dataclass
+class ProjectTreeRow:
+    """
+    One project of the flattened tree, closes is how many levels end after it
+    """
+    project: Project
+    depth: int
+    has_children: bool
+    closes: range
+
+
+class ProjectTree:
+    """
+    The whole project hierarchy, loaded with one query and linked up in memory
+    """
+
+    def __init__(self, projects: Iterable[Project]):
+        self.projects = {project.id: project for project in projects}
+        self.children = {project_id: [] for project_id in self.projects}
+        self.roots = []
+        for project in self.projects.values():
+            if project.parent_id in self.projects:
+                self.children[project.parent_id].append(project)
+            else:
+                self.roots.append(project)
+
+    @staticmethod
+    def load() -> "ProjectTree":
+        return ProjectTree(Project.objects.order_by("id"))
+
+    def walk(self) -> Iterator[Tuple[Project, int]]:
+        """
+        every project with its depth, parents before their children(depth
+        first), without recursion
+        """
+        stack = [(project, 0) for project in reversed(self.roots)]
+        while stack:
+            project, depth = stack.pop()
+            yield project, depth
+            stack.extend((child, depth + 1) for child in reversed(self.children[project.id]))
+
+    def rows(self) -> List[ProjectTreeRow]:
+        """
+        the tree flattened for rendering in a single loop
+        """
+        walked = list(self.walk())
+        rows = []
+        for index, (project, depth) in enumerate(walked):
+            has_children = bool(self.children[project.id])
+            next_depth = walked[index + 1][1] if index + 1 < len(walked) else 0
+            rows.append(ProjectTreeRow(project, depth, has_children,
+                                       range(0 if has_children else depth - next_depth)))
+        return rows
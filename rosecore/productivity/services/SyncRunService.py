@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from statistics import median
+from typing import List
+import traceback
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from productivity.models.SyncRun import SyncRun
+from productivity.utilities import tracing
+
+
+class SyncRunService:
+    # finished runs a run is compared with when looking for a regression
+    BASELINE_RUNS = 10
+    # times slower(or chattier) than the baseline a regressed run is
+    REGRESSION_FACTOR = 1.5
+
+    @staticmethod
+    @contextmanager
+    def record(full: bool=False):
+        """
+        traces the block into a new SyncRun, which is saved when the block
+        ends whether or not it raised
+        """
+        run = SyncRun.objects.create(full=full)
+        with tracing.trace() as trace:
+            try:
+                yield run
+                run.status = SyncRun.DONE
+            except Exception:
+                run.status = SyncRun.FAILED
+                run.error = traceback.format_exc()
+                raise
+            finally:
+                SyncRunService._finish(run, trace)
+
+    @staticmethod
+    def _finish(run: SyncRun, trace: tracing.Trace) -> None:
+        run.finished = timezone.now()
+        run.seconds = (run.finished - run.started).total_seconds()
+        run.counts = dict(sorted(trace.counts.items()))
+        run.request_count = sum(value for name, value in trace.counts.items() if name.endswith("_requests"))
+        run.throttle_count = sum(value for name, value in trace.counts.items() if name.endswith("_throttled"))
+        run.spans = trace.spans
+        run.operations = dict(sorted(trace.operations.items(),
+                                     key=lambda operation: operation[1]["seconds"], reverse=True))
+        run.slowest = trace.slowest()
+        run.save()
+
+    @staticmethod
+    def get_run_or_404(run_id) -> SyncRun:
+        return get_object_or_404(SyncRun, pk=run_id)
+
+    @staticmethod
+    def get_history(limit: int=50) -> List[dict]:
+        """
+        the latest runs, newest first, each with the median seconds and
+        requests of the finished runs before it and whether it regressed
+        against them. One query
+        """
+        runs = list(SyncRun.objects.defer("spans", "operations").order_by("-started", "-id")[
+            :limit + SyncRunService.BASELINE_RUNS])
+        history = []
+        for i, run in enumerate(runs[:limit]):
+            baseline = [earlier for earlier in runs[i + 1:] if earlier.status == SyncRun.DONE][
+                :SyncRunService.BASELINE_RUNS]
+            row = {"run": run, "baseline_seconds": None, "baseline_requests": None, "regression": False}
+            if baseline:
+                row["baseline_seconds"] = median(earlier.seconds for earlier in baseline)
+                row["baseline_requests"] = median(earlier.request_count for earlier in baseline)
+                row["regression"] = run.status == SyncRun.DONE and (
+                    run.seconds > SyncRunService.REGRESSION_FACTOR * row["baseline_seconds"]
+                    or run.request_count > SyncRunService.REGRESSION_FACTOR * max(row["baseline_requests"], 1))
+            history.append(row)
+        return history
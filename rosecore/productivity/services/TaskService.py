@@ -1,23 +1,36 @@
 from productivity.models.Task import Task
 from productivity.models.Project import Project
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from typing import Dict, List, Tuple
 import datetime
 
 from productivity.services.TodoistService import TodoistService
 
 class TaskService:
+    UPDATE_FIELDS = ["content", "description", "project", "priority", "next_due", "complete"]
+    BATCH_SIZE = 500
+
     @staticmethod
     def get_tasks(limit=None):
-        return Task.objects.all()[:limit]
+        return Task.objects.select_related("project")[:limit]
 
     @staticmethod
-    def get_tasks_from_project(project: Project, limit: int=None):
-        project_tasks = Task.objects.filter(project__name__contains=project.name)[:limit]
-        return [project for project in project_tasks if not project.complete]
+    def get_tasks_from_project(project: Project, limit: int=None, after: int=None):
+        """
+        the projects incomplete tasks in id order, after is the last task id
+        of the previous page
+        """
+        project_tasks = Task.objects.filter(project=project, complete=False)
+        if after is not None:
+            project_tasks = project_tasks.filter(id__gt=after)
+        return project_tasks.select_related("project").order_by("id")[:limit]
 
     @staticmethod
     def get_task_or_404(task_id):
-        return get_object_or_404(Task, pk=task_id)
+        return get_object_or_404(Task.objects.select_related("project"), pk=task_id)
 
     @staticmethod
     def createTask(content:str="content",
@@ -48,6 +61,19 @@ class TaskService:
             task.save()
         return task
 
+    @staticmethod
+    def createTasks(tasks: List[dict]) -> List[Task]:
+        """
+        creates many tasks, each dict holds createTask's arguments. Todoist
+        gets them in one commit and they are saved in one bulk insert
+        """
+        with TodoistService.batch():
+            created = [TaskService.createTask(**task, commit=False) for task in tasks]
+        for task in created:
+            task.todoistId = TodoistService.resolve_id(task.todoistId)
+        with transaction.atomic():
+            return Task.objects.bulk_create(created, batch_size=TaskService.BATCH_SIZE)
+
     @staticmethod
     def deleteTask(task: Task) -> None:
         """
@@ -90,10 +116,74 @@ class TaskService:
     @staticmethod
     def validateTodoistId(todoistId: str) -> bool:
         """
-        validates an id is actually on todoist
+        validates an id is a todoist task, checked against the local mirror
+        so it is only as fresh as the last sync
+        """
+        return Task.objects.filter(todoistId=str(todoistId)).exists()
+
+    @staticmethod
+    def mirror(tasks: List[dict]) -> Tuple[int, int, int]:
+        """
+        upserts a snapshot of the todoist tasks(as TodoistService exports
+        them) into the local tasks with one bulk create and one bulk update.
+        Open local tasks that are not in the snapshot were closed(or deleted)
+        on todoist and are marked complete. returns how many were created,
+        updated and completed
+        """
+        tasks = {task["id"]: task for task in tasks if task["id"] is not None}
+        project_ids = dict(Project.objects.filter(
+            todoistId__in={task["project_id"] for task in tasks.values() if task["project_id"]}
+        ).values_list("todoistId", "id"))
+        # todoistId is blank on tasks that never reached todoist so it is not unique
+        existing = {task.todoistId: task for task in Task.objects.filter(todoistId__in=list(tasks))}
+        creates = []
+        updates = []
+        for todoist_id, task in tasks.items():
+            values = TaskService._values(task, project_ids)
+            local = existing.get(todoist_id)
+            if local is None:
+                creates.append(Task(todoistId=todoist_id, **values))
+            elif any(getattr(local, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(local, field, value)
+                updates.append(local)
+        with transaction.atomic():
+            Task.objects.bulk_create(creates, batch_size=TaskService.BATCH_SIZE)
+            Task.objects.bulk_update(updates, TaskService.UPDATE_FIELDS,
+                                     batch_size=TaskService.BATCH_SIZE)
+            completed = Task.objects.filter(complete=False).exclude(todoistId="").exclude(
+                todoistId__in=list(tasks)).update(complete=True)
+        return len(creates), len(updates), completed
+
+    @staticmethod
+    def _values(task: dict, project_ids: Dict[str, int]) -> dict:
+        """
+        the model fields for an exported todoist task
+        """
+        return {
+            "content": task["content"][:Task._meta.get_field("content").max_length],
+            "description": task["description"][:Task._meta.get_field("description").max_length],
+            "project_id": project_ids.get(task["project_id"]),
+            "priority": task["priority"],
+            "next_due": TaskService._due(task["due_date"]),
+            "complete": task["completed"],
+        }
+
+    @staticmethod
+    def _due(due_date: str) -> datetime.datetime:
+        """
+        todoist due dates are a day, a floating time or a utc time
         """
-        return todoistId in [
-            task["id"] for task in TodoistService.getAllTasks()
-        ]
+        if due_date is None:
+            return None
+        due = parse_datetime(due_date)
+        if due is None:
+            day = parse_date(due_date)
+            if day is None:
+                return None
+            due = datetime.datetime.combine(day, datetime.time())
+        if timezone.is_naive(due):
+            due = timezone.make_aware(due)
+        return due
 
     
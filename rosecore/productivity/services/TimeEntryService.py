@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from productivity.models.Project import Project
+from productivity.models.TimeEntry import TimeEntry
+from .TogglService import TogglService
+
+
+class TimeEntryService:
+    """
+    The local mirror of the toggl time entries
+    """
+    UPDATE_FIELDS = ["project", "description", "start", "stop", "duration", "tags"]
+    BATCH_SIZE = 500
+    # days looked back for the time spent summary
+    SUMMARY_PERIODS = {
+        "week": 7,
+        "month": 30,
+        "quarter": 91,
+    }
+
+    @staticmethod
+    def get_time_entries_from_project(project: Project, limit: int=None):
+        """
+        the projects time entries, latest first
+        """
+        return TimeEntry.objects.filter(project=project).order_by("-start")[:limit]
+
+    @staticmethod
+    def mirror(entries: List[dict], window: Tuple[datetime, datetime]=None) -> Tuple[int, int, int]:
+        """
+        upserts toggl time entries(as TogglService exports them) into the
+        local mirror with one bulk create and one bulk update, given the
+        synced window the local entries in it that toggl no longer has are
+        deleted. returns how many were created, updated and deleted
+        """
+        entries = {entry["id"]: entry for entry in entries}
+        project_ids = dict(Project.objects.filter(
+            togglId__in={entry["project_id"] for entry in entries.values() if entry["project_id"]}
+        ).values_list("togglId", "id"))
+        existing = TimeEntry.objects.in_bulk(list(entries), field_name="togglId")
+        creates = []
+        updates = []
+        for toggl_id, entry in entries.items():
+            values = TimeEntryService._values(entry, project_ids)
+            local = existing.get(toggl_id)
+            if local is None:
+                creates.append(TimeEntry(togglId=toggl_id, **values))
+            elif any(getattr(local, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(local, field, value)
+                updates.append(local)
+        deleted = 0
+        with transaction.atomic():
+            TimeEntry.objects.bulk_create(creates, batch_size=TimeEntryService.BATCH_SIZE)
+            TimeEntry.objects.bulk_update(updates, TimeEntryService.UPDATE_FIELDS,
+                                          batch_size=TimeEntryService.BATCH_SIZE)
+            if window is not None:
+                deleted, _ = TimeEntry.objects.filter(
+                    start__gte=window[0], start__lte=window[1]
+                ).exclude(togglId__in=list(entries)).delete()
+        return len(creates), len(updates), deleted
+
+    @staticmethod
+    def _values(entry: dict, project_ids: Dict[str, int]) -> dict:
+        """
+        the model fields for an exported toggl time entry
+        """
+        stop = entry["stop"]
+        return {
+            "project_id": project_ids.get(entry["project_id"]),
+            "description": entry["description"],
+            "start": entry["start"],
+            "stop": stop,
+            "duration": int((stop - entry["start"]).total_seconds()) if stop is not None else 0,
+            "tags": entry["tags"],
+        }
+
+    @staticmethod
+    def time_spent(project: Project, start: datetime, stop: datetime,
+                   include_subprojects: bool=False) -> timedelta:
+        """
+        the time tracked on a project(and its subprojects) in entries started
+        between start and stop, one sql query
+        """
+        seconds = TimeEntryService._project_entries(project, include_subprojects).filter(
+            start__gte=start, start__lt=stop
+        ).aggregate(seconds=Sum("duration"))["seconds"]
+        return timedelta(seconds=seconds or 0)
+
+    @staticmethod
+    def _project_entries(project: Project, include_subprojects: bool=False):
+        if include_subprojects:
+            return TimeEntry.objects.filter(
+                Q(project=project) | Q(project__path__startswith=project.subtree_path))
+        return TimeEntry.objects.filter(project=project)
+
+    @staticmethod
+    def time_spent_summary(project: Project, now: datetime=None,
+                           include_subprojects: bool=False) -> Dict[str, timedelta]:
+        """
+        the time tracked on a project(and its subprojects) over each of the
+        SUMMARY_PERIODS, one sql query
+        """
+        now = now or timezone.now()
+        periods = TimeEntryService.SUMMARY_PERIODS
+        totals = TimeEntryService._project_entries(project, include_subprojects).filter(
+            start__gte=now - timedelta(days=max(periods.values()))
+        ).aggregate(**{
+            name: Sum("duration", filter=Q(start__gte=now - timedelta(days=days)))
+            for name, days in periods.items()
+        })
+        return {name: timedelta(seconds=totals[name] or 0) for name in periods}
+
+    @staticmethod
+    def time_spent_by_project(since: datetime=None, until: datetime=None) -> Dict[int, timedelta]:
+        """
+        the time tracked per local project id, including its subprojects,
+        worked out from the columnar store of every pulled time entry. One
+        query for the project tree and no time entry objects
+        """
+        store = TogglService.getTimeEntryStore()
+        if store is None:
+            return {}
+        # the store module pulls in numpy, so it is left out of startup
+        from productivity.libs.Toggl.TimeEntryStore import rollup
+        projects = list(Project.objects.values_list("id", "togglId", "parent_id"))
+        local_ids = {toggl_id: id for id, toggl_id, parent_id in projects if toggl_id}
+        totals = {}
+        for toggl_id, seconds in store.by_project(since, until).items():
+            local_id = local_ids.get(str(toggl_id))
+            if local_id is not None:
+                totals[local_id] = totals.get(local_id, 0) + seconds
+        rolled = rollup(totals, {id: parent_id for id, toggl_id, parent_id in projects})
+        return {id: timedelta(seconds=seconds) for id, seconds in rolled.items()}
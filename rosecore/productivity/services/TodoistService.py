@@ -1,30 +1,172 @@
 from django.conf import settings
 from django.db.models.query_utils import DeferredAttribute
-from todoist import TodoistAPI
 from typing import Iterable
+from productivity.utilities.cache import RemoteCache, RemoteIndex
+from productivity.utilities.lazy import lazy_client
+from productivity.utilities.metrics import MeteredSession
+from contextlib import contextmanager
 from copy import copy
-import json
+import logging
+import functools
+import threading
+
+# the client's command queue and state are shared by every thread, commands
+# are queued and committed(and batches run) while holding this
+_client_lock = threading.RLock()
+
+
+def _exclusive(method):
+    """
+    runs the method holding the client lock, so no other thread's commands
+    are queued or committed in between
+    """
+    @functools.wraps(method)
+    def locked(*args, **kwargs):
+        with _client_lock:
+            return method(*args, **kwargs)
+    return locked
+
 
 class TodoistService:
-    _todoist = TodoistAPI(settings.TODOIST_KEY)
+    @lazy_client
+    def _todoist():
+        """
+        the todoist client, the library is only imported once it is needed.
+        Its cache is shared with the other processes
+        """
+        from productivity.libs.Todoist.CachedTodoistAPI import CachedTodoistAPI
+        return CachedTodoistAPI(settings.TODOIST_KEY,
+                          api_endpoint=settings.TODOIST_API_ENDPOINT,
+                          session=MeteredSession("todoist"),
+                          cache=None if settings.TESTING else settings.TODOIST_CACHE_DIR)
+
+    _batches = threading.local()
+    _cache = RemoteCache(settings.REMOTE_CACHE_TTL)
+    # set when queued commands were dropped, the local state still has them
+    _stale = False
+    # how todoist says the stored sync token is no longer valid
+    INVALID_SYNC_TOKEN_TAG = "INVALID_SYNC_TOKEN"
+    INVALID_SYNC_TOKEN_ERROR = "invalid sync token"
 
     @staticmethod
-    def sync()->None:
+    def sync(full: bool=False)->None:
         """
-        Syncs to remote if not testing
+        Syncs to remote if not testing, only the changes since the stored
+        sync token are pulled unless full is set or the token is rejected
         """
-        if not settings.TESTING:
-            TodoistService._todoist.sync()
+        TodoistService._pull(full)
+        TodoistService._cache.invalidate()
+
+    @staticmethod
+    @_exclusive
+    def _pull(full: bool=False)->None:
+        """
+        the sync, without dropping the cached reads. Full after commands
+        were discarded, so their optimistic changes leave the local state
+        """
+        if settings.TESTING:
+            return
+        full = full or TodoistService._stale
+        TodoistService._stale = False
+        if full:
+            TodoistService._todoist.reset_state()
+        response = TodoistService._todoist.sync()
+        if not full and TodoistService._token_rejected(response):
+            logging.warning("todoist rejected the sync token, running a full sync")
+            TodoistService._todoist.reset_state()
+            response = TodoistService._todoist.sync()
+        if TodoistService._sync_rejected(response):
+            raise ValueError(response)
 
     @staticmethod
+    def _sync_rejected(response) -> bool:
+        """
+        true if todoist refused a sync request
+        """
+        return not isinstance(response, dict) or "error" in response
+
+    @staticmethod
+    def _token_rejected(response) -> bool:
+        """
+        true if todoist refused the sync token itself, other errors are not
+        fixed by a full sync
+        """
+        return isinstance(response, dict) and (
+            response.get("error_tag") == TodoistService.INVALID_SYNC_TOKEN_TAG
+            or str(response.get("error", "")).lower() == TodoistService.INVALID_SYNC_TOKEN_ERROR)
+
+    @staticmethod
+    @_exclusive
     def commit() -> None:
         """
-        commits
+        commits, unless a batch is open on this thread in which case the
+        commands wait for the end of the batch. Either way the local state has
+        changed so the cached reads are dropped. The queued commands are
+        discarded if the commit fails, so a later commit does not resend them,
+        and the next pull is a full one
         """
+        TodoistService._cache.invalidate()
+        if getattr(TodoistService._batches, "depth", 0) > 0:
+            return
         if not settings.TESTING:
-            TodoistService._todoist.commit()
+            try:
+                TodoistService._todoist.commit()
+            except Exception:
+                # todoist-python empties the queue before raising a SyncError,
+                # whatever was sent may or may not have been applied
+                TodoistService._stale = True
+                TodoistService._discard()
+                raise
+
+    @staticmethod
+    def _discard() -> None:
+        """
+        drops the queued commands, the next pull is a full one
+        """
+        queue = TodoistService._todoist.queue
+        if queue:
+            logging.warning(f"discarding {len(queue)} uncommitted todoist commands")
+            del queue[:]
+            TodoistService._stale = True
+        TodoistService._cache.invalidate()
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Queues every command made on this thread inside the block and sends
+        them to todoist in a single commit when the outermost batch ends
+        without raising, if it raises they are discarded. Other threads wait
+        for the batch to end before queueing their own commands.
+        Ids returned inside the block are temp ids, commands may refer to them
+        (ie a parent_id) and resolve_id gives the real id after the batch
+        """
+        with _client_lock:
+            TodoistService._batches.depth = getattr(TodoistService._batches, "depth", 0) + 1
+            completed = False
+            try:
+                yield
+                completed = True
+            finally:
+                TodoistService._batches.depth -= 1
+                if TodoistService._batches.depth == 0:
+                    if completed:
+                        TodoistService.commit()
+                    else:
+                        TodoistService._discard()
+
+    @staticmethod
+    def resolve_id(id: str) -> str:
+        """
+        the real id for a temp id handed out inside a batch, other ids are
+        returned unchanged
+        """
+        if id is None:
+            return None
+        return str(TodoistService._todoist.temp_ids.get(id, id))
 
     @staticmethod
+    @_exclusive
     def createProject(name: str, parent_id: str = None) -> str:
         """
         Creates a new project
@@ -38,6 +180,7 @@ class TodoistService:
         return TodoistService._formatProjectExport(project)["id"]
 
     @staticmethod
+    @_exclusive
     def deleteProject(id: str) -> None:
         """
         Deletes a project
@@ -60,11 +203,14 @@ class TodoistService:
         """
         Gets a project in an id
         """
-        TodoistService.sync()
+        project = TodoistService.getProjectIndex().by_id.get(str(id))
+        if project is not None:
+            return dict(project)
         project = TodoistService._todoist.projects.get_by_id(TodoistService.format_id(id))
         return TodoistService._formatProjectExport(project)
 
     @staticmethod
+    @_exclusive
     def updateProject(data: dict) -> None:
         """
         Updates project
@@ -77,21 +223,39 @@ class TodoistService:
         TodoistService.commit()
 
     @staticmethod
-    def getAllProjects()->Iterable[dict]:
+    def getAllProjects(sync: bool=True)->Iterable[dict]:
         """
-        Gets all project detail
+        Gets all project detail, sync=False uses the state from the last sync.
+        A synced read is cached(see getProjectIndex)
         """
-        TodoistService.sync()
+        if sync:
+            return list(TodoistService.getProjectIndex().projects)
         return [
             TodoistService._formatProjectExport(project) for project in TodoistService._todoist.state["projects"]
         ]
+
+    @staticmethod
+    def getProjectIndex() -> RemoteIndex:
+        """
+        the projects indexed by id and name, synced at most once per
+        REMOTE_CACHE_TTL seconds(and once per request)
+        """
+        def load() -> RemoteIndex:
+            TodoistService._pull()
+            return RemoteIndex(TodoistService.getAllProjects(sync=False))
+        return TodoistService._cache.get("projects", load)
     
     @staticmethod
-    def getAllTasks()->Iterable[dict]:
+    def getAllTasks(sync: bool=True)->Iterable[dict]:
         """
-        Gets all of the tasks
+        Gets all of the tasks, sync=False uses the state from the last sync.
+        A synced read is cached like getProjectIndex
         """
-        TodoistService.sync()
+        if sync:
+            def load() -> list:
+                TodoistService._pull()
+                return TodoistService.getAllTasks(sync=False)
+            return list(TodoistService._cache.get("tasks", load))
         return [
             TodoistService._formatTaskExport(task) for task in TodoistService._todoist.items.all()
         ]
@@ -102,12 +266,13 @@ class TodoistService:
         gets a project with a specific name or creates the project
         returns the id of the project as a string
         """
-        for project in TodoistService.getAllProjects():
-            if project["name"] == name:
-                return project["id"]
+        project = TodoistService.getProjectIndex().by_name.get(name)
+        if project is not None:
+            return project["id"]
         return TodoistService.createProject(name)
 
     @staticmethod
+    @_exclusive
     def createTask(content:str,
                    description:str="",
                    project_id:str="",
@@ -115,28 +280,21 @@ class TodoistService:
                    due_string: str="",
                    **args) -> str:
         """
-        Creates a task and returns the new id
-        """
-        # print()
-        # print(f"project id: {TodoistService.format_id(project_id)}")
-        # print(f'known projects: {[project["id"] for project in TodoistService.getAllProjects()]}')
-        # print(f'matches: {[(TodoistService.format_id(project_id) ==project["id"]) for project in TodoistService.getAllProjects()]}')
-        task = TodoistService._todoist.add_item(content=content,
-                                                description=description,
-                                                project_id=TodoistService.format_id(project_id),
-                                                priority=priority,
-                                                due_string=due_string,
-                                                **args)
-        if "error" in task:
-            print(f"content: {content}")
-            print(f"description: {description}")
-            print(f"project_id: {project_id}")
-            print(json.dumps(task, indent=2))
-            raise ValueError(task)
+        Creates a task and returns the new id. The task is a queued command,
+        so inside a batch it is sent with the rest and the id is a temp id
+        """
+        if due_string:
+            args["due"] = {"string": due_string}
+        task = TodoistService._todoist.items.add(content,
+                                                 description=description,
+                                                 project_id=TodoistService.format_id(project_id),
+                                                 priority=priority,
+                                                 **args)
         TodoistService.commit()
-        return TodoistService._formatTaskExport(task)["id"]
+        return str(task["id"])
 
     @staticmethod
+    @_exclusive
     def deleteTask(id: str) -> None:
         """
         deletes a task from Todosit
@@ -155,6 +313,7 @@ class TodoistService:
         return TodoistService._formatTaskExport(task)
 
     @staticmethod
+    @_exclusive
     def updateTask(data: dict) -> None:
         """
         Updates a task for a given id, data is handed to todoist.sync api
@@ -167,6 +326,7 @@ class TodoistService:
         TodoistService.commit()
 
     @staticmethod
+    @_exclusive
     def completeTask(id: str) -> None:
         """
         Marks a task as completed
@@ -195,14 +355,17 @@ class TodoistService:
         """
         Formats the task export 
         """
+        # a task queued since the last pull only has the fields it was added with
+        due = task.data.get("due")
         return {
             "id": str(task["id"]) if task["id"] is not None else None,
             "content": str(task["content"]),
-            "description": str(task["description"]),
+            "description": str(task.data.get("description", "")),
             "project_id": str(task["project_id"]) if task["project_id"] is not None else None,
-            "priority": TodoistService.format_id(task["priority"]),
-            "due_string": TodoistService.format_id(task["due"]["string"]) if task["due"] is not None else None,
-            "completed": task["checked"] == 1,
+            "priority": TodoistService.format_id(task.data.get("priority", 1)),
+            "due_string": TodoistService.format_id(due["string"]) if due is not None else None,
+            "due_date": due.get("date") if due is not None else None,
+            "completed": task.data.get("checked") == 1,
         }
 
     @staticmethod
@@ -216,7 +379,5 @@ class TodoistService:
                 return_id = id
             return return_id
         elif isinstance(id, DeferredAttribute):
-            print(dir(id))
-            print(f"tmpid: {dir(tmp_id['field'])}")
-            print(f"tmpid2: {id.first()}")
+            logging.warning(f"formatting the unloaded todoist id field {id.field}")
             return TodoistService.format_id(id.data["id"])
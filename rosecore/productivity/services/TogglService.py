@@ -1,13 +1,62 @@
 from django.conf import settings
+import os
 import random
-from typing import List
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from productivity.libs.Toggl.TogglTrack import TogglTrack
 from productivity.libs.Toggl.Project import Project
+from productivity.libs.Toggl.TimeEntry import TimeEntry
+from productivity.utilities.cache import RemoteCache, RemoteIndex
+from productivity.utilities.lazy import lazy_client
+from productivity.utilities import metrics
+
+if TYPE_CHECKING:
+    from productivity.libs.Toggl.TimeEntryStore import TimeEntryStore
 
 
 class TogglService:
-    _toggl = TogglTrack(settings.TOGGL_WORKSPACE_ID,
-                        settings.TOGGL_ID)
+    @lazy_client
+    def _store():
+        """
+        the multi year history of time entries, fed by every toggl pull
+        """
+        if settings.TESTING:
+            return None
+        # numpy is only imported once the store is needed
+        from productivity.libs.Toggl.TimeEntryStore import TimeEntryStore
+        return TimeEntryStore(
+            os.path.join(settings.TOGGL_CACHE_DIR, f"{settings.TOGGL_WORKSPACE_ID}_entries"))
+
+    @lazy_client
+    def _toggl():
+        """
+        the toggl client, its snapshot is read on first use
+        """
+        store = TogglService._store
+        return TogglTrack(settings.TOGGL_WORKSPACE_ID,
+                          settings.TOGGL_ID,
+                          snapshot_path=None if settings.TESTING else os.path.join(
+                              settings.TOGGL_CACHE_DIR, f"{settings.TOGGL_WORKSPACE_ID}.json"),
+                          pool_size=settings.TOGGL_POOL_SIZE,
+                          timeout=(settings.TOGGL_CONNECT_TIMEOUT, settings.TOGGL_READ_TIMEOUT),
+                          rate_limit=settings.TOGGL_RATE_LIMIT,
+                          burst=settings.TOGGL_RATE_BURST,
+                          max_retries=settings.TOGGL_MAX_RETRIES,
+                          backoff=settings.TOGGL_RETRY_BACKOFF,
+                          time_entry_sink=None if store is None else store.append,
+                          api_url=settings.TOGGL_API_URL,
+                          request_observer=TogglService._observeRequest)
+
+    _cache = RemoteCache(settings.REMOTE_CACHE_TTL)
+    # when refresh last looked at the snapshot, by time.monotonic
+    _checked = None
+    _refresh_lock = threading.Lock()
+
+    @staticmethod
+    def _observeRequest(method: str, path: str, status, seconds: float) -> None:
+        metrics.observe_remote("toggl", metrics.route(method, path), status, seconds)
 
     @staticmethod
     def sync() -> None:
@@ -16,13 +65,44 @@ class TogglService:
         """
         if not settings.TESTING:
             TogglService._toggl.sync()
+        TogglService._cache.invalidate()
+
+    @staticmethod
+    def refresh() -> None:
+        """
+        picks up the snapshot another process(the job worker) synced since
+        this one last read or wrote it. Called as each request and job
+        starts, the file is only looked at every TOGGL_SNAPSHOT_CHECK_SECONDS
+        and not until the client is built
+        """
+        if not vars(TogglService)["_toggl"].built():
+            return
+        now = time.monotonic()
+        with TogglService._refresh_lock:
+            if TogglService._checked is not None and now - TogglService._checked < settings.TOGGL_SNAPSHOT_CHECK_SECONDS:
+                return
+            TogglService._checked = now
+        if TogglService._toggl.reloadSnapshot():
+            TogglService._cache.invalidate()
+
+    @staticmethod
+    def push(project: Project) -> None:
+        """
+        pushes just one project's pending change, toggl's answer is applied
+        to the local copy so nothing is pulled
+        """
+        if not settings.TESTING:
+            TogglService._toggl.sync(projects=[project])
+        TogglService._cache.invalidate()
     
     @staticmethod
     def getProject(id: str) -> dict:
         """
         gets a project(may not my synced
         """
-        project = [project for project in TogglService._toggl.projects if str(project.id) == str(id)][0]
+        project = TogglService._toggl.getProject(id)
+        if project is None:
+            raise IndexError(f"toggl project {id} is not known")
         return TogglService._formatExport(project)
 
     @staticmethod
@@ -30,7 +110,15 @@ class TogglService:
         """
         Gets all projects
         """
-        return [TogglService._formatExport(project) for project in TogglService._toggl.projects]
+        return list(TogglService.getProjectIndex().projects)
+
+    @staticmethod
+    def getProjectIndex() -> RemoteIndex:
+        """
+        the projects indexed by id and name, rebuilt after a sync or a change
+        """
+        return TogglService._cache.get("projects", lambda: RemoteIndex(
+            TogglService._formatExport(project) for project in TogglService._toggl.projects))
 
     @staticmethod
     def createProject(name: str) -> str:
@@ -41,7 +129,9 @@ class TogglService:
         project = TogglService._toggl.createProject(name)
         if settings.TESTING:
             TogglService._toggl.fake_project_id(project, random.randint(0, 10000000000))
-        project = [project for project in TogglService._toggl.projects if project.name == name][0]
+            TogglService._cache.invalidate()
+        else:
+            TogglService.push(project)
         return str(project.id)
 
     @staticmethod
@@ -49,21 +139,22 @@ class TogglService:
         """
         Updates a project, just name for now
         """
-        project = [project for project in TogglService._toggl.projects if str(data["id"]) == str(project.id)][0]
+        project = TogglService._toggl.getProject(data["id"])
+        if project is None:
+            raise IndexError(f"toggl project {data['id']} is not known")
         TogglService._toggl.updateProject(project, data["name"])
-        TogglService.sync()
+        TogglService.push(project)
 
     @staticmethod
     def deleteProject(project_id: str) -> None:
         """
         deletes a project with a specified id
         """
-        try:
-            project = [project for project in TogglService._toggl.projects if str(project_id) == str(project.id)][0]
-            TogglService._toggl.deleteProject(project)
-        except IndexError:
-            pass
-        TogglService.sync()
+        project = TogglService._toggl.getProject(project_id)
+        if project is None:
+            return
+        TogglService._toggl.deleteProject(project)
+        TogglService.push(project)
 
     @staticmethod
     def getProjectWithNameOrCreate(name: str) -> str:
@@ -71,11 +162,44 @@ class TogglService:
         gets a project with a specific name or creates the project
         returns the id
         """
-        for project in TogglService.getAllProjects():
-            if project["name"] == name:
-                return project["id"]
+        project = TogglService._toggl.getProjectByName(name)
+        if project is not None:
+            return str(project.id)
         return TogglService.createProject(name)
 
+    @staticmethod
+    def getTimeEntries() -> List[dict]:
+        """
+        Gets the synced time entries, the ones inside getTimeEntryWindow()
+        """
+        return [TogglService._formatTimeEntryExport(entry) for entry in TogglService._toggl.time_entries
+                if entry.synced and entry.id != -1]
+
+    @staticmethod
+    def getTimeEntryStore() -> Optional["TimeEntryStore"]:
+        """
+        the columnar store of every time entry pulled, None when TESTING
+        """
+        return TogglService._store
+
+    @staticmethod
+    def getTimeEntryWindow() -> Tuple[datetime, datetime]:
+        """
+        the start and stop of the time entries toggl is synced for
+        """
+        return TogglService._toggl.timeEntryWindow()
+
+    @staticmethod
+    def _formatTimeEntryExport(entry: TimeEntry) -> dict:
+        return {
+            "id": str(entry.id),
+            "project_id": str(entry.project_id) if entry.project_id != -1 else None,
+            "description": entry.description or "",
+            "start": entry.start,
+            "stop": entry.stop,
+            "tags": list(entry.tags or [])
+        }
+
     @staticmethod
     def _formatExport(project: Project) -> dict:
         """
@@ -1,4 +1,7 @@
 from .ProjectService import ProjectService
 from .TaskService import TaskService
+from .JobService import JobService
+from .TimeEntryService import TimeEntryService
+from .SyncRunService import SyncRunService
 # from .TodoistService import TodoistService
 # from .TogglService import TogglService
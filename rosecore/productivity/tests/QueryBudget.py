@@ -0,0 +1,22 @@
+"""
+ query budget assertions for view tests
+"""
+from contextlib import contextmanager
+from productivity.utilities.queries import QueryRecorder
+
+
+class QueryBudgetMixin:
+    """
+    mixed into a TestCase, asserts a block runs at most a number of sql
+    queries and no N+1s. Failures carry the recorder's report
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, limit: int, repeats: int=QueryRecorder.REPEATS):
+        with QueryRecorder() as recorder:
+            yield recorder
+        if recorder.count > limit:
+            self.fail(f"{recorder.count} queries, over the budget of {limit}\n"
+                      f"{recorder.report(repeats, every=True)}")
+        if recorder.repeated(repeats):
+            self.fail(f"repeated queries\n{recorder.report(repeats)}")
@@ -0,0 +1,32 @@
+from django.test import TestCase
+from productivity.benchmarks import data
+from productivity.benchmarks.runner import run_scale
+from productivity.models import Project, Task
+from productivity.services.TodoistService import TodoistService
+
+
+class BenchmarkTest(TestCase):
+    def test_generated_tree(self):
+        dataset = data.generate(45)
+        where = [project.where for project in dataset.projects]
+        self.assertEqual(where.count(data.ProjectSpec.LOCAL), 3)
+        self.assertEqual(where.count(data.ProjectSpec.REMOTE), 2)
+        self.assertEqual(len(dataset.tasks), 45)
+        self.assertEqual(len(dataset.time_entries), 45)
+
+    def test_scenarios_against_stand_ins(self):
+        results = run_scale(45, latency=0, throttle_rate=0.3, memory=False)
+        self.assertEqual([result["scenario"] for result in results],
+                         ["sync", "sync_unchanged", "nuke_all_unsynced", "bulk_task_create"])
+        sync, unchanged, nuke, create = results
+        # the local only projects are created, toggl's throttling is retried
+        self.assertEqual(sync["requests"]["toggl"]["routes"]["POST /api/v8/projects"]
+                         - sync["requests"]["toggl"]["throttled"], 3)
+        self.assertEqual(unchanged["requests"]["todoist"]["total"], 1)
+        # the new tasks go to todoist in one commit
+        self.assertEqual(create["requests"]["todoist"]["routes"], {"POST /sync/v8/sync": 1})
+        self.assertGreater(sync["queries"], 0)
+        self.assertFalse(Project.objects.unsynced().exists())
+        self.assertEqual(Task.objects.count(), 90)
+        # the services are back on their test clients
+        self.assertEqual(TodoistService._todoist.api_endpoint, "https://api.todoist.com")
@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase
+from productivity.utilities.concurrency import fan_out
+from productivity.utilities.exceptions import RemoteServiceError
+import time
+
+
+class FanOutTest(SimpleTestCase):
+    def test_calls_run_concurrently(self):
+        start = time.monotonic()
+        results = fan_out(one=lambda: time.sleep(0.2) or 1,
+                          two=lambda: time.sleep(0.2) or 2)
+        self.assertLess(time.monotonic() - start, 0.35)
+        self.assertEqual(results, {"one": 1, "two": 2})
+
+    def test_errors_collected_per_service(self):
+        def fail():
+            raise ValueError("down")
+        with self.assertRaises(RemoteServiceError) as context:
+            fan_out(todoist=fail, toggl=lambda: "ok")
+        self.assertEqual(list(context.exception.errors.keys()), ["todoist"])
+        self.assertEqual(context.exception.results, {"toggl": "ok"})
+
+    def test_no_calls(self):
+        self.assertEqual(fan_out(), {})
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from unittest import mock
+from productivity.models.Job import Job
+from productivity.services.JobService import JobService
+
+
+class JobServiceTest(TestCase):
+    def test_claim_oldest_first(self):
+        first = JobService.enqueue(JobService.SYNC)
+        second = JobService.enqueue(JobService.NUKE_UNSYNCED)
+        self.assertEqual(JobService.claim_next().id, first.id)
+        self.assertEqual(JobService.claim_next().id, second.id)
+        self.assertIsNone(JobService.claim_next())
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.RUNNING)
+        self.assertIsNotNone(first.started)
+
+    def test_stale_running_job_failed(self):
+        JobService.enqueue(JobService.SYNC)
+        job = JobService.claim_next()
+        self.assertEqual(JobService.fail_stale(), 0)
+        Job.objects.filter(id=job.id).update(heartbeat=timezone.now() - timedelta(hours=1))
+        with self.settings(JOB_STALE_SECONDS=60):
+            self.assertIsNone(JobService.claim_next())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("stopped responding", job.error)
+        self.assertIsNotNone(job.finished)
+
+    @mock.patch("productivity.management.commands.JobWorker.close_old_connections")
+    @mock.patch("productivity.services.JobService.ProjectService.sync")
+    def test_worker_closes_old_connections(self, sync, close_old_connections):
+        job = JobService.enqueue(JobService.SYNC)
+        call_command("JobWorker", once=True, stdout=mock.Mock())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        # before and after the job, then before finding the queue empty
+        self.assertEqual(close_old_connections.call_count, 3)
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            JobService.enqueue("unknown")
+
+    @mock.patch("productivity.services.JobService.ProjectService.sync")
+    def test_run_success(self, sync):
+        def fake_sync(progress, full):
+            progress(0.5, "halfway")
+        sync.side_effect = fake_sync
+        JobService.enqueue(JobService.SYNC, full=True)
+        job = JobService.claim_next()
+        JobService.run(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.progress, 1)
+        self.assertEqual(job.message, "halfway")
+        self.assertIsNotNone(job.duration)
+
+    @mock.patch("productivity.services.JobService.ProjectService.nuke_all_unsynced")
+    def test_run_failure_recorded(self, nuke):
+        nuke.side_effect = ValueError("remote down")
+        JobService.enqueue(JobService.NUKE_UNSYNCED)
+        job = JobService.claim_next()
+        JobService.run(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("remote down", job.error)
+
+
+class JobViewsTest(TestCase):
+    @mock.patch("productivity.services.JobService.ProjectService.sync")
+    def test_sync_view_enqueues(self, sync):
+        response = self.client.get(reverse("productivity:sync"))
+        sync.assert_not_called()
+        job = Job.objects.get()
+        self.assertEqual(job.kind, JobService.SYNC)
+        self.assertRedirects(response, reverse("productivity:job_info", args=(job.id,)))
+
+    def test_status_endpoint(self):
+        job = JobService.enqueue(JobService.NUKE_UNSYNCED)
+        response = self.client.get(reverse("productivity:job_status", args=(job.id,)))
+        self.assertEqual(response.json()["status"], Job.QUEUED)
+        self.assertIsNone(response.json()["duration"])
+        response = self.client.get(reverse("productivity:job_info", args=(job.id,)))
+        self.assertContains(response, JobService.NUKE_UNSYNCED)
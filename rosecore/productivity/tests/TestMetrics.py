@@ -0,0 +1,108 @@
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from productivity.libs.Toggl.TogglTrack import TogglTrack
+from productivity.models import Job, Project
+from productivity.services.JobService import JobService
+from productivity.services.MetricsService import MetricsService
+from productivity.services.ProjectService import ProjectService
+from productivity.utilities import metrics
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import json
+
+
+class RegistryTest(SimpleTestCase):
+    def test_render(self):
+        registry = metrics.Registry()
+        calls = registry.counter("calls_total", "calls", ["status"])
+        seconds = registry.histogram("call_seconds", "seconds", buckets=(0.1, 1))
+        calls.inc(status="ok")
+        calls.inc(2, status='say "hi"')
+        seconds.observe(0.05)
+        seconds.observe(5)
+        text = registry.render()
+        self.assertIn('calls_total{status="ok"} 1', text)
+        self.assertIn('calls_total{status="say \\"hi\\""} 2', text)
+        self.assertIn('call_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('call_seconds_bucket{le="1"} 1', text)
+        self.assertIn('call_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn('call_seconds_count 2', text)
+
+    def test_render_adds_other_processes(self):
+        registry = metrics.Registry()
+        calls = registry.counter("calls_total", "calls", ["status"])
+        seconds = registry.histogram("call_seconds", "seconds", buckets=(0.1, 1))
+        calls.inc(status="ok")
+        seconds.observe(0.05)
+        worker = metrics.Registry()
+        worker.counter("calls_total", "calls", ["status"]).inc(3, status="ok")
+        worker.histogram("call_seconds", "seconds", buckets=(0.1, 1)).observe(5)
+        worker.counter("worker_only_total", "not registered here").inc()
+        text = registry.render([json.loads(json.dumps(worker.snapshot()))])
+        self.assertIn('calls_total{status="ok"} 4', text)
+        self.assertIn('call_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('call_seconds_bucket{le="+Inf"} 2', text)
+        self.assertNotIn("worker_only_total", text)
+        self.assertIn('calls_total{status="ok"} 1', registry.render())
+
+    def test_threads(self):
+        counter = metrics.Registry().counter("hits_total", "hits", ["worker"])
+        with ThreadPoolExecutor(8) as pool:
+            for _ in range(8):
+                pool.submit(lambda: [counter.inc(worker="a") for _ in range(1000)])
+        self.assertEqual(counter.value(worker="a"), 8000)
+
+    def test_route_folds_ids(self):
+        self.assertEqual(metrics.route("PUT", "/projects/1234"), "PUT /projects/{id}")
+        self.assertEqual(metrics.route("GET", "/workspaces/12/projects"), "GET /workspaces/{id}/projects")
+
+
+class RemoteMetricsTest(SimpleTestCase):
+    def test_toggl_requests_and_throttles_are_observed(self):
+        observed = []
+        toggl = TogglTrack(1, "token", max_retries=1, backoff=0,
+                           request_observer=lambda *call: observed.append(call))
+        throttled = mock.Mock(status_code=429, headers={})
+        ok = mock.Mock(status_code=200, headers={})
+        with mock.patch.object(toggl._session, "request", side_effect=[throttled, ok]):
+            toggl._request("DELETE", toggl._project_url + "/7")
+        self.assertEqual([call[:3] for call in observed],
+                         [("DELETE", "/projects/7", 429), ("DELETE", "/projects/7", 200)])
+
+    def test_observe_remote(self):
+        before = metrics.REMOTE_THROTTLED.value(service="test", operation="GET /x")
+        metrics.observe_remote("test", "GET /x", 429, 0.2)
+        self.assertEqual(metrics.REMOTE_THROTTLED.value(service="test", operation="GET /x"), before + 1)
+        self.assertEqual(metrics.REMOTE_REQUESTS.value(service="test", operation="GET /x", status=429),
+                         before + 1)
+
+
+class MetricsEndpointTest(TestCase):
+    def test_view_queries_and_sync_phases(self):
+        Project.objects.create(name="metered")
+        index_queries = metrics.DB_QUERIES_PER_REQUEST.count(view="productivity:index")
+        sync_phases = metrics.SYNC_PHASE_SECONDS.count(phase="pull")
+        self.client.get(reverse("productivity:index"))
+        ProjectService.sync()
+        self.assertEqual(metrics.DB_QUERIES_PER_REQUEST.count(view="productivity:index"), index_queries + 1)
+        self.assertEqual(metrics.SYNC_PHASE_SECONDS.count(phase="pull"), sync_phases + 1)
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn('rosecore_db_queries_per_request_count{view="productivity:index"}',
+                      response.content.decode())
+        self.assertIn('rosecore_sync_phase_seconds_bucket{phase="time_entries",le="+Inf"}',
+                      response.content.decode())
+
+    def test_job_worker_sync_phases_reach_web_metrics(self):
+        Project.objects.create(name="metered")
+        job = JobService.enqueue(JobService.SYNC)
+        with mock.patch.object(MetricsService, "_process", return_value="worker:1"):
+            JobService.run(JobService.claim_next())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        # a web process that never synced itself
+        with mock.patch.dict(metrics.SYNC_PHASE_SECONDS._series, clear=True):
+            response = self.client.get("/metrics")
+        self.assertIn('rosecore_sync_phase_seconds_bucket{phase="pull",le="+Inf"}',
+                      response.content.decode())
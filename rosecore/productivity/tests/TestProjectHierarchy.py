@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+import pytz
+from productivity.forms.ProjectForm import ProjectForm
+from productivity.models import Project, TimeEntry
+from productivity.services.ProjectService import ProjectService
+from productivity.services.TimeEntryService import TimeEntryService
+
+
+class TestProjectHierarchy(TestCase):
+    def setUp(self):
+        self.root = Project.objects.create(name="root")
+        self.child = Project.objects.create(name="child", parent=self.root)
+        self.grandchild = Project.objects.create(name="grandchild", parent=self.child)
+        self.other = Project.objects.create(name="other")
+
+    def test_paths(self):
+        self.assertEqual(self.root.path, "/")
+        self.assertEqual(self.grandchild.path, f"/{self.root.id}/{self.child.id}/")
+        self.assertEqual(self.grandchild.ancestor_ids, [self.root.id, self.child.id])
+
+    def test_move_rewrites_subtree_in_one_update(self):
+        self.child.parent = self.other
+        with CaptureQueriesContext(connection) as queries:
+            self.child.save()
+        updates = [query for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)
+        self.grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, f"/{self.other.id}/{self.child.id}/")
+
+    def test_queryset_update_rewrites_grandchildren(self):
+        great_grandchild = Project.objects.create(name="great grandchild", parent=self.grandchild)
+        Project.objects.filter(pk=self.child.pk).update(parent=self.other)
+        self.grandchild.refresh_from_db()
+        great_grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, f"/{self.other.id}/{self.child.id}/")
+        self.assertEqual(great_grandchild.path, f"/{self.other.id}/{self.child.id}/{self.grandchild.id}/")
+
+    def test_bulk_update_rewrites_grandchildren(self):
+        self.child.parent = None
+        self.other.parent = self.grandchild
+        Project.objects.bulk_update([self.child, self.other], ["parent"])
+        self.assertEqual(self.child.path, "/")
+        self.assertEqual(self.other.path, f"/{self.child.id}/{self.grandchild.id}/")
+        self.grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, f"/{self.child.id}/")
+
+    def test_update_can_not_move_under_itself(self):
+        with self.assertRaises(ValueError):
+            Project.objects.filter(pk=self.root.pk).update(parent=self.grandchild)
+        self.root.refresh_from_db()
+        self.assertIsNone(self.root.parent_id)
+
+    def test_deep_tree_fits(self):
+        parent = self.root
+        for depth in range(100):
+            parent = Project.objects.create(name=f"level {depth}", parent=parent)
+        self.assertGreater(len(parent.path), 255)
+        parent.refresh_from_db()
+        self.assertEqual(len(parent.ancestor_ids), 100)
+
+    def test_can_not_move_under_itself(self):
+        self.root.parent = self.grandchild
+        with self.assertRaises(ValueError):
+            self.root.save()
+
+    def test_form_refuses_move_under_descendant(self):
+        form = ProjectForm({"name": "root", "parent": self.grandchild.id}, instance=self.root)
+        self.assertFalse(form.is_valid())
+        self.assertIn("parent", form.errors)
+        form = ProjectForm({"name": "root", "parent": self.root.id}, instance=self.root)
+        self.assertFalse(form.is_valid())
+        self.assertTrue(ProjectForm({"name": "child", "parent": self.other.id}, instance=self.child).is_valid())
+
+    @mock.patch("productivity.services.ProjectService.TogglService.updateProject")
+    @mock.patch("productivity.services.ProjectService.TodoistService.updateProject")
+    def test_update_refuses_move_before_remote_calls(self, update_todoist, update_toggl):
+        self.root.parent = self.grandchild
+        with self.assertRaises(ValueError):
+            ProjectService.updateProject(self.root)
+        update_todoist.assert_not_called()
+        update_toggl.assert_not_called()
+
+    def test_subtree_and_breadcrumbs(self):
+        with self.assertNumQueries(1):
+            subtree = set(ProjectService.get_subtree(self.root))
+        self.assertEqual(subtree, {self.root, self.child, self.grandchild})
+        self.assertEqual(set(ProjectService.get_subtree(self.child, include_self=False)), {self.grandchild})
+        with self.assertNumQueries(1):
+            self.assertEqual(ProjectService.get_breadcrumbs(self.grandchild), [self.root, self.child])
+
+    @mock.patch.object(ProjectService, "_delete_toggl_project")
+    @mock.patch.object(ProjectService, "_delete_todoist_project")
+    def test_delete_cascades_subtree(self, delete_todoist, delete_toggl):
+        ProjectService.deleteProject(self.child)
+        self.assertEqual(set(Project.objects.all()), {self.root, self.other})
+        delete_todoist.assert_called_once_with(self.child)
+        self.assertEqual(delete_toggl.call_count, 2)
+
+    def test_time_spent_includes_subprojects(self):
+        start = pytz.utc.localize(datetime(2021, 9, 1))
+        TimeEntry.objects.create(togglId="1", project=self.root, start=start, duration=3600)
+        TimeEntry.objects.create(togglId="2", project=self.grandchild, start=start, duration=7200)
+        TimeEntry.objects.create(togglId="3", project=self.other, start=start, duration=60)
+        window = (start - timedelta(days=1), start + timedelta(days=1))
+        self.assertEqual(TimeEntryService.time_spent(self.root, *window), timedelta(hours=1))
+        self.assertEqual(TimeEntryService.time_spent(self.root, *window, include_subprojects=True),
+                         timedelta(hours=3))
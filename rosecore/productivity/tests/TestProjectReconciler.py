@@ -0,0 +1,92 @@
+from django.test import TestCase, override_settings
+from productivity.models.Project import Project
+from productivity.services.ProjectReconciler import ProjectReconciler, RemoteIndex, SyncOperation
+from productivity.services.TodoistService import TodoistService
+from productivity.services.TogglService import TogglService
+from productivity.utilities.exceptions import RemoteServiceError
+from unittest import mock
+
+
+class RemoteIndexTest(TestCase):
+    def test_id_match_beats_name_match(self):
+        index = RemoteIndex([
+            {"id": "1", "name": "one"},
+            {"id": "2", "name": "two"},
+        ])
+        self.assertEqual(index.match("1", "two")["id"], "1")
+        self.assertEqual(index.match("", "two")["id"], "2")
+        self.assertEqual(index.match("missing", "two")["id"], "2")
+        self.assertIsNone(index.match("missing", "missing"))
+        self.assertEqual(index.ids(), {"1", "2"})
+
+
+class ProjectReconcilerTest(TestCase):
+    def test_matching_projects_need_no_operations(self):
+        Project.objects.create(name="matched", todoistId="10", togglId="20")
+        reconciler = ProjectReconciler(Project.objects.all(),
+                                       RemoteIndex([{"id": "10", "name": "matched"}]),
+                                       RemoteIndex([{"id": "20", "name": "matched"}]))
+        self.assertEqual(reconciler.plan(), [])
+
+    def test_name_match_links(self):
+        project = Project.objects.create(name="by_name")
+        reconciler = ProjectReconciler(Project.objects.all(),
+                                       RemoteIndex([{"id": "10", "name": "by_name"}]),
+                                       RemoteIndex([{"id": "20", "name": "by_name"}]))
+        operations = reconciler.plan()
+        self.assertEqual(
+            {(operation.action, operation.service, operation.remote_id) for operation in operations},
+            {(SyncOperation.LINK, ProjectReconciler.TODOIST, "10"),
+             (SyncOperation.LINK, ProjectReconciler.TOGGL, "20")}
+        )
+        reconciler.apply(operations)
+        project.refresh_from_db()
+        self.assertEqual(project.todoistId, "10")
+        self.assertEqual(project.togglId, "20")
+
+    def test_plan_orders_parents_first(self):
+        child = Project.objects.create(name="child")
+        parent = Project.objects.create(name="parent")
+        child.parent = parent
+        child.save()
+        reconciler = ProjectReconciler(Project.objects.all(), RemoteIndex([]), RemoteIndex([]))
+        creates = [operation.project.id for operation in reconciler.plan()
+                   if operation.service == ProjectReconciler.TODOIST]
+        self.assertEqual(creates, [parent.id, child.id])
+
+
+@override_settings(TESTING=False)
+class ProjectReconcilerCommitTest(TestCase):
+    def setUp(self):
+        self.parent = Project.objects.create(name="parent")
+        self.child = Project.objects.create(name="child", parent=self.parent)
+        self.reconciler = ProjectReconciler(Project.objects.all(), RemoteIndex([]), RemoteIndex([]))
+
+    def tearDown(self):
+        del TodoistService._todoist.queue[:]
+        TodoistService._stale = False
+
+    def test_failed_todoist_commit_saves_no_temp_ids(self):
+        with mock.patch.object(TodoistService._todoist, "sync", side_effect=ValueError("down")), \
+                mock.patch.object(TogglService, "createProject", side_effect=["31", "32"]):
+            with self.assertRaises(RemoteServiceError):
+                self.reconciler.apply(self.reconciler.plan())
+        self.parent.refresh_from_db()
+        self.child.refresh_from_db()
+        self.assertEqual((self.parent.todoistId, self.parent.togglId), ("", "31"))
+        self.assertEqual((self.child.todoistId, self.child.togglId), ("", "32"))
+        self.assertEqual(TodoistService._todoist.queue, [])
+
+    def test_only_resolved_ids_are_saved(self):
+        def commit():
+            # todoist only maps the parent's temp id
+            TodoistService._todoist.temp_ids[TodoistService._todoist.queue[0]["temp_id"]] = 41
+            del TodoistService._todoist.queue[:]
+
+        with mock.patch.object(TodoistService._todoist, "commit", side_effect=commit), \
+                mock.patch.object(TogglService, "createProject", side_effect=["31", "32"]):
+            self.reconciler.apply(self.reconciler.plan())
+        self.parent.refresh_from_db()
+        self.child.refresh_from_db()
+        self.assertEqual(self.parent.todoistId, "41")
+        self.assertEqual(self.child.todoistId, "")
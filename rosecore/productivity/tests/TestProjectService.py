@@ -1,9 +1,13 @@
 from productivity.models.Project import Project
 from django.test import TestCase
 from productivity.services.ProjectService import ProjectService
-from productivity.utilities.exceptions import InvalidProject
+from productivity.utilities.exceptions import InvalidProject, RemoteServiceError
 from productivity.services.TodoistService import TodoistService
 from productivity.services.TogglService import TogglService
+from productivity.services.ProjectReconciler import RemoteIndex
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
 
 class ProjectServiceTest(TestCase):
     def setUp(self):
@@ -170,3 +174,56 @@ class ProjectServiceSyncTest(TestCase):
         self.assertEqual(project_merged.name, "Test Child")
         self.assertEqual(project_merged.todoistId, str(todoist_id))
         self.assertEqual(project_parent, project_merged.parent)
+
+class ProjectServiceUnsyncedCheckTest(TestCase):
+    def test_unsynced_projects_bulk_inserted(self):
+        Project.objects.create(name="known", todoistId="known", togglId="known")
+        todoist_index = RemoteIndex([{"id": "known", "name": "known"}] +
+                                    [{"id": f"todoist{i}", "name": f"todoist {i}"} for i in range(50)])
+        toggl_index = RemoteIndex([{"id": "known", "name": "known"}] +
+                                  [{"id": f"toggl{i}", "name": f"toggl {i}"} for i in range(50)])
+        with CaptureQueriesContext(connection) as queries:
+            ProjectService._check_for_unsynced_projects(todoist_index, toggl_index)
+        self.assertLessEqual(len(queries), 4)
+        self.assertEqual(Project.objects.filter(unsyncedSource=ProjectService.TODOIST_UNSYNC_SOURCE).count(), 50)
+        self.assertEqual(Project.objects.filter(unsyncedSource=ProjectService.TOGGL_UNSYNC_SOURCE).count(), 50)
+        self.assertEqual(Project.objects.filter(todoistId="known").count(), 1)
+
+
+class ProjectSyncedStateTest(TestCase):
+    def setUp(self):
+        self.synced = Project.objects.create(name="synced", todoistId="1", togglId="2")
+        self.unsynced = Project.objects.create(name="unsynced", todoistId="3",
+                                               unsyncedSource=ProjectService.TODOIST_UNSYNC_SOURCE)
+        self.blank = Project.objects.create(name="blank", todoistId="4", togglId="5", unsyncedSource="  ")
+
+    def test_synced_state_is_a_query(self):
+        with self.assertNumQueries(0):
+            queryset = ProjectService.synced_queryset()
+        with self.assertNumQueries(1):
+            self.assertEqual(set(queryset), {self.synced, self.blank})
+        self.assertEqual(list(Project.objects.unsynced()), [self.unsynced])
+        for project in Project.objects.all():
+            self.assertEqual(project.synced, project in queryset)
+
+    def test_unsynced_check_only_looks_up_remote_ids(self):
+        todoist_index = RemoteIndex([{"id": "1", "name": "synced"}, {"id": "9", "name": "new"}])
+        toggl_index = RemoteIndex([{"id": "2", "name": "synced"}])
+        with CaptureQueriesContext(connection) as queries:
+            created = ProjectService._check_for_unsynced_projects(todoist_index, toggl_index)
+        self.assertEqual([project.todoistId for project in created], ["9"])
+        self.assertIn("IN", queries.captured_queries[0]["sql"])
+
+
+class ProjectNukeUnsyncedTest(TestCase):
+    def test_failed_service_keeps_only_its_projects(self):
+        on_todoist = Project.objects.create(name="on todoist", todoistId="3",
+                                            unsyncedSource=ProjectService.TODOIST_UNSYNC_SOURCE)
+        on_toggl = Project.objects.create(name="on toggl", togglId="7",
+                                          unsyncedSource=ProjectService.TOGGL_UNSYNC_SOURCE)
+        with mock.patch.object(TodoistService, "deleteProject"), \
+                mock.patch.object(TogglService, "deleteProject", side_effect=ValueError("toggl down")):
+            with self.assertRaises(RemoteServiceError):
+                ProjectService.nuke_all_unsynced()
+        self.assertFalse(Project.objects.filter(pk=on_todoist.pk).exists())
+        self.assertTrue(Project.objects.filter(pk=on_toggl.pk).exists())
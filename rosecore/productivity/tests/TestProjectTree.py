@@ -0,0 +1,30 @@
+from django.test import TestCase
+from django.urls import reverse
+from productivity.models.Project import Project
+from productivity.services.ProjectService import ProjectService
+
+
+class TestProjectTree(TestCase):
+    def setUp(self):
+        self.root = Project.objects.create(name="root")
+        self.child = Project.objects.create(name="child", parent=self.root)
+        self.grandchild = Project.objects.create(name="grandchild", parent=self.child)
+        self.other = Project.objects.create(name="other")
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            rows = ProjectService.get_project_tree().rows()
+        self.assertEqual([(row.project.name, row.depth) for row in rows],
+                         [("root", 0), ("child", 1), ("grandchild", 2), ("other", 0)])
+        self.assertEqual([len(row.closes) for row in rows], [0, 0, 2, 0])
+        self.assertEqual([row.has_children for row in rows], [True, True, False, False])
+
+    def test_deep_tree_index_is_one_query(self):
+        parent = self.grandchild
+        for depth in range(50):
+            parent = Project.objects.create(name=f"deep {depth}", parent=parent)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("productivity:index"))
+        self.assertContains(response, "deep 49")
+        content = response.content.decode()
+        self.assertEqual(content.count("<ul>"), content.count("</ul>"))
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from productivity.forms.ProjectForm import ProjectForm
+from productivity.forms.TaskForm import TaskForm
+from productivity.models import Project, Task, TimeEntry
+from productivity.utilities.queries import QueryRecorder, shape
+from .QueryBudget import QueryBudgetMixin
+
+
+class QueryShapeTest(SimpleTestCase):
+    def test_values_are_folded(self):
+        self.assertEqual(shape("SELECT * FROM t WHERE a = 1 AND b = 'x''y' AND c IN (%s, %s, %s)"),
+                         "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)")
+        self.assertEqual(shape('SELECT "t2"."id" FROM "t2" WHERE "t2"."id" = %s'),
+                         'SELECT "t2"."id" FROM "t2" WHERE "t2"."id" = ?')
+
+
+class QueryRecorderTest(TestCase):
+    def test_repeats_and_explain(self):
+        projects = [Project.objects.create(name=f"project {i}") for i in range(3)]
+        with QueryRecorder(slow_seconds=0) as recorder:
+            for project in projects:
+                Project.objects.get(id=project.id)
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.repeated()[0][1], 3)
+        self.assertTrue(recorder.explain(recorder.queries[0]))
+        self.assertIn("N+1: 3x", recorder.report())
+        self.assertEqual(recorder.count, 3)
+
+
+class ViewQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """
+    every view runs the same handful of queries however big the dataset
+    """
+
+    def build(self, size: int) -> Project:
+        """
+        size projects, each nested under the one before, with size tasks
+        and time entries on the deepest. returns the deepest project
+        """
+        now = timezone.now()
+        parent = None
+        for i in range(size):
+            parent = Project.objects.create(name=f"project {size} {i}", parent=parent,
+                                            todoistId=f"{size}{i}", togglId=f"{size}{i}")
+        Task.objects.bulk_create([Task(content=f"task {i}", project=parent, priority=1, todoistId=f"t{size}{i}")
+                                  for i in range(size)])
+        TimeEntry.objects.bulk_create([TimeEntry(togglId=f"e{size}{i}", project=parent, start=now - timedelta(hours=i),
+                                                 stop=now - timedelta(hours=i) + timedelta(minutes=30), duration=1800)
+                                       for i in range(size)])
+        return parent
+
+    def test_view_budgets(self):
+        for size in (5, 50):
+            project = self.build(size)
+            task = project.Tasks.first()
+            with self.subTest(size=size):
+                with self.assertMaxQueries(1):
+                    self.client.get(reverse("productivity:index"))
+                # project, breadcrumbs, tasks, time spent, time entries and the parent choices
+                with self.assertMaxQueries(6):
+                    self.client.get(reverse("productivity:project_info", args=(project.id,)))
+                with self.assertMaxQueries(2):
+                    self.client.get(reverse("productivity:task_info", args=(task.id,)))
+                with self.assertMaxQueries(1):
+                    self.client.get(reverse("productivity:create_project"))
+                with self.assertMaxQueries(1):
+                    self.client.get(reverse("productivity:create_task"))
+
+    def test_invalid_form_budgets(self):
+        project = self.build(20)
+        task = project.Tasks.first()
+        # the chosen project is fetched by its choice field and checked again by the
+        # model's validation, then the choices are rendered
+        with self.assertMaxQueries(4):
+            self.client.post(reverse("productivity:project_info", args=(project.id,)),
+                             {"name": "", "parent": project.parent_id})
+        with self.assertMaxQueries(4):
+            self.client.post(reverse("productivity:task_info", args=(task.id,)),
+                             {"content": "", "project": project.id, "priority": 1})
+
+    def test_form_choices(self):
+        self.build(20)
+        with self.assertMaxQueries(1):
+            ProjectForm().as_p()
+        with self.assertMaxQueries(1):
+            TaskForm().as_p()
+
+    def test_n_plus_one_fails(self):
+        self.build(5)
+        with self.assertRaises(AssertionError):
+            with self.assertMaxQueries(10):
+                [str(task) for task in Task.objects.all()]
+
+
+class QueryDebugMiddlewareTest(TestCase):
+    def test_logs_slow_query_plans(self):
+        Project.objects.create(name="logged")
+        with self.settings(QUERY_DEBUG=1, QUERY_SLOW_SECONDS=0):
+            with self.assertLogs(level="WARNING") as logs:
+                self.client.get(reverse("productivity:index"))
+        self.assertIn("queries of GET /", logs.output[0])
+        self.assertIn("slow:", logs.output[0])
@@ -0,0 +1,65 @@
+from django.test import SimpleTestCase, TestCase
+from productivity.services.ProjectService import ProjectService
+from productivity.services.TodoistService import TodoistService
+from productivity.utilities.cache import RemoteCache, remote_scope
+from productivity.utilities.concurrency import fan_out
+from productivity.utilities.exceptions import InvalidProject
+from unittest import mock
+
+
+class RemoteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self.loads
+
+    def test_ttl(self):
+        cache = RemoteCache(60)
+        self.assertEqual(cache.get("projects", self.load), 1)
+        self.assertEqual(cache.get("projects", self.load), 1)
+        cache.invalidate("projects")
+        self.assertEqual(cache.get("projects", self.load), 2)
+
+    def test_no_ttl_only_memoizes_in_a_scope(self):
+        cache = RemoteCache(0)
+        cache.get("projects", self.load)
+        cache.get("projects", self.load)
+        self.assertEqual(self.loads, 2)
+        with remote_scope():
+            cache.get("projects", self.load)
+            fan_out(todoist=lambda: cache.get("projects", self.load))
+            self.assertEqual(self.loads, 3)
+            cache.invalidate()
+            cache.get("projects", self.load)
+        self.assertEqual(self.loads, 4)
+
+    def test_load_racing_a_write_is_not_kept(self):
+        cache = RemoteCache(60)
+
+        def load():
+            cache.invalidate()
+            return self.load()
+        cache.get("projects", load)
+        self.assertEqual(cache.get("projects", self.load), 2)
+
+
+class RemoteCacheServiceTest(TestCase):
+    def test_validation_syncs_once_per_scope(self):
+        project_id = TodoistService.createProject("cached validation")
+        with mock.patch.object(TodoistService, "_pull") as pull, remote_scope():
+            for _ in range(3):
+                ProjectService.validateTodoistId(project_id)
+            with self.assertRaises(InvalidProject):
+                ProjectService.validateTodoistId("not a project")
+        self.assertEqual(pull.call_count, 1)
+        TodoistService.deleteProject(project_id)
+
+    def test_writes_invalidate(self):
+        with remote_scope():
+            TodoistService.getProjectIndex()
+            project_id = TodoistService.createProject("cached write")
+            self.assertIn(project_id, TodoistService.getProjectIndex().by_id)
+            TodoistService.deleteProject(project_id)
+            self.assertNotIn(project_id, TodoistService.getProjectIndex().by_id)
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+import json
+import os
+import subprocess
+import sys
+import time
+
+# boots a worker the way the wsgi server does, then loads every view
+WORKER_BOOT = """
+import json, sys, time
+start = time.monotonic()
+from RoseCore.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+from django.db import connections
+print(json.dumps({
+    "seconds": time.monotonic() - start,
+    "modules": [name for name in ("todoist", "numpy", "aiohttp") if name in sys.modules],
+    "connected": connections["default"].connection is not None,
+}))
+"""
+
+
+class StartupTest(SimpleTestCase):
+    """
+    guards the cost of starting up, nothing remote, no database and none
+    of the heavy libraries until they are used
+    """
+    # generous, a cold start is well under a second
+    BUDGET_SECONDS = 5
+
+    def run_manage(self, *args) -> subprocess.CompletedProcess:
+        env = {key: value for key, value in os.environ.items() if key != "TOGGL_WID"}
+        return subprocess.run([sys.executable, *args], cwd=settings.BASE_DIR, env=env,
+                              capture_output=True, text=True, timeout=60)
+
+    def test_manage_check(self):
+        start = time.monotonic()
+        result = self.run_manage("manage.py", "check")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertLess(time.monotonic() - start, self.BUDGET_SECONDS)
+
+    def test_worker_boot(self):
+        result = self.run_manage("-c", WORKER_BOOT)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        boot = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(boot["modules"], [])
+        self.assertFalse(boot["connected"])
+        self.assertLess(boot["seconds"], self.BUDGET_SECONDS)
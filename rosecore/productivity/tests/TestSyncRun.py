@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from productivity.models import Project, SyncRun
+from productivity.services.ProjectService import ProjectService
+from productivity.services.SyncRunService import SyncRunService
+from productivity.utilities import metrics, tracing
+from unittest import mock
+
+
+class TracingTest(SimpleTestCase):
+    def test_spans_and_counts(self):
+        with tracing.trace() as trace:
+            with tracing.span("outer", kind="test"):
+                tracing.count("things", 2)
+                metrics.observe_remote("test", "GET /x", 429, 0.5)
+        self.assertEqual(trace.counts, {"things": 2, "test_requests": 1, "test_throttled": 1})
+        self.assertEqual([span["name"] for span in trace.spans], ["test GET /x", "outer"])
+        self.assertEqual(trace.slowest(1)[0]["name"], "test GET /x")
+        self.assertEqual(trace.operations["outer"]["count"], 1)
+
+    def test_no_trace_is_a_noop(self):
+        with tracing.span("ignored"):
+            tracing.count("ignored")
+
+
+class SyncRunTest(TestCase):
+    def test_sync_is_recorded(self):
+        Project.objects.create(name="traced")
+        ProjectService.sync()
+        run = SyncRun.objects.get()
+        self.assertEqual(run.status, SyncRun.DONE)
+        self.assertIsNotNone(run.seconds)
+        self.assertIn("pull", run.operations)
+        self.assertIn("time_entries", run.operations)
+        self.assertEqual(run.counts.get("remote_projects_created"), 2)
+
+    def test_failed_sync_is_recorded(self):
+        with mock.patch("productivity.services.TaskService.TaskService.mirror", side_effect=ValueError("bad")):
+            with self.assertRaises(ValueError):
+                ProjectService.sync(full=True)
+        run = SyncRun.objects.get()
+        self.assertEqual(run.status, SyncRun.FAILED)
+        self.assertTrue(run.full)
+        self.assertIn("ValueError: bad", run.error)
+        self.assertIn("tasks", run.operations)
+
+    def test_history_flags_regressions(self):
+        for seconds, requests in [(1, 10), (1.2, 10), (0.8, 10), (1, 40), (3, 10)]:
+            SyncRun.objects.create(status=SyncRun.DONE, seconds=seconds, request_count=requests)
+        history = SyncRunService.get_history()
+        self.assertEqual([row["regression"] for row in history], [True, True, False, False, False])
+        self.assertEqual(history[0]["baseline_seconds"], 1)
+        self.assertIsNone(history[-1]["baseline_seconds"])
+
+    def test_views(self):
+        Project.objects.create(name="viewed")
+        ProjectService.sync()
+        run = SyncRun.objects.get()
+        response = self.client.get(reverse("productivity:sync_history"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse("productivity:sync_run", args=[run.id]))
+        response = self.client.get(reverse("productivity:sync_run", args=[run.id]))
+        self.assertContains(response, "remote_projects_created")
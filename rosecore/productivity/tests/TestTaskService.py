@@ -1,6 +1,13 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from productivity.models import Project, Task
 from productivity.services.TaskService import TaskService
 from productivity.services.ProjectService import ProjectService
+from productivity.services.TodoistService import TodoistService
+from unittest import mock
 import unittest
 
 class TestTaskService(TestCase):
@@ -50,3 +57,88 @@ class TestTaskService(TestCase):
 
     def test_todoist_persistance(self) -> None:
         pass
+
+
+class TestProjectTaskListing(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="work")
+        self.other = Project.objects.create(name="homework")
+        self.tasks = [self.task(f"task {i}", self.project) for i in range(5)]
+        self.task("done", self.project, complete=True)
+        self.task("other", self.other)
+
+    def task(self, content, project, complete=False):
+        return Task.objects.create(content=content, description=content, project=project, priority=1,
+                                   todoistId=content, next_due=timezone.now(), complete=complete)
+
+    def test_only_the_projects_incomplete_tasks(self):
+        self.assertEqual(list(TaskService.get_tasks_from_project(self.project)), self.tasks)
+
+    def test_keyset_pages(self):
+        first = list(TaskService.get_tasks_from_project(self.project, limit=3))
+        second = list(TaskService.get_tasks_from_project(self.project, limit=3, after=first[-1].id))
+        self.assertEqual(first + second, self.tasks)
+
+    def test_project_info_queries_do_not_grow(self):
+        url = reverse("productivity:project_info", args=(self.project.id,))
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for i in range(20):
+            self.task(f"more {i}", self.project)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(len(few), len(many))
+        self.assertContains(response, "more 19")
+
+
+class TestTaskMirror(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="work", todoistId="11")
+
+    def remote(self, id, content, completed=False, due_date=None):
+        return {"id": id, "content": content, "description": "", "project_id": "11", "priority": 1,
+                "due_string": None, "due_date": due_date, "completed": completed}
+
+    def test_creates_updates_and_completes(self):
+        self.assertEqual(TaskService.mirror([self.remote("1", "write"), self.remote("2", "read")]),
+                         (2, 0, 0))
+        self.assertEqual(TaskService.mirror([self.remote("1", "write", due_date="2021-08-23"),
+                                             self.remote("2", "read")]), (0, 1, 0))
+        self.assertEqual(TaskService.mirror([self.remote("1", "write", due_date="2021-08-23")]),
+                         (0, 0, 1))
+        written = Task.objects.get(todoistId="1")
+        self.assertEqual(written.project, self.project)
+        self.assertEqual(written.next_due.date().isoformat(), "2021-08-23")
+        self.assertTrue(Task.objects.get(todoistId="2").complete)
+
+    def test_unchanged_snapshot_writes_nothing(self):
+        snapshot = [self.remote(str(i), f"task {i}") for i in range(20)]
+        TaskService.mirror(snapshot)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(TaskService.mirror(snapshot), (0, 0, 0))
+        self.assertFalse([query for query in queries if query["sql"].startswith("INSERT")])
+
+    def test_validate_is_a_local_lookup(self):
+        TaskService.mirror([self.remote("7", "mirrored")])
+        with self.assertNumQueries(1):
+            self.assertTrue(TaskService.validateTodoistId("7"))
+        self.assertFalse(TaskService.validateTodoistId("8"))
+
+
+class TestBulkTaskCreate(TestCase):
+    def tearDown(self):
+        # the mocked commit sent nothing, drop what it left queued
+        del TodoistService._todoist.queue[:]
+        TodoistService._todoist.state["items"] = []
+
+    @override_settings(TESTING=False)
+    def test_one_commit_and_one_insert(self):
+        project = Project.objects.create(name="work", todoistId="11")
+        tasks = [{"content": f"task {i}", "project": project, "nextDue": timezone.now()} for i in range(5)]
+        with mock.patch.object(TodoistService._todoist, "commit") as commit, \
+                CaptureQueriesContext(connection) as queries:
+            created = TaskService.createTasks(tasks)
+        self.assertEqual(commit.call_count, 1)
+        self.assertEqual(len([query for query in queries if query["sql"].startswith("INSERT")]), 1)
+        self.assertEqual([task.content for task in created], [f"task {i}" for i in range(5)])
+        self.assertEqual(Task.objects.filter(project=project).count(), 5)
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+import shutil
+import tempfile
+from django.test import TestCase
+from unittest import mock
+import pytz
+from productivity.libs.Toggl.TimeEntry import TimeEntry as TogglTimeEntry
+from productivity.libs.Toggl.TimeEntryStore import TimeEntryStore
+from productivity.services.TogglService import TogglService
+from productivity.models import Project, TimeEntry
+from productivity.services.TimeEntryService import TimeEntryService
+
+
+def toggl_entry(id, project_id, start, hours, description="work"):
+    return {
+        "id": str(id),
+        "project_id": project_id,
+        "description": description,
+        "start": start,
+        "stop": start + timedelta(hours=hours) if hours is not None else None,
+        "tags": [],
+    }
+
+
+class TestTimeEntryService(TestCase):
+    def setUp(self):
+        self.now = pytz.utc.localize(datetime(2021, 9, 1, 12))
+        self.project = Project.objects.create(name="tracked", todoistId="1", togglId="10")
+
+    def test_mirror_upserts(self):
+        entries = [toggl_entry(1, "10", self.now, 1), toggl_entry(2, "99", self.now, 2)]
+        self.assertEqual(TimeEntryService.mirror(entries), (2, 0, 0))
+        self.assertEqual(TimeEntry.objects.get(togglId="1").project, self.project)
+        self.assertIsNone(TimeEntry.objects.get(togglId="2").project)
+
+        entries[0]["description"] = "more work"
+        self.assertEqual(TimeEntryService.mirror(entries), (0, 1, 0))
+        self.assertEqual(TimeEntry.objects.get(togglId="1").description, "more work")
+        self.assertEqual(TimeEntry.objects.count(), 2)
+
+    def test_mirror_drops_removed_entries_in_window(self):
+        old = self.now - timedelta(days=60)
+        TimeEntryService.mirror([toggl_entry(1, "10", self.now, 1), toggl_entry(2, "10", old, 1)])
+        window = (self.now - timedelta(days=7), self.now + timedelta(days=7))
+        self.assertEqual(TimeEntryService.mirror([], window), (0, 0, 1))
+        self.assertEqual(list(TimeEntry.objects.values_list("togglId", flat=True)), ["2"])
+
+    def test_running_entry(self):
+        TimeEntryService.mirror([toggl_entry(1, "10", self.now, None)])
+        self.assertEqual(TimeEntry.objects.get(togglId="1").duration, 0)
+
+    def test_time_spent(self):
+        TimeEntryService.mirror([
+            toggl_entry(1, "10", self.now - timedelta(days=1), 1),
+            toggl_entry(2, "10", self.now - timedelta(days=20), 2),
+            toggl_entry(3, "10", self.now - timedelta(days=200), 4),
+        ])
+        self.assertEqual(
+            TimeEntryService.time_spent(self.project, self.now - timedelta(days=30), self.now),
+            timedelta(hours=3))
+        with self.assertNumQueries(1):
+            summary = TimeEntryService.time_spent_summary(self.project, now=self.now)
+        self.assertEqual(summary, {
+            "week": timedelta(hours=1),
+            "month": timedelta(hours=3),
+            "quarter": timedelta(hours=3),
+        })
+
+    def test_time_spent_by_project_rolls_up(self):
+        child = Project.objects.create(name="child", parent=self.project, todoistId="2", togglId="20")
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        store = TimeEntryStore(path)
+        store.append([
+            TogglTimeEntry(id=1, start=self.now, stop=self.now + timedelta(hours=1), workspace_id=1, project_id=10),
+            TogglTimeEntry(id=2, start=self.now, stop=self.now + timedelta(hours=2), workspace_id=1, project_id=20),
+        ])
+        with mock.patch.object(TogglService, "_store", store):
+            spent = TimeEntryService.time_spent_by_project()
+        self.assertEqual(spent[self.project.id], timedelta(hours=3))
+        self.assertEqual(spent[child.id], timedelta(hours=2))
@@ -1,7 +1,9 @@
 from todoist.api import TodoistAPI
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.conf import settings
+from unittest import mock
 from productivity.services.TodoistService import TodoistService
+import threading
 import unittest
 
 class TodoistServiceTest(TestCase):
@@ -96,4 +98,88 @@ class TodoistServiceTest(TestCase):
         self.assertFalse(
             new_content in [task["content"] for task in TodoistService.getAllTasks()]
         )
-        
+
+
+class TodoistBatchTest(TestCase):
+    @override_settings(TESTING=False)
+    def test_batch_commits_once(self):
+        with mock.patch.object(TodoistService._todoist, "commit") as commit:
+            with TodoistService.batch():
+                parent_id = TodoistService.createProject(name="batch parent")
+                with TodoistService.batch():
+                    TodoistService.createProject(name="batch child", parent_id=parent_id)
+                commit.assert_not_called()
+            commit.assert_called_once()
+            TodoistService.createProject(name="after batch")
+            self.assertEqual(commit.call_count, 2)
+
+    @override_settings(TESTING=False)
+    def test_batch_discards_on_error(self):
+        with mock.patch.object(TodoistService._todoist, "commit") as commit:
+            with self.assertRaises(ValueError):
+                with TodoistService.batch():
+                    TodoistService.createProject(name="never sent")
+                    raise ValueError("half done")
+            commit.assert_not_called()
+        self.assertEqual(TodoistService._todoist.queue, [])
+        self.assertTrue(TodoistService._stale)
+        TodoistService._stale = False
+
+    @override_settings(TESTING=False)
+    def test_failed_commit_discards(self):
+        with mock.patch.object(TodoistService._todoist, "sync", side_effect=ValueError("down")):
+            with self.assertRaises(ValueError):
+                TodoistService.createProject(name="not resent")
+        self.assertEqual(TodoistService._todoist.queue, [])
+        TodoistService._stale = False
+
+    @override_settings(TESTING=False)
+    def test_commit_that_clears_the_queue_still_marks_stale(self):
+        def commit():
+            del TodoistService._todoist.queue[:]
+            raise ValueError("sync error")
+        with mock.patch.object(TodoistService._todoist, "commit", side_effect=commit):
+            with self.assertRaises(ValueError):
+                TodoistService.createProject(name="maybe applied")
+        self.assertTrue(TodoistService._stale)
+        TodoistService._stale = False
+
+    @override_settings(TESTING=False)
+    def test_batch_excludes_other_threads(self):
+        with mock.patch.object(TodoistService._todoist, "commit") as commit:
+            other = threading.Thread(target=TodoistService.createProject, args=("other thread",))
+            with TodoistService.batch():
+                TodoistService.createProject(name="batched")
+                other.start()
+                other.join(0.2)
+                self.assertTrue(other.is_alive())
+                commit.assert_not_called()
+            other.join(5)
+            self.assertEqual(commit.call_count, 2)
+
+    def test_resolve_id(self):
+        temp_id = TodoistService.createProject(name="resolve temp")
+        self.assertEqual(TodoistService.resolve_id(temp_id), temp_id)
+        with mock.patch.dict(TodoistService._todoist.temp_ids, {temp_id: 1234}):
+            self.assertEqual(TodoistService.resolve_id(temp_id), "1234")
+        self.assertIsNone(TodoistService.resolve_id(None))
+
+
+@override_settings(TESTING=False)
+class TodoistPullTest(TestCase):
+    def test_rejected_token_runs_a_full_sync(self):
+        rejected = {"error": "Invalid sync token", "error_tag": "INVALID_SYNC_TOKEN", "http_code": 400}
+        with mock.patch.object(TodoistService._todoist, "sync", side_effect=[rejected, {}]) as sync, \
+                mock.patch.object(TodoistService._todoist, "reset_state") as reset_state:
+            TodoistService._pull()
+        self.assertEqual(sync.call_count, 2)
+        reset_state.assert_called_once()
+
+    def test_other_errors_do_not_drop_the_state(self):
+        with mock.patch.object(TodoistService._todoist, "sync",
+                               return_value={"error": "Service unavailable", "http_code": 503}) as sync, \
+                mock.patch.object(TodoistService._todoist, "reset_state") as reset_state:
+            with self.assertRaises(ValueError):
+                TodoistService._pull()
+        self.assertEqual(sync.call_count, 1)
+        reset_state.assert_not_called()
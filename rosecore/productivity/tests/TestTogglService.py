@@ -1,6 +1,7 @@
 from productivity.services.TogglService import TogglService
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from unittest import mock
 
 
 class TogglServiceTest(TestCase):
@@ -33,3 +34,21 @@ class TogglServiceTest(TestCase):
         self.assertEqual(
             False, newId in [project["id"] for project in TogglService.getAllProjects()]
         )
+
+
+class TogglRefreshTest(TestCase):
+    @override_settings(TOGGL_SNAPSHOT_CHECK_SECONDS=60)
+    def test_snapshot_checked_at_most_once_a_window(self):
+        with mock.patch.object(TogglService, "_toggl") as toggl, \
+                mock.patch.object(TogglService, "_checked", None), \
+                mock.patch("productivity.services.TogglService.time.monotonic", return_value=1000):
+            toggl.reloadSnapshot.return_value = False
+            TogglService.refresh()
+            TogglService.refresh()
+            self.assertEqual(toggl.reloadSnapshot.call_count, 1)
+        with mock.patch.object(TogglService, "_toggl") as toggl, \
+                mock.patch.object(TogglService, "_checked", 1000), \
+                mock.patch("productivity.services.TogglService.time.monotonic", return_value=1061):
+            toggl.reloadSnapshot.return_value = False
+            TogglService.refresh()
+            self.assertEqual(toggl.reloadSnapshot.call_count, 1)
@@ -2,8 +2,20 @@ from .TestProject import *
 from .TestTogglService import *
 from .TestTodoistService import *
 from .TestProjectService import *
+from .TestProjectReconciler import *
 from .TestProjectIndexView import *
 from .TestDetailedProjectView import *
 from .TestTaskService import *
+from .TestConcurrency import *
+from .TestJobService import *
+from .TestTimeEntryService import *
+from .TestProjectTree import *
+from .TestProjectHierarchy import *
+from .TestRemoteCache import *
+from .TestStartup import *
+from .TestBenchmarks import *
+from .TestMetrics import *
+from .TestSyncRun import *
+from .TestQueryBudgets import *
 from  productivity.libs.tests import *
 
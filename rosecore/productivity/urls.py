@@ -2,6 +2,8 @@ from django.urls import path
 
 from .views import projectviews
 from .views import taskviews
+from .views import jobviews
+from .views import syncviews
 
 app_name = 'productivity'
 
@@ -16,5 +18,9 @@ urlpatterns = [
     path('task/create', taskviews.createTask, name="create_task"),
     path('task/<int:task_id>/', taskviews.taskInfo, name="task_info"),
     path('task/<int:task_id>/delete', taskviews.deleteTask, name="delete_task"),
-    path('project/sync/', projectviews.sync, name="sync")
+    path('project/sync/', projectviews.sync, name="sync"),
+    path('job/<int:job_id>/', jobviews.jobInfo, name="job_info"),
+    path('job/<int:job_id>/status/', jobviews.jobStatus, name="job_status"),
+    path('sync/history/', syncviews.syncHistory, name="sync_history"),
+    path('sync/<int:run_id>/', syncviews.syncRun, name="sync_run"),
 ]
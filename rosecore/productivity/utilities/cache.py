@@ -0,0 +1,112 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class RemoteIndex:
+    """
+    An id and name index built over one snapshot of a remote service's projects
+    """
+
+    def __init__(self, projects: Iterable[dict]):
+        self.projects = list(projects)
+        self.by_id = {}
+        self.by_name = {}
+        for project in self.projects:
+            self.by_id[str(project["id"])] = project
+            self.by_name[project["name"]] = project
+
+    def match(self, remote_id: str, name: str) -> Optional[dict]:
+        """
+        finds the remote project for a local project, an id match wins over
+        a name match
+        """
+        if remote_id and str(remote_id) in self.by_id:
+            return self.by_id[str(remote_id)]
+        return self.by_name.get(name)
+
+    def ids(self) -> set:
+        """
+        all of the remote ids in the snapshot
+        """
+        return set(self.by_id.keys())
+
+
+# the memo of the request or sync run in progress, None outside of one
+_scope: ContextVar[Optional[Dict]] = ContextVar("remote_cache_scope", default=None)
+
+
+@contextmanager
+def remote_scope():
+    """
+    Memoizes every RemoteCache read inside the block(a request or a sync
+    run), reads are only repeated after an invalidate. Nested scopes share
+    the outermost memo
+    """
+    if _scope.get() is not None:
+        yield
+        return
+    token = _scope.set({})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+class RemoteCache:
+    """
+    Keeps reads of a remote service for ttl seconds(0 keeps nothing outside
+    of a remote_scope), our own writes invalidate it. Thread safe
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        # bumped by every invalidate, so a load that raced a write is not kept
+        self._generation = 0
+
+    def get(self, key: str, load: Callable[[], Any]) -> Any:
+        """
+        the cached value for key, load() is called when there is none
+        """
+        scope = _scope.get()
+        with self._lock:
+            if scope is not None and (id(self), key) in scope:
+                return scope[(id(self), key)]
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self._ttl:
+                value = entry[1]
+                if scope is not None:
+                    scope[(id(self), key)] = value
+                return value
+            generation = self._generation
+        loaded_at = time.monotonic()
+        value = load()
+        with self._lock:
+            if generation != self._generation:
+                return value
+            if self._ttl > 0:
+                self._entries[key] = (loaded_at, value)
+            if scope is not None:
+                scope[(id(self), key)] = value
+        return value
+
+    def invalidate(self, *keys: str) -> None:
+        """
+        drops the keys(every key if none are given), here and in the current scope
+        """
+        scope = _scope.get()
+        with self._lock:
+            self._generation += 1
+            if keys:
+                for key in keys:
+                    self._entries.pop(key, None)
+            else:
+                self._entries.clear()
+            if scope is not None:
+                for scope_key in list(scope):
+                    if scope_key[0] == id(self) and (not keys or scope_key[1] in keys):
+                        del scope[scope_key]
@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from typing import Any, Callable, Dict
+
+from productivity.utilities.exceptions import RemoteServiceError
+
+
+def fan_out(**calls: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    Runs every call at the same time, one thread each, and waits for all of
+    them. Returns the results keyed by name, if any call failed a
+    RemoteServiceError with every failure (and the successful results) is
+    raised once they have all finished.
+    Calls must not touch the database, the threads have their own connections.
+    Each call runs in a copy of the callers context, so it shares the remote
+    cache scope
+    """
+    if not calls:
+        return {}
+    results = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="rosecore-remote") as executor:
+        futures = {name: executor.submit(contextvars.copy_context().run, call) for name, call in calls.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as error:
+                errors[name] = error
+    if errors:
+        raise RemoteServiceError(errors, results)
+    return results
@@ -11,3 +11,17 @@ class InvalidProject(Exception):
 class APIThrottled(Exception):
     def __str__(self) -> str:
         return 'API was throttled'
+
+
+class RemoteServiceError(Exception):
+    """
+    One or more remote services failed while others may have succeeded,
+    errors and results are keyed by service name
+    """
+    def __init__(self, errors: dict, results: dict):
+        self.errors = errors
+        self.results = results
+
+    def __str__(self) -> str:
+        failures = ", ".join(f"{service}: {error}" for service, error in self.errors.items())
+        return f'Remote services failed: {failures}'
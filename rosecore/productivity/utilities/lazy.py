@@ -0,0 +1,50 @@
+import threading
+from typing import Any, Callable
+
+_UNSET = object()
+
+
+class lazy_client:
+    """
+    A class attribute built by the decorated function the first time it is
+    read, then kept. Lets a service define its remote client without paying
+    for the import, files or connections until the client is used. Thread safe
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value = _UNSET
+        self.__doc__ = factory.__doc__
+
+    def __get__(self, instance, owner) -> Any:
+        if self._value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    self._value = self._factory()
+        return self._value
+
+    def built(self) -> bool:
+        """
+        true once the value has been built, read it off the class's
+        __dict__ as reading the attribute builds it
+        """
+        return self._value is not _UNSET
+
+    def reset(self) -> None:
+        """
+        drops the built value, the next read builds it again(ie after the
+        settings it is built from have changed)
+        """
+        with self._lock:
+            self._value = _UNSET
+
+
+def reset_clients(*owners: type) -> None:
+    """
+    resets every lazy_client defined on the given classes
+    """
+    for owner in owners:
+        for attribute in vars(owner).values():
+            if isinstance(attribute, lazy_client):
+                attribute.reset()
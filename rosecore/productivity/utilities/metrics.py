@@ -0,0 +1,268 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+import copy
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from . import tracing
+
+
+class Metric(ABC):
+    """
+    A named metric with fixed label names, each set of label values is
+    its own series. Thread safe, every update is one dict lookup under a lock
+    """
+    TYPE = None
+
+    def __init__(self, name: str, help: str, labels: Iterable[str]=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _labels(self, key: Tuple[str, ...], extra: Dict[str, str]=None) -> str:
+        pairs = list(zip(self.label_names, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self, others: Iterable[List]=()) -> List[str]:
+        """
+        the help, type and sample lines, others are snapshots of the same
+        metric in other processes that are added in
+        """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.TYPE}"]
+        with self._lock:
+            series = {key: copy.deepcopy(state) for key, state in self._series.items()}
+        for other in others:
+            for key, state in other:
+                key = tuple(key)
+                series[key] = self._combine(series[key], state) if key in series else state
+        lines.extend(self._renderSeries(sorted(series.items())))
+        return lines
+
+    def snapshot(self) -> List[List]:
+        """
+        the series as json, for another process to render with its own
+        """
+        with self._lock:
+            return [[list(key), copy.deepcopy(state)] for key, state in sorted(self._series.items())]
+
+    @abstractmethod
+    def _combine(self, state, other):
+        """
+        one series' state with another process's state for it added in
+        """
+
+    @abstractmethod
+    def _renderSeries(self, series) -> List[str]:
+        """
+        the sample lines of the (label values, state) pairs, sorted
+        """
+
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def inc(self, amount: float=1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def _combine(self, state, other):
+        return state + other
+
+    def _renderSeries(self, series) -> List[str]:
+        return [f"{self.name}{self._labels(key)} {_number(value)}" for key, value in series]
+
+
+class Histogram(Metric):
+    """
+    counts observations into fixed buckets, rendered cumulatively
+    """
+    TYPE = "histogram"
+    SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, name: str, help: str, labels: Iterable[str]=(), buckets: Iterable[float]=SECONDS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        # the first bucket at least as large as the value, the last slot is +Inf
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bucket] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        observes the seconds the block took, even if it raised
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series is not None else 0
+
+    def _combine(self, state, other):
+        counts, total = state
+        other_counts, other_total = other
+        if len(other_counts) != len(counts):
+            # the other process has different buckets, it can not be added
+            return state
+        return [[count + other_count for count, other_count in zip(counts, other_counts)], total + other_total]
+
+    def _renderSeries(self, series) -> List[str]:
+        lines = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, {'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    The metrics of this process in the prometheus text format. Each
+    gunicorn worker process(and the job worker) has its own registry, threads
+    share it. A snapshot lets another process render them with its own
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def counter(self, name: str, help: str, labels: Iterable[str]=()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str]=(), **kwargs) -> Histogram:
+        return self._register(Histogram(name, help, labels, **kwargs))
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> Dict[str, List]:
+        """
+        every metric's series by name, json serializable
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def render(self, others: Iterable[Dict[str, List]]=()) -> str:
+        """
+        the text format, with the snapshots of other processes added in
+        """
+        others = list(others)
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render([other[metric.name] for other in others if metric.name in other]))
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def route(method: str, path: str) -> str:
+    """
+    an operation label for a rest call, ids are folded so the label has a
+    bounded number of values
+    """
+    return f"{method} {re.sub(r'/[0-9]+(?=/|$)', '/{id}', path)}"
+
+
+REGISTRY = Registry()
+
+REMOTE_REQUESTS = REGISTRY.counter(
+    "rosecore_remote_requests_total", "Requests sent to todoist and toggl",
+    ["service", "operation", "status"])
+REMOTE_REQUEST_SECONDS = REGISTRY.histogram(
+    "rosecore_remote_request_seconds", "Seconds each request to todoist and toggl took",
+    ["service", "operation"])
+REMOTE_THROTTLED = REGISTRY.counter(
+    "rosecore_remote_throttled_total", "Requests todoist or toggl answered with a 429",
+    ["service", "operation"])
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "rosecore_db_queries_per_request", "SQL queries run while handling a request",
+    ["view"], buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "rosecore_db_query_seconds", "Seconds each SQL query took, by the view that ran it",
+    ["view"])
+SYNC_PHASE_SECONDS = REGISTRY.histogram(
+    "rosecore_sync_phase_seconds", "Seconds each phase of a project sync took",
+    ["phase"])
+
+
+def observe_remote(service: str, operation: str, status, seconds: float) -> None:
+    """
+    records one request to a remote service, status is the http status or
+    "error" when no response came back. It is also a span of the current trace
+    """
+    REMOTE_REQUESTS.inc(service=service, operation=operation, status=status)
+    REMOTE_REQUEST_SECONDS.observe(seconds, service=service, operation=operation)
+    tracing.record_span(f"{service} {operation}", seconds, status=status)
+    tracing.count(f"{service}_requests")
+    if status == 429:
+        REMOTE_THROTTLED.inc(service=service, operation=operation)
+        tracing.count(f"{service}_throttled")
+
+
+class MeteredSession(requests.Session):
+    """
+    A requests session that records every request it sends with
+    observe_remote, for clients that take a session(ie TodoistAPI)
+    """
+
+    def __init__(self, service: str):
+        super().__init__()
+        self.service = service
+
+    def request(self, method, url, *args, **kwargs):
+        operation = route(method.upper(), urlparse(url).path)
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception:
+            observe_remote(self.service, operation, "error", time.perf_counter() - start)
+            raise
+        observe_remote(self.service, operation, response.status_code, time.perf_counter() - start)
+        return response
@@ -0,0 +1,120 @@
+from collections import Counter
+import re
+import time
+from typing import Any, List, NamedTuple, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# string literals, then numbers that are not part of a name
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?")
+_PLACEHOLDERS = re.compile(r"%s|\?")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def shape(sql: str) -> str:
+    """
+    the sql with every literal and parameter replaced with ?, and IN lists
+    folded, so queries that only differ in their values share a shape
+    """
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _IN_LISTS.sub("(...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class RecordedQuery(NamedTuple):
+    sql: str
+    params: Any
+    many: bool
+    seconds: float
+    shape: str
+
+
+class QueryRecorder:
+    """
+    Records every sql query run on a connection inside the block, with
+    its shape and how long it took. Repeated shapes are the N+1s, the
+    slow ones can be explained
+    """
+    # shapes run this many times are reported as N+1s
+    REPEATS = 3
+
+    def __init__(self, using: str=DEFAULT_DB_ALIAS, slow_seconds: float=0.1):
+        self.connection = connections[using]
+        self.slow_seconds = slow_seconds
+        self.queries: List[RecordedQuery] = []
+        self._wrapper = None
+        self._explaining = False
+
+    def __enter__(self) -> "QueryRecorder":
+        self._wrapper = self.connection.execute_wrapper(self._record)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._wrapper.__exit__(*exc_info)
+        self._wrapper = None
+
+    def _record(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(RecordedQuery(sql, params, many, time.perf_counter() - start, shape(sql)))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def repeated(self, repeats: int=None) -> List[Tuple[str, int]]:
+        """
+        the shapes run at least repeats times, most repeated first
+        """
+        repeats = repeats or QueryRecorder.REPEATS
+        return [(sql, count) for sql, count in Counter(query.shape for query in self.queries).most_common()
+                if count >= repeats]
+
+    def slow(self) -> List[RecordedQuery]:
+        """
+        the queries that took at least slow_seconds, slowest first
+        """
+        return sorted((query for query in self.queries if query.seconds >= self.slow_seconds),
+                      key=lambda query: query.seconds, reverse=True)
+
+    def explain(self, query: RecordedQuery) -> str:
+        """
+        the database's plan for a recorded select, an empty string for
+        anything else. Not recorded
+        """
+        if query.many or not query.sql.lstrip().upper().startswith("SELECT"):
+            return ""
+        prefix = "EXPLAIN QUERY PLAN " if self.connection.vendor == "sqlite" else "EXPLAIN "
+        self._explaining = True
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(prefix + query.sql, query.params)
+                return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+        finally:
+            self._explaining = False
+
+    def report(self, repeats: int=None, explain: bool=True, every: bool=False) -> str:
+        """
+        a readable summary of the queries, the N+1s and the slow ones,
+        every lists each query too
+        """
+        lines = [f"{self.count} queries in {sum(query.seconds for query in self.queries):.4f}s"]
+        if every:
+            lines.extend(f"{i}. {query.sql}" for i, query in enumerate(self.queries, 1))
+        for sql, count in self.repeated(repeats):
+            lines.append(f"N+1: {count}x {sql}")
+        for query in self.slow():
+            lines.append(f"slow: {query.seconds:.4f}s {query.sql}")
+            plan = self.explain(query) if explain else ""
+            if plan:
+                lines.extend(f"    {line}" for line in plan.splitlines())
+        return "\n".join(lines)
@@ -0,0 +1,96 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# the trace being recorded, fan_out threads share their caller's
+_current: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+
+class Trace:
+    """
+    The spans(named, timed pieces of work) and counts of one run. Spans
+    past MAX_SPANS are only kept in the per name totals. Thread safe
+    """
+    MAX_SPANS = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self.spans = []
+        self.operations = {}
+        self.counts = {}
+
+    def add_span(self, name: str, start: float, seconds: float, **attributes) -> None:
+        """
+        records a span, start is a time.perf_counter() reading
+        """
+        with self._lock:
+            if len(self.spans) < Trace.MAX_SPANS:
+                span = {"name": name, "start": round(start - self._start, 6), "seconds": round(seconds, 6)}
+                if attributes:
+                    span["attributes"] = attributes
+                self.spans.append(span)
+            totals = self.operations.setdefault(name, {"count": 0, "seconds": 0.0, "max": 0.0})
+            totals["count"] += 1
+            totals["seconds"] += seconds
+            totals["max"] = max(totals["max"], seconds)
+
+    def add_count(self, name: str, amount: int=1) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def slowest(self, limit: int=10) -> List[Dict[str, Any]]:
+        """
+        the longest kept spans, slowest first
+        """
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span["seconds"], reverse=True)[:limit]
+
+
+@contextmanager
+def trace():
+    """
+    records every span and count inside the block into a new Trace
+    """
+    recording = Trace()
+    token = _current.set(recording)
+    try:
+        yield recording
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    times the block as a span of the current trace, a no-op outside of one
+    """
+    recording = _current.get()
+    if recording is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recording.add_span(name, start, time.perf_counter() - start, **attributes)
+
+
+def record_span(name: str, seconds: float, **attributes) -> None:
+    """
+    adds a span that just ended after seconds to the current trace
+    """
+    recording = _current.get()
+    if recording is not None:
+        recording.add_span(name, time.perf_counter() - seconds, seconds, **attributes)
+
+
+def count(name: str, amount: int=1) -> None:
+    """
+    adds to a count of the current trace
+    """
+    recording = _current.get()
+    if recording is not None and amount:
+        recording.add_count(name, amount)
@@ -0,0 +1,16 @@
+from django.shortcuts import render
+from django.http import JsonResponse
+from productivity.services import JobService
+
+
+def jobInfo(request, job_id):
+    job = JobService.get_job_or_404(job_id)
+    return render(request, 'job/jobInfo.html', {
+        'job': job,
+        'status': JobService.formatJob(job)
+    })
+
+
+def jobStatus(request, job_id):
+    job = JobService.get_job_or_404(job_id)
+    return JsonResponse(JobService.formatJob(job))
@@ -0,0 +1,10 @@
+from django.http import HttpResponse
+from productivity.services.MetricsService import MetricsService
+
+
+def metrics(request):
+    """
+    this worker's metrics, with the job worker's added in, in the
+    prometheus text format
+    """
+    return HttpResponse(MetricsService.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
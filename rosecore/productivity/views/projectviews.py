@@ -5,11 +5,16 @@ from productivity.forms.ProjectForm import ProjectForm
 from productivity.forms.ProjectMergeForm import ProjectAutoMergeForm
 from productivity.services import ProjectService
 from productivity.services import TaskService
+from productivity.services import JobService
+from productivity.services import TimeEntryService
 
 
 def index(request):
-    project_list = ProjectService.get_root_projects()
-    return render(request, 'project/index.html', {'project_list': project_list})
+    project_tree = ProjectService.get_project_tree().rows()
+    return render(request, 'project/index.html', {'project_tree': project_tree})
+
+
+TASK_PAGE_SIZE = 50
 
 
 def projectInfo(request, project_id):
@@ -31,7 +36,10 @@ def projectInfo(request, project_id):
         returnData = {
             'project_id': project_id,
             'project': project,
-            'tasks': TaskService.get_tasks_from_project(project),
+            **task_page(project, request.GET.get("after")),
+            'breadcrumbs': ProjectService.get_breadcrumbs(project),
+            'time_spent': TimeEntryService.time_spent_summary(project, include_subprojects=True),
+            'time_entries': TimeEntryService.get_time_entries_from_project(project, limit=10),
             'form': ProjectForm(instance=project)
         }
     return render(request, 'project/projectInfo.html', returnData)
@@ -92,14 +100,30 @@ def autoSync(request, project_id):
         
 def validateProject(request, project_id):
     project = ProjectService.get_project_or_404(project_id)
-    ProjectService.validate_project(project)
-    return HttpResponseRedirect(reverse('productivity:index'))
+    job = JobService.enqueue(JobService.VALIDATE_PROJECT, project_id=project.id)
+    return HttpResponseRedirect(reverse('productivity:job_info', args=(job.id,)))
             
 
 def sync(request):
-    ProjectService.sync()
-    return HttpResponseRedirect(reverse('productivity:index'))
+    job = JobService.enqueue(JobService.SYNC, full=request.GET.get("full") == "1")
+    return HttpResponseRedirect(reverse('productivity:job_info', args=(job.id,)))
 
 def nuke_unsynced(request):
-    ProjectService.nuke_all_unsynced()
-    return HttpResponseRedirect(reverse('productivity:index'))
+    job = JobService.enqueue(JobService.NUKE_UNSYNCED)
+    return HttpResponseRedirect(reverse('productivity:job_info', args=(job.id,)))
+
+
+def task_page(project, after):
+    """
+    one page of a projects tasks, the id of the last task is the next page's after
+    """
+    try:
+        after = int(after) if after else None
+    except ValueError:
+        after = None
+    tasks = list(TaskService.get_tasks_from_project(project, limit=TASK_PAGE_SIZE + 1, after=after))
+    next_after = tasks[TASK_PAGE_SIZE - 1].id if len(tasks) > TASK_PAGE_SIZE else None
+    return {
+        'tasks': tasks[:TASK_PAGE_SIZE],
+        'next_after': next_after
+    }
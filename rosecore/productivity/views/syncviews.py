@@ -0,0 +1,16 @@
+from django.shortcuts import render
+from productivity.services import SyncRunService
+
+
+def syncHistory(request):
+    return render(request, 'sync/syncHistory.html', {
+        'history': SyncRunService.get_history(),
+        'regression_factor': SyncRunService.REGRESSION_FACTOR,
+    })
+
+
+def syncRun(request, run_id):
+    run = SyncRunService.get_run_or_404(run_id)
+    return render(request, 'sync/syncRun.html', {
+        'run': run,
+    })